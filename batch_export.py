@@ -0,0 +1,90 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from blend_list import BLEND_LIST
+from blender_process import parse_result, run_blender
+
+EXPORT_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "blender_export_script.py")
+
+def export_blend_file(blend_file_path, export_folder, exporters, timeout=None, threads=None):
+    """Run the exporters on one .blend file in its own headless Blender process."""
+    args = ["--python", EXPORT_SCRIPT, "--",
+            "--blend", blend_file_path,
+            "--export-folder", export_folder,
+            "--exporters", ",".join(exporters)]
+
+    start = time.perf_counter()
+    try:
+        returncode, lines = run_blender(args, timeout=timeout, threads=threads)
+    except OSError as e:
+        returncode, lines = -1, [f"Could not start Blender: {e}"]
+    wall_time = time.perf_counter() - start
+
+    result = parse_result(lines)
+    ok = returncode == 0 and result is not None
+    return {
+        "blend_file": blend_file_path,
+        "ok": ok,
+        "returncode": returncode,
+        "wall_time": wall_time,
+        "timings": result["timings"] if result else None,
+        # Keep the tail of the log so crashes in open_mainfile can be diagnosed
+        "error": None if ok else "\n".join(lines[-20:]),
+    }
+
+def export_blend_files(blend_list, base_export_folder, exporters=("ply",), max_workers=4, timeout=None):
+    """Export many .blend files in parallel, at most max_workers Blender processes at a time.
+
+    A worker that crashes or times out is recorded as a failure and does not stop the batch.
+    """
+    # Split the CPU between the workers instead of letting every Blender grab all cores
+    threads = max(1, (os.cpu_count() or 1) // max_workers)
+    results = []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for blend_file_path in blend_list:
+            export_folder = os.path.join(base_export_folder, Path(blend_file_path).stem)
+            future = executor.submit(export_blend_file, blend_file_path, export_folder, exporters, timeout, threads)
+            futures[future] = blend_file_path
+
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            status = "done" if result["ok"] else f"FAILED (exit code {result['returncode']})"
+            print(f"[{len(results)}/{len(futures)}] {result['blend_file']}: {status} in {result['wall_time']:.1f}s")
+
+    return results
+
+def print_summary(results, wall_time):
+    """Print aggregate timings and the failures of a batch export."""
+    succeeded = [r for r in results if r["ok"]]
+    failed = [r for r in results if not r["ok"]]
+
+    print(f"Exported {len(succeeded)}/{len(results)} files in {wall_time:.1f}s")
+    if succeeded:
+        total = sum(r["wall_time"] for r in succeeded)
+        print(f"Total worker time: {total:.1f}s, speedup over serial: {total / wall_time:.1f}x")
+
+        exporter_totals = {}
+        for r in succeeded:
+            for name, seconds in r["timings"].items():
+                exporter_totals[name] = exporter_totals.get(name, 0.0) + seconds
+        for name, seconds in exporter_totals.items():
+            print(f"  {name}: {seconds:.1f}s")
+
+    for r in failed:
+        print(f"Failed: {r['blend_file']} (exit code {r['returncode']})")
+        print(r["error"])
+
+def main():
+    base_export_folder = "../blender_dataset-ply"
+
+    start = time.perf_counter()
+    results = export_blend_files(BLEND_LIST, base_export_folder, exporters=("ply",), max_workers=4)
+    print_summary(results, time.perf_counter() - start)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import bpy
+import os
+import sys
+import time
+import numpy as np
+
+# Blender does not put the script folder on sys.path when run with -P
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from calculate_distance import in_camera_view, world_to_camera_view_array
+from columnar import read_columns, write_columns
+from scene_index import INSIDE, STRADDLING, classify_boxes, frustum_planes, transform_bounds
+
+def is_deformed(obj):
+    """Return True if the object's geometry (not just its transform) can change between frames."""
+    mesh = obj.data
+    return bool(obj.modifiers) or mesh.shape_keys is not None or mesh.animation_data is not None
+
+def mesh_local_coords(mesh):
+    coords = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", coords)
+    return coords.reshape(-1, 3)
+
+def evaluated_local_coords(obj, depsgraph):
+    """Return the local vertex coordinates of the evaluated object at the current frame."""
+    evaluated = obj.evaluated_get(depsgraph)
+    mesh = evaluated.to_mesh()
+    try:
+        return mesh_local_coords(mesh)
+    finally:
+        evaluated.to_mesh_clear()
+
+def local_bounds(coords):
+    """Return the (lo, hi) bounds of local vertex coordinates, or None when there are none."""
+    if not len(coords):
+        return None
+    return coords.min(axis=0), coords.max(axis=0)
+
+def visibility_matrix(scene, cameras=None, objects=None, frame_start=None, frame_end=None):
+    """Evaluate which objects each camera sees on every frame.
+
+    The depsgraph is evaluated once per frame and shared by all cameras.
+    Vertex buffers and local bounds of objects that are not deformed are read
+    once and only re-transformed, and objects whose bounds are fully inside or outside the
+    frustum skip the per-vertex test. Returns (visible, cameras, objects,
+    frames) where visible is a (cameras, objects, frames) boolean array.
+    """
+    if cameras is None:
+        cameras = [obj for obj in scene.objects if obj.type == 'CAMERA']
+    if objects is None:
+        objects = [obj for obj in scene.objects if obj.type == 'MESH']
+    frame_start = scene.frame_start if frame_start is None else frame_start
+    frame_end = scene.frame_end if frame_end is None else frame_end
+    frames = list(range(frame_start, frame_end + 1))
+
+    # Static geometry is extracted once, deformed geometry on every frame
+    deformed = [is_deformed(obj) for obj in objects]
+    static_coords = {}
+    static_bounds = {}
+    for obj, obj_deformed in zip(objects, deformed):
+        if not obj_deformed and obj.data.name not in static_coords:
+            static_coords[obj.data.name] = mesh_local_coords(obj.data)
+            static_bounds[obj.data.name] = local_bounds(static_coords[obj.data.name])
+
+    visible = np.zeros((len(cameras), len(objects), len(frames)), dtype=bool)
+    current_frame = scene.frame_current
+    try:
+        for frame_index, frame in enumerate(frames):
+            scene.frame_set(frame)
+            depsgraph = bpy.context.evaluated_depsgraph_get()
+
+            local_coords = []
+            matrices = np.empty((len(objects), 4, 4))
+            lo = np.zeros((len(objects), 3))
+            hi = np.zeros((len(objects), 3))
+            empty = np.zeros(len(objects), dtype=bool)
+            for i, obj in enumerate(objects):
+                if deformed[i]:
+                    coords = evaluated_local_coords(obj, depsgraph)
+                    bounds = local_bounds(coords)
+                else:
+                    coords = static_coords[obj.data.name]
+                    bounds = static_bounds[obj.data.name]
+                local_coords.append(coords)
+                matrices[i] = np.array(obj.evaluated_get(depsgraph).matrix_world, dtype=np.float64)
+                if bounds is not None:
+                    lo[i], hi[i] = transform_bounds(bounds[0], bounds[1], matrices[i])
+                else:
+                    empty[i] = True
+
+            # World coordinates are only needed for straddling objects, compute them on demand
+            world_coords = {}
+            for camera_index, cam_ob in enumerate(cameras):
+                classes = classify_boxes(frustum_planes(cam_ob, scene), lo, hi)
+                visible[camera_index, :, frame_index] = (classes == INSIDE) & ~empty
+                for i in np.flatnonzero((classes == STRADDLING) & ~empty):
+                    if i not in world_coords:
+                        world_coords[i] = local_coords[i] @ matrices[i, :3, :3].T + matrices[i, :3, 3]
+                    co_cam = world_to_camera_view_array(scene, cam_ob, world_coords[i])
+                    visible[camera_index, i, frame_index] = in_camera_view(co_cam).any()
+    finally:
+        scene.frame_set(current_frame)
+
+    return visible, cameras, objects, frames
+
+def write_visibility(filepath, visible, cameras, objects, frames):
+    """Write a visibility matrix bit-packed along the frame axis to a column file."""
+    meta = {
+        "cameras": [cam.name for cam in cameras],
+        "objects": [obj.name for obj in objects],
+        "frame_start": frames[0] if frames else 0,
+        "num_frames": len(frames),
+    }
+    write_columns(filepath, {"visible": np.packbits(visible, axis=-1)}, meta)
+
+def read_visibility(filepath):
+    """Return (visible, meta) from a file written by write_visibility."""
+    columns, meta = read_columns(filepath)
+    visible = np.unpackbits(columns["visible"], axis=-1, count=meta["num_frames"]).astype(bool)
+    return visible, meta
+
+def ever_visible_objects(visible, objects):
+    """Return the objects seen by any camera on any frame."""
+    seen = visible.any(axis=(0, 2))
+    return [obj for obj, is_seen in zip(objects, seen) if is_seen]
+
+def main():
+    blend_file_path = "../blender_dataset/restaurant_anim_test/rain_restaurant.blend"
+    output_path = "rain_restaurant-visibility.cols"
+
+    bpy.ops.wm.open_mainfile(filepath=blend_file_path)
+    scene = bpy.context.scene
+
+    start = time.perf_counter()
+    visible, cameras, objects, frames = visibility_matrix(scene)
+    elapsed = time.perf_counter() - start
+    print(f"Evaluated {len(objects)} objects x {len(cameras)} cameras x {len(frames)} frames in {elapsed:.2f}s "
+          f"({elapsed / max(1, len(frames)) * 1000:.1f} ms per frame)")
+
+    write_visibility(output_path, visible, cameras, objects, frames)
+    seen = ever_visible_objects(visible, objects)
+    print(f"{len(seen)} of {len(objects)} objects are visible on some frame, matrix saved at {output_path}")
+
+if __name__ == "__main__":
+    main()
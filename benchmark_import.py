@@ -0,0 +1,67 @@
+import bpy
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+
+# Blender does not put the script folder on sys.path when run with -P
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from import_obj import import_mesh_direct, import_obj2
+
+# Run with: blender -b --factory-startup -P benchmark_import.py
+
+def write_grid_obj(filepath, grid_size):
+    """Write a grid of quads as an .obj file."""
+    xs, ys = np.meshgrid(np.arange(grid_size), np.arange(grid_size))
+    positions = np.column_stack([xs.ravel(), ys.ravel(), np.zeros(xs.size)]) * 0.01
+    i, j = np.meshgrid(np.arange(grid_size - 1), np.arange(grid_size - 1), indexing="ij")
+    a = (i * grid_size + j).ravel() + 1
+    faces = np.column_stack([a, a + 1, a + grid_size + 1, a + grid_size])
+
+    with open(filepath, "w") as f:
+        np.savetxt(f, positions, fmt="v %.6f %.6f %.6f")
+        np.savetxt(f, faces, fmt="f %d %d %d %d")
+
+def create_scene_objects(names):
+    """Create one placeholder mesh object per name, like the objects of ocean-scene.blend."""
+    material = bpy.data.materials.new("BenchmarkMaterial")
+    for name in names:
+        mesh = bpy.data.meshes.new(name)
+        mesh.from_pydata([(0, 0, 0), (1, 0, 0), (1, 1, 0)], [], [(0, 1, 2)])
+        mesh.materials.append(material)
+        mesh.uv_layers.new(name="UVMap")
+        obj = bpy.data.objects.new(name, mesh)
+        bpy.context.scene.collection.objects.link(obj)
+
+def time_loader(loader, file_paths):
+    start = time.perf_counter()
+    for file_path in file_paths:
+        loader(file_path)
+    return time.perf_counter() - start
+
+def main():
+    input_folder = tempfile.mkdtemp(prefix="import_benchmark_")
+    num_files, grid_size = 100, 100
+
+    names = [f"object_{i:03d}" for i in range(num_files)]
+    file_paths = [os.path.join(input_folder, f"{name}.obj") for name in names]
+    for file_path in file_paths:
+        write_grid_obj(file_path, grid_size)
+    create_scene_objects(names)
+    print(f"{num_files} files with {grid_size * grid_size} vertices each")
+
+    direct_time = time_loader(import_mesh_direct, file_paths)
+    print(f"  foreach_set loader: {direct_time:.2f}s")
+
+    try:
+        operator_time = time_loader(import_obj2, file_paths)
+    except AttributeError as e:
+        # bpy.ops.import_scene.obj was removed in Blender 4.0
+        print(f"  operator loader unavailable: {e}")
+        return
+    print(f"  operator loader:    {operator_time:.2f}s")
+    print(f"  speedup: {operator_time / direct_time:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import time
+import numpy as np
+
+from mesh_reader import ply_mesh_arrays, read_ply
+
+# Run with: python benchmark_ply_reader.py (Blender is not needed)
+
+def synthetic_mesh(grid_size, quad_fraction=0.5):
+    """Return positions, face sizes and face indices of a grid with patches of quads and triangles."""
+    xs, ys = np.meshgrid(np.arange(grid_size, dtype=np.float32), np.arange(grid_size, dtype=np.float32))
+    positions = np.column_stack([xs.ravel(), ys.ravel(), np.sin(xs.ravel() + ys.ravel())]).astype(np.float32)
+
+    i, j = np.meshgrid(np.arange(grid_size - 1), np.arange(grid_size - 1), indexing="ij")
+    a = (i * grid_size + j).ravel()
+    b, c, d = a + 1, a + grid_size + 1, a + grid_size
+
+    # Keep the first quad_fraction of cells as quads and split the rest into two triangles
+    split = int(len(a) * quad_fraction)
+    quads = np.column_stack([a[:split], b[:split], c[:split], d[:split]])
+    triangles = np.concatenate([np.column_stack([a[split:], b[split:], c[split:]]),
+                                np.column_stack([a[split:], c[split:], d[split:]])])
+    counts = np.concatenate([np.full(len(quads), 4), np.full(len(triangles), 3)])
+    indices = np.concatenate([quads.ravel(), triangles.ravel()]).astype(np.int32)
+    return positions, counts, indices
+
+def write_ply_file(filepath, positions, counts, indices, file_format):
+    """Write a mesh with the same header as write_ply in blender_export_script.py."""
+    header = (
+        "ply\n"
+        f"format {file_format} 1.0\n"
+        f"element vertex {len(positions)}\n"
+        "property float x\n"
+        "property float y\n"
+        "property float z\n"
+        f"element face {len(counts)}\n"
+        "property list uchar int vertex_indices\n"
+        "end_header\n"
+    )
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    with open(filepath, "wb") as f:
+        f.write(header.encode("ascii"))
+        if file_format == "ascii":
+            np.savetxt(f, positions, fmt="%.9g")
+            for start, count in zip(starts, counts):
+                f.write((f"{count} " + " ".join(map(str, indices[start:start + count])) + "\n").encode("ascii"))
+        else:
+            f.write(positions.astype("<f4").tobytes())
+            # synthetic_mesh keeps the faces of each size in one contiguous block
+            for size in dict.fromkeys(counts.tolist()):
+                block = indices[starts[counts == size][:, None] + np.arange(size)]
+                records = np.empty(len(block), dtype=[("size", "u1"), ("items", "<i4", (size,))])
+                records["size"] = size
+                records["items"] = block
+                f.write(records.tobytes())
+
+def time_read(filepath, repeats=3, **kwargs):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        ply = read_ply(filepath, **kwargs)
+        mesh = ply_mesh_arrays(ply)
+        best = min(best, time.perf_counter() - start)
+    return best, mesh
+
+def main():
+    output_folder = tempfile.mkdtemp(prefix="ply_reader_benchmark_")
+
+    for grid_size in [100, 300, 1000]:
+        positions, counts, indices = synthetic_mesh(grid_size)
+        print(f"{len(positions)} vertices, {len(counts)} faces")
+
+        for file_format in ["ascii", "binary_little_endian"]:
+            filepath = os.path.join(output_folder, f"grid_{grid_size}_{file_format}.ply")
+            write_ply_file(filepath, positions, counts, indices, file_format)
+            size_mb = os.path.getsize(filepath) / 1e6
+
+            seconds, (read_positions, read_counts, read_indices) = time_read(filepath)
+            assert np.array_equal(read_positions, positions)
+            assert np.array_equal(read_counts, counts)
+            assert np.array_equal(read_indices, indices)
+            print(f"  {file_format}: {size_mb:.1f} MB in {seconds * 1000:.1f} ms ({size_mb / seconds:.0f} MB/s)")
+
+if __name__ == "__main__":
+    main()
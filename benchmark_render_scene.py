@@ -0,0 +1,159 @@
+import bpy
+import argparse
+import json
+import os
+import sys
+import time
+import numpy as np
+from mathutils import Vector
+
+# Blender does not put the script folder on sys.path when run with -P
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from blend_list import SMOKE_SCENE_NAMES
+from blender_process import print_result, script_args
+from frame_regions import output_size
+from mesh_builder import mesh_from_arrays
+from render_worker import apply_render_settings
+
+# Synthetic scenes are rendered at this size before resolution_percentage
+SMOKE_RESOLUTION = (320, 240)
+
+def grid_arrays(count, size):
+    """Return the positions, face sizes and face indices of a count x count vertex grid of quads."""
+    xs, ys = np.meshgrid(np.linspace(-size / 2, size / 2, count), np.linspace(-size / 2, size / 2, count))
+    positions = np.column_stack([xs.ravel(), ys.ravel(), 0.05 * np.sin(xs.ravel() * 3) * np.cos(ys.ravel() * 3)])
+    i, j = np.meshgrid(np.arange(count - 1), np.arange(count - 1), indexing="ij")
+    a = (i * count + j).ravel()
+    indices = np.column_stack([a, a + 1, a + count + 1, a + count]).ravel()
+    return positions, np.full(len(a), 4, dtype=np.int32), indices
+
+def new_material(name, color):
+    material = bpy.data.materials.new(name)
+    material.use_nodes = True
+    material.node_tree.nodes["Principled BSDF"].inputs["Base Color"].default_value = color
+    return material
+
+def add_object(scene, name, data, location=(0, 0, 0), material=None):
+    obj = bpy.data.objects.new(name, data)
+    obj.location = location
+    if material is not None:
+        obj.data.materials.append(material)
+    scene.collection.objects.link(obj)
+    return obj
+
+def build_stage(scene):
+    """Camera, sun and ground plane shared by all synthetic scenes."""
+    scene.render.resolution_x, scene.render.resolution_y = SMOKE_RESOLUTION
+    camera = add_object(scene, "Camera", bpy.data.cameras.new("Camera"), location=(0, -12, 7))
+    camera.rotation_euler = (Vector((0, 0, 0)) - camera.location).to_track_quat('-Z', 'Y').to_euler()
+    scene.camera = camera
+    sun = bpy.data.lights.new("Sun", 'SUN')
+    sun.energy = 3.0
+    add_object(scene, "Sun", sun, location=(4, -4, 10)).rotation_euler = (0.6, 0.2, 0.8)
+    positions, counts, indices = grid_arrays(2, 30)
+    add_object(scene, "Ground", mesh_from_arrays("Ground", positions, counts, indices), location=(0, 0, -1),
+               material=new_material("Ground", (0.5, 0.5, 0.5, 1)))
+
+def build_spheres(scene):
+    """Many instances of one sphere: object sync overhead with little geometry."""
+    bpy.ops.mesh.primitive_uv_sphere_add(segments=32, ring_count=16, radius=0.35)
+    mesh = bpy.context.object.data
+    bpy.data.objects.remove(bpy.context.object)
+    material = new_material("Spheres", (0.8, 0.3, 0.2, 1))
+    for i in range(20):
+        for j in range(20):
+            add_object(scene, f"Sphere_{i:02d}_{j:02d}", mesh, location=(i * 0.8 - 7.6, j * 0.8 - 7.6, 0),
+                       material=material if i == 0 and j == 0 else None)
+
+def build_dense_mesh(scene):
+    """One million vertex mesh: BVH build and geometry upload."""
+    positions, counts, indices = grid_arrays(1000, 10)
+    add_object(scene, "DenseMesh", mesh_from_arrays("DenseMesh", positions, counts, indices),
+               material=new_material("DenseMesh", (0.2, 0.4, 0.8, 1)))
+
+def build_textures(scene):
+    """Planes with large float images: image loading and texture memory."""
+    positions, counts, indices = grid_arrays(2, 3)
+    uvs = np.array([[0, 0], [1, 0], [1, 1], [0, 1]], dtype=np.float32)
+    for index in range(8):
+        image = bpy.data.images.new(f"Texture_{index}", 2048, 2048, float_buffer=True)
+        image.generated_type = 'COLOR_GRID' if index % 2 else 'UV_GRID'
+        material = new_material(f"Texture_{index}", (1, 1, 1, 1))
+        nodes, links = material.node_tree.nodes, material.node_tree.links
+        texture = nodes.new("ShaderNodeTexImage")
+        texture.image = image
+        links.new(texture.outputs["Color"], nodes["Principled BSDF"].inputs["Base Color"])
+        mesh = mesh_from_arrays(f"Plane_{index}", positions, counts, indices, uvs)
+        add_object(scene, f"Plane_{index}", mesh, location=((index % 4) * 3.2 - 4.8, (index // 4) * 3.2 - 1.6, 0),
+                   material=material)
+
+SMOKE_SCENES = {
+    "spheres": build_spheres,
+    "dense_mesh": build_dense_mesh,
+    "textures": build_textures,
+}
+if sorted(SMOKE_SCENES) != sorted(SMOKE_SCENE_NAMES):
+    raise RuntimeError(f"Smoke scene builders {sorted(SMOKE_SCENES)} do not match SMOKE_SCENE_NAMES")
+
+def build_smoke_scene(name):
+    """Replace the open file with an empty scene and build the named synthetic scene in it."""
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    scene = bpy.context.scene
+    build_stage(scene)
+    SMOKE_SCENES[name](scene)
+    return scene
+
+def benchmark_render(blend_file_path=None, smoke_scene=None, settings=None, output_path=None):
+    """Load a .blend file or build a synthetic scene, render one frame under settings and time both.
+
+    Cycles renders on the CPU with a fixed seed so runs on the same machine are comparable.
+    """
+    start = time.perf_counter()
+    if smoke_scene:
+        scene = build_smoke_scene(smoke_scene)
+    else:
+        bpy.ops.wm.open_mainfile(filepath=blend_file_path)
+        scene = bpy.context.scene
+    timings = {"load": time.perf_counter() - start}
+
+    apply_render_settings(scene, dict(settings or {}, output=output_path))
+    if scene.render.engine == 'CYCLES':
+        scene.cycles.device = 'CPU'
+        scene.cycles.seed = 0
+        scene.cycles.use_animated_seed = False
+
+    start = time.perf_counter()
+    bpy.ops.render.render(write_still=bool(output_path))
+    timings["render"] = time.perf_counter() - start
+
+    return {
+        "timings": timings,
+        "engine": scene.render.engine,
+        "resolution": list(output_size(scene)),
+        "objects": len(scene.objects),
+        "blender_version": bpy.app.version_string,
+    }
+
+def run_from_command_line(args):
+    parser = argparse.ArgumentParser(description="Render one benchmark scene and print its timings.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--blend")
+    source.add_argument("--smoke", choices=SMOKE_SCENE_NAMES)
+    parser.add_argument("--settings", default="{}", help="JSON render settings, see render_worker")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args(args)
+    print_result(benchmark_render(args.blend, args.smoke, json.loads(args.settings), args.output))
+
+def main():
+    # blender -b --factory-startup -P benchmark_render_scene.py -- (--blend <file> | --smoke <scene>)
+    if script_args():
+        run_from_command_line(script_args())
+        return
+
+    for name in SMOKE_SCENE_NAMES:
+        result = benchmark_render(smoke_scene=name, settings={"engine": "CYCLES", "samples": 16},
+                                  output_path=f"smoke-{name}.png")
+        print(name, result)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import bpy
+import math
+import os
+import sys
+import time
+from bpy_extras.object_utils import world_to_camera_view
+
+# Blender does not put the script folder on sys.path when run with -P
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from calculate_distance import is_object_visible
+
+# Run with: blender -b --factory-startup -P benchmark_visibility.py
+
+def is_object_visible_per_vertex(camera, obj, scene):
+    """The original per-vertex implementation of is_object_visible, kept as the reference."""
+    cam_ob = bpy.data.objects[camera.name]
+    for vertex in obj.data.vertices:
+        co_world = obj.matrix_world @ vertex.co
+        co_cam = world_to_camera_view(scene, cam_ob, co_world)
+        if 0.0 <= co_cam.x <= 1.0 and 0.0 <= co_cam.y <= 1.0 and co_cam.z >= 0.0:
+            return True
+    return False
+
+def create_scene(num_objects, subdivisions):
+    """Create a camera and a ring of high-poly spheres, some of them behind or beside the camera."""
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    scene = bpy.context.scene
+
+    camera_data = bpy.data.cameras.new("Camera")
+    camera = bpy.data.objects.new("Camera", camera_data)
+    scene.collection.objects.link(camera)
+    scene.camera = camera
+    camera.location = (0, 0, 0)
+    camera.rotation_euler = (math.radians(90), 0, 0)
+
+    for i in range(num_objects):
+        angle = 2 * math.pi * i / num_objects
+        bpy.ops.mesh.primitive_uv_sphere_add(segments=subdivisions, ring_count=subdivisions // 2,
+                                             location=(20 * math.sin(angle), 20 * math.cos(angle), 0))
+    return scene, camera
+
+def main():
+    scene, camera = create_scene(num_objects=24, subdivisions=256)
+    objects = [obj for obj in scene.objects if obj.type == 'MESH']
+    num_vertices = sum(len(obj.data.vertices) for obj in objects)
+    print(f"{len(objects)} objects, {num_vertices} vertices")
+
+    start = time.perf_counter()
+    reference = [is_object_visible_per_vertex(camera, obj, scene) for obj in objects]
+    reference_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vectorized = [is_object_visible(camera, obj, scene) for obj in objects]
+    vectorized_time = time.perf_counter() - start
+
+    print(f"  per-vertex: {reference_time:.3f}s, {sum(reference)} visible")
+    print(f"  vectorized: {vectorized_time:.3f}s, {sum(vectorized)} visible")
+    print(f"  results match: {reference == vectorized}, speedup: {reference_time / vectorized_time:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import bpy
+import os
+import sys
+import tempfile
+import time
+
+# Blender does not put the script folder on sys.path when run with -P
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from blender_export_script import write_ply
+
+# Run with: blender -b --factory-startup -P benchmark_write_ply.py
+
+def create_grid_object(subdivisions):
+    """Create a synthetic grid mesh with about subdivisions**2 vertices."""
+    bpy.ops.mesh.primitive_grid_add(x_subdivisions=subdivisions, y_subdivisions=subdivisions, size=10)
+    return bpy.context.active_object
+
+def time_write(filepath, obj, file_format):
+    start = time.perf_counter()
+    write_ply(filepath, obj, file_format)
+    elapsed = time.perf_counter() - start
+    return elapsed, os.path.getsize(filepath)
+
+def main():
+    output_folder = tempfile.mkdtemp(prefix="ply_benchmark_")
+
+    for subdivisions in [100, 300, 1000]:
+        obj = create_grid_object(subdivisions)
+        num_vertices = len(obj.data.vertices)
+
+        ascii_time, ascii_size = time_write(os.path.join(output_folder, "grid_ascii.ply"), obj, 'ascii')
+        binary_time, binary_size = time_write(os.path.join(output_folder, "grid_binary.ply"), obj, 'binary_little_endian')
+
+        print(f"{num_vertices} vertices, {len(obj.data.polygons)} faces")
+        print(f"  ascii:  {ascii_time:.3f}s, {ascii_size / 1e6:.2f} MB")
+        print(f"  binary: {binary_time:.3f}s, {binary_size / 1e6:.2f} MB")
+        print(f"  speedup: {ascii_time / binary_time:.1f}x, size ratio: {ascii_size / binary_size:.1f}x")
+
+        bpy.data.objects.remove(obj, do_unlink=True)
+
+if __name__ == "__main__":
+    main()
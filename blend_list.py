@@ -0,0 +1,16 @@
+# Scenes of blender_dataset the batch scripts work through, relative to the repository folder
+BLEND_LIST = [
+    "../blender_dataset/Blender_partytug.blend",
+    "../blender_dataset/barbershop_interior.blend",
+    "../blender_dataset/blender-3.3-splash.blend",
+    "../blender_dataset/castle-landscape.blend",
+    "../blender_dataset/lone-monk_cycles_and_exposure-node_demo.blend",
+    "../blender_dataset/ocean-scene.blend",
+    "../blender_dataset/classroom/classroom.blend",
+    "../blender_dataset/restaurant_anim_test/rain_restaurant.blend",
+    "../blender_dataset/splash279/splash279.blend",
+    "../blender_dataset/blender-278-splash/Blenderman.blend",
+]
+
+# Synthetic scenes benchmark_render_scene builds, kept here so render_benchmark can list them without bpy
+SMOKE_SCENE_NAMES = ["spheres", "dense_mesh", "textures"]
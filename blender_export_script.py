@@ -1,9 +1,23 @@
 import bpy
+import argparse
+import hashlib
+import json
 import os
+import sys
+import time
+import numpy as np
 from pathlib import Path
 
-def export_textures(blend_file_path, export_folder):
-    bpy.ops.wm.open_mainfile(filepath=blend_file_path)
+# Blender does not put the script folder on sys.path when run with -P
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from blender_process import print_result, script_args
+from columnar import write_columns
+from mesh_stream import (PLY_FORMATS, face_buffer, loop_normals, ply_header, write_ply_streaming,
+                         write_vertex_data_streaming)
+
+def export_textures(blend_file_path, export_folder, load=True):
+    if load:
+        bpy.ops.wm.open_mainfile(filepath=blend_file_path)
     if not os.path.exists(export_folder):
         os.makedirs(export_folder)
     for image in bpy.data.images:
@@ -23,8 +37,9 @@ def export_textures(blend_file_path, export_folder):
         image.save()
     print("Textures exported successfully.")
 
-def export_materials(blend_file_path, export_folder):
-    bpy.ops.wm.open_mainfile(filepath=blend_file_path)
+def export_materials(blend_file_path, export_folder, load=True):
+    if load:
+        bpy.ops.wm.open_mainfile(filepath=blend_file_path)
     if not os.path.exists(export_folder):
         os.makedirs(export_folder)
     for material in bpy.data.materials:
@@ -49,8 +64,18 @@ def ensure_ply_export_addon():
     if not bpy.ops.wm.addon_enable(module='io_mesh_ply'):
         bpy.ops.wm.addon_enable(module='io_mesh_ply')
 
-def write_ply(filepath, obj):
-    """Write the given object as a PLY file to the specified filepath."""
+def write_ply(filepath, obj, file_format='ascii'):
+    """Write the given object as a PLY file to the specified filepath.
+
+    file_format is either 'ascii' or 'binary_little_endian'. The binary mode
+    reads coordinates and loop indices with foreach_get and writes whole buffers.
+    """
+    if file_format not in PLY_FORMATS:
+        raise ValueError(f"Unknown PLY format '{file_format}', expected one of {PLY_FORMATS}")
+    if file_format == 'binary_little_endian':
+        write_ply_binary(filepath, obj)
+        return
+
     vertices = obj.data.vertices
     faces = obj.data.polygons
 
@@ -78,26 +103,143 @@ def write_ply(filepath, obj):
                 file.write(f" {vert_index}")
             file.write("\n")
 
-def export_all_objects_as_ply(blend_file_path, export_folder):
+def write_ply_binary(filepath, obj):
+    """Write the given object as a binary little-endian PLY file."""
+    mesh = obj.data
+
+    # Pull the mesh data into flat arrays
+    coords = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", coords)
+    loop_totals = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+    vertex_indices = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", vertex_indices)
+
+    if len(loop_totals) and loop_totals.max() > 255:
+        raise ValueError(f"Object {obj.name} has faces with more than 255 vertices")
+
+    with open(filepath, 'wb') as file:
+        file.write(ply_header(len(mesh.vertices), len(mesh.polygons), 'binary_little_endian'))
+        file.write(coords.astype('<f4').tobytes())
+        file.write(face_buffer(loop_totals, vertex_indices).tobytes())
+
+MANIFEST_NAME = "export_manifest.json"
+INSTANCES_NAME = "instances.json"
+
+def mesh_hash(mesh, options):
+    """Hash the mesh data that is written to the PLY file together with the export options."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(options, sort_keys=True).encode())
+    for collection, attribute, dtype, width in ((mesh.vertices, "co", np.float32, 3),
+                                                (mesh.polygons, "loop_total", np.int32, 1),
+                                                (mesh.loops, "vertex_index", np.int32, 1)):
+        data = np.empty(len(collection) * width, dtype=dtype)
+        collection.foreach_get(attribute, data)
+        digest.update(len(collection).to_bytes(8, "little"))
+        digest.update(data.tobytes())
+    return digest.hexdigest()
+
+def load_manifest(export_folder):
+    """Load the export manifest of a folder, or an empty one if there is none yet."""
+    manifest_path = os.path.join(export_folder, MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            return json.load(f)
+    return {"objects": {}, "total_hits": 0, "total_misses": 0}
+
+def save_manifest(export_folder, manifest):
+    manifest_path = os.path.join(export_folder, MANIFEST_NAME)
+    with open(manifest_path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(manifest_path + ".tmp", manifest_path)
+
+def export_all_objects_as_ply(blend_file_path, export_folder, file_format='ascii', load=True, use_cache=True,
+                              deduplicate=False, memory_budget=None):
+    """Export every mesh object to its own PLY file.
+
+    With use_cache, objects whose mesh hash matches the manifest in export_folder
+    and whose PLY file still exists are skipped. With deduplicate, objects that
+    share a mesh datablock or have identical mesh data are written once, and
+    instances.json maps every object to its PLY file and world matrix; PLY
+    files left from earlier runs for the objects that are now instances are
+    deleted so the folder does not hold stale copies. With
+    memory_budget (bytes), meshes are streamed in chunks by write_ply_streaming.
+    """
     # Load the .blend file
-    bpy.ops.wm.open_mainfile(filepath=blend_file_path)
+    if load:
+        bpy.ops.wm.open_mainfile(filepath=blend_file_path)
 
     # Ensure the export folder exists
     if not os.path.exists(export_folder):
         os.makedirs(export_folder)
 
+    manifest = load_manifest(export_folder)
+    cached_objects = manifest["objects"]
+    manifest["objects"] = {}
+    hits = misses = 0
+
+    options = {"file_format": file_format}
+    mesh_hashes = {}
+    written_files = {}
+    instances = {}
+
     # Loop through all mesh objects and export them separately
     for obj in bpy.data.objects:
         if obj.type == 'MESH':
             # Define the export path
             export_path = os.path.join(export_folder, f"{obj.name}.ply")
 
+            digest = None
+            if use_cache or deduplicate:
+                # Linked duplicates share the mesh datablock, hash it only once. name_full
+                # tells apart meshes of the same name linked from different libraries.
+                digest = mesh_hashes.get(obj.data.name_full)
+                if digest is None:
+                    digest = mesh_hash(obj.data, options)
+                    mesh_hashes[obj.data.name_full] = digest
+
+            if deduplicate:
+                if digest in written_files:
+                    instances[obj.name] = {"mesh_file": written_files[digest],
+                                           "matrix_world": [list(row) for row in obj.matrix_world]}
+                    if os.path.exists(export_path):
+                        os.remove(export_path)
+                        print(f"Removed {export_path}, superseded by {written_files[digest]}")
+                    continue
+                written_files[digest] = os.path.basename(export_path)
+                instances[obj.name] = {"mesh_file": os.path.basename(export_path),
+                                       "matrix_world": [list(row) for row in obj.matrix_world]}
+
+            if use_cache:
+                manifest["objects"][obj.name] = {"hash": digest, "file": os.path.basename(export_path)}
+                cached = cached_objects.get(obj.name)
+                if cached and cached["hash"] == digest and os.path.exists(export_path):
+                    hits += 1
+                    continue
+                misses += 1
+
             # Write the PLY file
-            write_ply(export_path, obj)
+            if memory_budget:
+                write_ply_streaming(export_path, obj, file_format, memory_budget)
+            else:
+                write_ply(export_path, obj, file_format)
             print(f"PLY file exported to: {export_path}")
 
-def export_animations(blend_file_path, export_folder):
-    bpy.ops.wm.open_mainfile(filepath=blend_file_path)
+    if deduplicate:
+        with open(os.path.join(export_folder, INSTANCES_NAME), "w") as f:
+            json.dump(instances, f, indent=1)
+        print(f"{len(instances)} mesh objects share {len(written_files)} unique meshes")
+
+    if use_cache:
+        manifest["last_run"] = {"hits": hits, "misses": misses}
+        manifest["total_hits"] += hits
+        manifest["total_misses"] += misses
+        save_manifest(export_folder, manifest)
+        print(f"Export cache: {hits} unchanged objects skipped, {misses} exported")
+
+def export_animations(blend_file_path, export_folder, load=True):
+    if load:
+        bpy.ops.wm.open_mainfile(filepath=blend_file_path)
     if not os.path.exists(export_folder):
         os.makedirs(export_folder)
     for obj in bpy.data.objects:
@@ -113,8 +255,9 @@ def export_animations(blend_file_path, export_folder):
                         f.write(f"  frame: {keyframe.co[0]}, value: {keyframe.co[1]}\n")
     print("Animations exported successfully.")
 
-def export_cameras(blend_file_path, export_folder):
-    bpy.ops.wm.open_mainfile(filepath=blend_file_path)
+def export_cameras(blend_file_path, export_folder, load=True):
+    if load:
+        bpy.ops.wm.open_mainfile(filepath=blend_file_path)
     if not os.path.exists(export_folder):
         os.makedirs(export_folder)
     for cam in [obj for obj in bpy.data.objects if obj.type == 'CAMERA']:
@@ -129,8 +272,9 @@ def export_cameras(blend_file_path, export_folder):
             f.write(f"Sensor Height: {cam.data.sensor_height}\n")
     print("Cameras exported successfully.")
 
-def export_lights(blend_file_path, export_folder):
-    bpy.ops.wm.open_mainfile(filepath=blend_file_path)
+def export_lights(blend_file_path, export_folder, load=True):
+    if load:
+        bpy.ops.wm.open_mainfile(filepath=blend_file_path)
     if not os.path.exists(export_folder):
         os.makedirs(export_folder)
     for light in [obj for obj in bpy.data.objects if obj.type == 'LIGHT']:
@@ -145,8 +289,9 @@ def export_lights(blend_file_path, export_folder):
             f.write(f"Color: {light.data.color[0]}, {light.data.color[1]}, {light.data.color[2]}\n")
     print("Lights exported successfully.")
 
-def export_transformations(blend_file_path, export_folder):
-    bpy.ops.wm.open_mainfile(filepath=blend_file_path)
+def export_transformations(blend_file_path, export_folder, load=True):
+    if load:
+        bpy.ops.wm.open_mainfile(filepath=blend_file_path)
     if not os.path.exists(export_folder):
         os.makedirs(export_folder)
     for obj in bpy.data.objects:
@@ -159,24 +304,38 @@ def export_transformations(blend_file_path, export_folder):
             f.write(f"Scale: {obj.scale.x}, {obj.scale.y}, {obj.scale.z}\n")
     print("Transformations exported successfully.")
 
-def export_vertex_data(blend_file_path, export_folder):
-    bpy.ops.wm.open_mainfile(filepath=blend_file_path)
+def vertex_data_arrays(mesh):
+    """Read vertex positions, loop normals and UVs of a mesh into typed arrays."""
+    arrays = {}
+    normals, normal_attribute = loop_normals(mesh)
+    for name, collection, attribute, dtype, width in (
+            ("positions", mesh.vertices, "co", np.float32, 3),
+            ("normals", normals, normal_attribute, np.float32, 3),
+            ("loop_vertex_index", mesh.loops, "vertex_index", np.int32, 1),
+            ("polygon_loop_total", mesh.polygons, "loop_total", np.int32, 1)):
+        data = np.empty(len(collection) * width, dtype=dtype)
+        collection.foreach_get(attribute, data)
+        arrays[name] = data.reshape(-1, width) if width > 1 else data
+    for uv_layer in mesh.uv_layers:
+        data = np.empty(len(uv_layer.data) * 2, dtype=np.float32)
+        uv_layer.data.foreach_get("uv", data)
+        arrays[f"uv:{uv_layer.name}"] = data.reshape(-1, 2)
+    return arrays
+
+def export_vertex_data(blend_file_path, export_folder, load=True, memory_budget=None):
+    """Write the vertex data of every mesh object to a .vtx column file (see columnar.py)."""
+    if load:
+        bpy.ops.wm.open_mainfile(filepath=blend_file_path)
     if not os.path.exists(export_folder):
         os.makedirs(export_folder)
     for obj in bpy.data.objects:
         if obj.type == 'MESH':
-            mesh = obj.data
             mesh_name = obj.name
-            mesh_path = os.path.join(export_folder, f"{mesh_name}.verts")
-            with open(mesh_path, 'w') as f:
-                f.write(f"Mesh: {mesh_name}\n")
-                for vert in mesh.vertices:
-                    f.write(f"Vertex: {vert.co.x}, {vert.co.y}, {vert.co.z}\n")
-                for loop in mesh.loops:
-                    f.write(f"Normal: {loop.normal.x}, {loop.normal.y}, {loop.normal.z}\n")
-                for uv_layer in mesh.uv_layers:
-                    for uv in uv_layer.data:
-                        f.write(f"UV: {uv.uv.x}, {uv.uv.y}\n")
+            mesh_path = os.path.join(export_folder, f"{mesh_name}.vtx")
+            if memory_budget:
+                write_vertex_data_streaming(mesh_path, obj.data, {"mesh": mesh_name}, memory_budget)
+            else:
+                write_columns(mesh_path, vertex_data_arrays(obj.data), meta={"mesh": mesh_name})
     print("Vertex data exported successfully.")
 
 def list_object_types(blend_file_path):
@@ -188,7 +347,72 @@ def list_object_types(blend_file_path):
     for obj_type in object_types:
         print(obj_type)
 
+EXPORTERS = {
+    "textures": export_textures,
+    "materials": export_materials,
+    "animations": export_animations,
+    "cameras": export_cameras,
+    "lights": export_lights,
+    "transformations": export_transformations,
+    "vertex_data": export_vertex_data,
+    "ply": export_all_objects_as_ply,
+}
+
+def export_pipeline(blend_file_path, export_folder, exporters=("ply",), ply_format='binary_little_endian',
+                    memory_budget=None, load=True):
+    """Open the .blend file once and run the chosen exporters over the loaded data.
+
+    PLY files go straight into export_folder, every other exporter writes to a
+    subfolder named after it. Returns the time in seconds spent on loading and
+    on each exporter. memory_budget (bytes) switches the PLY and vertex data
+    exporters to chunked streaming. With load=False the file must already be open.
+    """
+    for name in exporters:
+        if name not in EXPORTERS:
+            raise ValueError(f"Unknown exporter '{name}', expected one of {list(EXPORTERS)}")
+
+    timings = {}
+
+    if load:
+        start = time.perf_counter()
+        bpy.ops.wm.open_mainfile(filepath=blend_file_path)
+        timings["load"] = time.perf_counter() - start
+        print(f"Loaded {blend_file_path} in {timings['load']:.2f}s")
+
+    for name in exporters:
+        start = time.perf_counter()
+        if name == "ply":
+            export_all_objects_as_ply(blend_file_path, export_folder, ply_format, load=False,
+                                      memory_budget=memory_budget)
+        elif name == "vertex_data":
+            export_vertex_data(blend_file_path, os.path.join(export_folder, name), load=False,
+                               memory_budget=memory_budget)
+        else:
+            EXPORTERS[name](blend_file_path, os.path.join(export_folder, name), load=False)
+        timings[name] = time.perf_counter() - start
+        print(f"Exported {name} in {timings[name]:.2f}s")
+
+    return timings
+
+def run_from_command_line(args):
+    """Export a single .blend file, used by the batch_export.py worker processes."""
+    parser = argparse.ArgumentParser(description="Export data from a single .blend file.")
+    parser.add_argument("--blend", required=True)
+    parser.add_argument("--export-folder", required=True)
+    parser.add_argument("--exporters", default="ply")
+    parser.add_argument("--memory-budget", type=int, default=None, help="Stream meshes in chunks of this many bytes")
+    args = parser.parse_args(args)
+
+    timings = export_pipeline(args.blend, args.export_folder, args.exporters.split(","),
+                              memory_budget=args.memory_budget)
+    print_result({"blend_file": args.blend, "timings": timings})
+
 def main():
+    # blender -b -P blender_export_script.py -- --blend <file> --export-folder <folder>
+    if script_args():
+        run_from_command_line(script_args())
+        return
+
     base_export_folder = "../blender_dataset-ply"
 
     blend_list = [
@@ -210,26 +434,11 @@ def main():
         filename = Path(blend_file_path).stem
         export_folder = os.path.join(base_export_folder, filename)
 
-        # Create export folders
-        # texture_folder = base_export_folder, "textures")
-        # material_folder = os.path.join(base_export_folder, "materials")
-        # animation_folder = os.path.join(base_export_folder, "animations")
-        # camera_folder = os.path.join(base_export_folder, "cameras")
-        # light_folder = os.path.join(base_export_folder, "lights")
-        # transformation_folder = os.path.join(base_export_folder, "transformations")
-        # vertex_folder = os.path.join(base_export_folder, "vertex_data")
-
-        # Export data
-        # export_textures(blend_file_path, export_folder)
-        # export_materials(blend_file_path, material_folder)
-        # export_animations(blend_file_path, animation_folder)
-        # export_cameras(blend_file_path, camera_folder)
-        # export_lights(blend_file_path, light_folder)
-        # export_transformations(blend_file_path, transformation_folder)
-        # export_vertex_data(blend_file_path, vertex_folder)
-        # list_object_types(blend_file_path)
-
-        export_all_objects_as_ply(blend_file_path, export_folder)
+        # Export data, the .blend file is loaded only once for all exporters
+        # exporters = ("textures", "materials", "animations", "cameras",
+        #              "lights", "transformations", "vertex_data", "ply")
+        exporters = ("ply",)
+        export_pipeline(blend_file_path, export_folder, exporters)
 
 if __name__ == "__main__":
     main()
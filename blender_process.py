@@ -0,0 +1,71 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+
+# Path to the Blender executable, override with the BLENDER environment variable
+BLENDER = os.environ.get("BLENDER", "blender")
+
+# Prefix of the stdout line a worker script uses to hand results back to the driver
+RESULT_PREFIX = "BLENDER_RESULT "
+
+def script_args():
+    """Return the arguments passed to a Blender script after '--'."""
+    if "--" in sys.argv:
+        return sys.argv[sys.argv.index("--") + 1:]
+    return []
+
+def print_result(result):
+    """Print a JSON result line for the driver process to pick up."""
+    print(RESULT_PREFIX + json.dumps(result), flush=True)
+
+def parse_result(lines):
+    """Return the last result printed by a worker, or None if there is none."""
+    for line in reversed(lines):
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+    return None
+
+def blender_command(args, threads=None):
+    """Return the command line of a headless Blender process running with args."""
+    command = [BLENDER, "-b", "--python-exit-code", "1"]
+    if threads:
+        command += ["-t", str(threads)]
+    return command + list(args)
+
+def run_blender(args, timeout=None, threads=None, on_line=None):
+    """Run a headless Blender process and return its exit code and output lines.
+
+    on_line is called with every line of output as it arrives. A process that
+    runs longer than timeout seconds is killed and reported with exit code None.
+    """
+    command = blender_command(args, threads)
+
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                               text=True, errors="replace")
+    timed_out = threading.Event()
+
+    def kill():
+        timed_out.set()
+        process.kill()
+
+    timer = threading.Timer(timeout, kill) if timeout else None
+    if timer:
+        timer.start()
+
+    lines = []
+    try:
+        for line in process.stdout:
+            line = line.rstrip("\n")
+            lines.append(line)
+            if on_line:
+                on_line(line)
+        process.wait()
+    finally:
+        if timer:
+            timer.cancel()
+
+    if timed_out.is_set():
+        return None, lines
+    return process.returncode, lines
@@ -1,7 +1,13 @@
 import bpy
 import math
+import os
+import sys
 import mathutils
-from bpy_extras.object_utils import world_to_camera_view
+import numpy as np
+
+# Blender does not put the script folder on sys.path when run with -P
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from scene_index import SceneIndex
 
 
 def calculate_distance(obj1, obj2):
@@ -61,20 +67,78 @@ def render_image(output_image_path):
     bpy.ops.render.render(write_still=True)
     print(f"Rendered image saved at {output_image_path}")
 
+def mesh_world_coords(obj):
+    """Return the world-space coordinates of the object's mesh vertices as an (N, 3) array."""
+    mesh = obj.data
+    coords = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", coords)
+    matrix = np.array(obj.matrix_world, dtype=np.float64)
+    return coords.reshape(-1, 3) @ matrix[:3, :3].T + matrix[:3, 3]
+
+def world_to_camera_view_array(scene, cam_ob, coords):
+    """Vectorized world_to_camera_view for an (N, 3) array of world coordinates.
+
+    Returns an (N, 3) array of normalized x, y and depth, the same values
+    world_to_camera_view returns for each point.
+    """
+    view_matrix = np.array(cam_ob.matrix_world.normalized().inverted(), dtype=np.float64)
+    co_local = coords @ view_matrix[:3, :3].T + view_matrix[:3, 3]
+    z = -co_local[:, 2]
+
+    camera = cam_ob.data
+    frame = [v for v in camera.view_frame(scene=scene)[:3]]
+    min_x, max_x = frame[2].x, frame[1].x
+    min_y, max_y = frame[1].y, frame[0].y
+
+    if camera.type != 'ORTHO':
+        # The view frame is scaled to the depth of each point
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scale = z / -frame[0].z
+            x = (co_local[:, 0] - min_x * scale) / ((max_x - min_x) * scale)
+            y = (co_local[:, 1] - min_y * scale) / ((max_y - min_y) * scale)
+        # world_to_camera_view returns (0.5, 0.5, 0) for points in the camera plane
+        x = np.where(z == 0.0, 0.5, x)
+        y = np.where(z == 0.0, 0.5, y)
+    else:
+        x = (co_local[:, 0] - min_x) / (max_x - min_x)
+        y = (co_local[:, 1] - min_y) / (max_y - min_y)
+
+    return np.column_stack([x, y, z])
+
+def in_camera_view(co_cam):
+    """Return a boolean mask of the camera view coordinates that fall inside the frame."""
+    x, y, z = co_cam[:, 0], co_cam[:, 1], co_cam[:, 2]
+    return (0.0 <= x) & (x <= 1.0) & (0.0 <= y) & (y <= 1.0) & (z >= 0.0)
+
 def is_object_visible(camera, obj, scene):
     """Check if the object is within the camera's view."""
     cam_ob = bpy.data.objects[camera.name]
-    for vertex in obj.data.vertices:
-        co_world = obj.matrix_world @ vertex.co
-        co_cam = world_to_camera_view(scene, cam_ob, co_world)
-        if 0.0 <= co_cam.x <= 1.0 and 0.0 <= co_cam.y <= 1.0 and co_cam.z >= 0.0:
-            return True
-    return False
+    coords = mesh_world_coords(obj)
+    if not len(coords):
+        return False
+    return bool(in_camera_view(world_to_camera_view_array(scene, cam_ob, coords)).any())
+
+def visible_objects(camera, scene, index=None):
+    """Return the names of the mesh objects within the camera's view.
+
+    Objects whose bounds are entirely inside or outside the frustum are decided
+    by the SceneIndex; only the straddling ones are tested vertex by vertex.
+    """
+    cam_ob = bpy.data.objects[camera.name]
+    if index is None:
+        index = SceneIndex(scene.objects)
+    inside, outside, straddling = index.classify(cam_ob, scene)
+    visible = set(inside)
+    for obj_name in straddling:
+        if is_object_visible(camera, bpy.data.objects[obj_name], scene):
+            visible.add(obj_name)
+    return visible
 
 def remove_invisible_objects(camera, scene):
     """Remove objects that are not visible from the camera's view."""
-    for obj in bpy.context.scene.objects:
-        if obj.type == 'MESH' and not is_object_visible(camera, obj, scene):
+    visible = visible_objects(camera, scene)
+    for obj in list(bpy.context.scene.objects):
+        if obj.type == 'MESH' and obj.name not in visible:
             bpy.data.objects.remove(obj, do_unlink=True)
 
 def main():
@@ -105,22 +169,18 @@ def main():
 
 
 
-    # List to store distances and visibility status
-    distances = []
-
-    # Iterate over all objects in the scene
-    for obj in bpy.context.scene.objects:
-        if obj.type == 'MESH':  # Only consider mesh objects
-            distance = calculate_distance(camera_obj, obj)
-            visible = is_object_visible(camera_obj, obj, bpy.context.scene)
-            distances.append((obj.name, distance, obj, visible))
+    # Index the world-space bounds of the mesh objects once for the scene
+    index = SceneIndex(bpy.context.scene.objects)
+    inside, outside, straddling = index.classify(camera_obj, bpy.context.scene)
+    print(f"Objects inside the view: {len(inside)}, outside: {len(outside)}, partly inside: {len(straddling)}")
+    visible = visible_objects(camera_obj, bpy.context.scene, index)
 
-    # Sort the distances in descending order
-    distances.sort(key=lambda x: x[1], reverse=True)
+    # Distances from the camera to the object bounds, in descending order
+    distances = index.sorted_by_distance(camera_obj.matrix_world.translation, mode="nearest", reverse=True)
 
     # Display the distances and visibility status
-    for obj_name, distance, obj, visible in distances:
-        print(f"Distance from camera to {obj_name}: {distance:.2f}, Visible: {visible}")
+    for obj_name, distance in distances:
+        print(f"Distance from camera to {obj_name}: {distance:.2f}, Visible: {obj_name in visible}")
 
 
     # Get the object with the largest distance
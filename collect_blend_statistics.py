@@ -1,7 +1,12 @@
 import bpy
 import os
+import sys
 import pandas as pd
 
+# Blender does not put the script folder on sys.path when run with -P
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from blend_list import BLEND_LIST
+
 def collect_statistics(blend_file_path):
     # Load the .blend file
     bpy.ops.wm.open_mainfile(filepath=blend_file_path)
@@ -60,21 +65,7 @@ def print_statistics(statistics):
 
 
 def main():
-    blend_file_paths = [
-        "../blender_dataset/ocean-scene.blend",
-        "../blender_dataset/blender-3.3-splash.blend",
-        "../blender_dataset/Blender_partytug.blend",
-        "../blender_dataset/castle-landscape.blend",
-        "../blender_dataset/lone-monk_cycles_and_exposure-node_demo.blend",
-        "../blender_dataset/barbershop_interior.blend",
-        "../blender_dataset/blender-278-splash/Blenderman.blend",
-        "../blender_dataset/splash279/splash279.blend",
-        "../blender_dataset/restaurant_anim_test/rain_restaurant.blend",
-        "../blender_dataset/classroom/classroom.blend",
-        # Add more file paths as needed
-    ]
-
-    statistics = collect_statistics_from_files(blend_file_paths)
+    statistics = collect_statistics_from_files(BLEND_LIST)
     print_statistics(statistics)
 
 if __name__ == "__main__":
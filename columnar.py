@@ -0,0 +1,76 @@
+import json
+import numpy as np
+
+# File layout: magic, uint64 header length, JSON header, then one raw array per
+# column, each starting on an ALIGNMENT byte boundary so it can be memory-mapped.
+MAGIC = b"COLUMNS1"
+ALIGNMENT = 64
+
+def _layout(specs, meta):
+    """Return the encoded header and column offsets for {name: (dtype, shape)} specs."""
+    columns = {name: {"dtype": np.dtype(dtype).str, "shape": list(shape)} for name, (dtype, shape) in specs.items()}
+
+    # The offsets are part of the header, so grow the header until they stop moving
+    header_size = 0
+    while True:
+        offset = len(MAGIC) + 8 + header_size
+        for column in columns.values():
+            offset = -(-offset // ALIGNMENT) * ALIGNMENT
+            column["offset"] = offset
+            offset += int(np.prod(column["shape"], dtype=np.int64)) * np.dtype(column["dtype"]).itemsize
+        header = json.dumps({"meta": meta or {}, "columns": columns}).encode()
+        if len(header) <= header_size:
+            return header.ljust(header_size), columns
+        header_size = len(header) + 64
+
+def open_columns(path, specs, meta=None):
+    """Create a column file and return it open for writing, with the column offsets.
+
+    Use this to write columns in pieces: seek to columns[name]["offset"] plus the
+    byte position inside the column and write raw little-endian data there.
+    """
+    header, columns = _layout(specs, meta)
+    f = open(path, "wb")
+    f.write(MAGIC)
+    f.write(len(header).to_bytes(8, "little"))
+    f.write(header)
+    end = max((c["offset"] + int(np.prod(c["shape"], dtype=np.int64)) * np.dtype(c["dtype"]).itemsize
+               for c in columns.values()), default=f.tell())
+    f.truncate(end)
+    return f, columns
+
+def write_columns(path, arrays, meta=None):
+    """Write a dict of NumPy arrays as one typed column each."""
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    specs = {name: (array.dtype.newbyteorder("<"), array.shape) for name, array in arrays.items()}
+    f, columns = open_columns(path, specs, meta)
+    with f:
+        for name, array in arrays.items():
+            f.seek(columns[name]["offset"])
+            f.write(array.astype(columns[name]["dtype"], copy=False).tobytes())
+
+def read_header(path):
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a column file")
+        header_size = int.from_bytes(f.read(8), "little")
+        return json.loads(f.read(header_size))
+
+def read_columns(path, mmap=True):
+    """Read a column file, returning ({name: array}, meta).
+
+    With mmap the arrays are read-only memory maps, so nothing is loaded until
+    it is accessed.
+    """
+    header = read_header(path)
+    arrays = {}
+    for name, column in header["columns"].items():
+        shape = tuple(column["shape"])
+        if mmap and int(np.prod(shape, dtype=np.int64)) > 0:
+            arrays[name] = np.memmap(path, dtype=column["dtype"], mode="r", offset=column["offset"], shape=shape)
+        else:
+            with open(path, "rb") as f:
+                f.seek(column["offset"])
+                count = int(np.prod(shape, dtype=np.int64))
+                arrays[name] = np.fromfile(f, dtype=column["dtype"], count=count).reshape(shape)
+    return arrays, header["meta"]
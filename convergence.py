@@ -0,0 +1,13 @@
+import numpy as np
+
+def image_change(a, b):
+    """RMS difference of two renders, clipped to 0..1 so a few fireflies do not dominate."""
+    return float(np.sqrt(np.mean(np.square(np.clip(a, 0.0, 1.0) - np.clip(b, 0.0, 1.0)))))
+
+def estimate_full_time(passes, max_samples):
+    """Extrapolate the render time at max_samples from the last two (samples, seconds) passes."""
+    if len(passes) < 2:
+        return passes[-1][1] * max_samples / passes[-1][0]
+    (samples_a, time_a), (samples_b, time_b) = passes[-2:]
+    per_sample = max(0.0, (time_b - time_a) / (samples_b - samples_a))
+    return time_b + per_sample * (max_samples - samples_b)
@@ -1,9 +1,16 @@
 import bpy
 import os
+import sys
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 
+# Blender does not put the script folder on sys.path when run with -P
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from blender_export_script import vertex_data_arrays
+from columnar import read_columns, write_columns
+
 def export_vertex_data(blend_file_path, export_folder):
+    """Write the vertex data of every mesh object to a .vtx column file (see columnar.py)."""
     # Load the .blend file
     bpy.ops.wm.open_mainfile(filepath=blend_file_path)
 
@@ -12,42 +19,29 @@ def export_vertex_data(blend_file_path, export_folder):
 
     for obj in bpy.data.objects:
         if obj.type == 'MESH':
-            mesh = obj.data
             mesh_name = obj.name
-            mesh_path = os.path.join(export_folder, f"{mesh_name}.verts")
-            with open(mesh_path, 'w') as f:
-                f.write(f"Mesh: {mesh_name}\n")
-                for vert in mesh.vertices:
-                    f.write(f"Vertex: {vert.co.x}, {vert.co.y}, {vert.co.z}\n")
-                for loop in mesh.loops:
-                    f.write(f"Normal: {loop.normal.x}, {loop.normal.y}, {loop.normal.z}\n")
-                for uv_layer in mesh.uv_layers:
-                    for uv in uv_layer.data:
-                        f.write(f"UV: {uv.uv.x}, {uv.uv.y}\n")
+            mesh_path = os.path.join(export_folder, f"{mesh_name}.vtx")
+            write_columns(mesh_path, vertex_data_arrays(obj.data), meta={"mesh": mesh_name})
     print("Vertex data exported successfully.")
 
 def read_vertex_data(vertex_data_folder):
+    """Return {object name: (N, 3) vertex positions} for every .vtx file in the folder.
+
+    The positions are memory-mapped, so reading is independent of the mesh size.
+    """
     vertex_data = {}
 
     for filename in os.listdir(vertex_data_folder):
-        if filename.endswith(".verts"):
+        if filename.endswith(".vtx"):
             filepath = os.path.join(vertex_data_folder, filename)
-            with open(filepath, 'r') as file:
-                vertices = []
-                for line in file:
-                    if line.startswith("Vertex:"):
-                        parts = line.split(":")[1].strip().split(",")
-                        if len(parts) == 3:
-                            x, y, z = map(float, parts)
-                            vertices.append((x, y, z))
-                        else:
-                            print(f"Skipping malformed vertex line: {line.strip()}")
-
-                if vertices:
-                    obj_name = filename.replace(".verts", "")
-                    vertex_data[obj_name] = vertices
-                else:
-                    print(f"No valid vertices found in file: {filepath}")
+            columns, _ = read_columns(filepath)
+            vertices = columns["positions"]
+
+            if len(vertices):
+                obj_name = filename.replace(".vtx", "")
+                vertex_data[obj_name] = vertices
+            else:
+                print(f"No valid vertices found in file: {filepath}")
 
     return vertex_data
 
@@ -59,9 +53,8 @@ def visualize_vertex_data(vertex_data):
     color_index = 0
 
     for obj_name, vertices in vertex_data.items():
-        if vertices:
-            xs, ys, zs = zip(*vertices)
-            ax.scatter(xs, ys, zs, c=colors[color_index % len(colors)], label=obj_name, s=1)
+        if len(vertices):
+            ax.scatter(vertices[:, 0], vertices[:, 1], vertices[:, 2], c=colors[color_index % len(colors)], label=obj_name, s=1)
             color_index += 1
         else:
             print(f"No vertices to plot for object: {obj_name}")
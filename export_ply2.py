@@ -1,9 +1,35 @@
 import bpy
 import os
+import numpy as np
 
 
-def write_ply(filepath, obj):
-    """Write the given object as a PLY file to the specified filepath."""
+def _face_buffer(loop_totals, vertex_indices):
+    """Pack PLY face records (uchar count + int indices) into one byte buffer."""
+    num_faces = len(loop_totals)
+    counts_offset = np.zeros(num_faces, dtype=np.int64)
+    counts_offset[1:] = np.cumsum(loop_totals[:-1].astype(np.int64) * 4 + 1)
+
+    buffer = np.empty(num_faces + len(vertex_indices) * 4, dtype=np.uint8)
+    is_count = np.zeros(len(buffer), dtype=bool)
+    is_count[counts_offset] = True
+    buffer[is_count] = loop_totals
+    buffer[~is_count] = vertex_indices.astype('<i4').view(np.uint8)
+    return buffer
+
+PLY_FORMATS = ('ascii', 'binary_little_endian')
+
+def write_ply(filepath, obj, file_format='ascii'):
+    """Write the given object as a PLY file to the specified filepath.
+
+    file_format is either 'ascii' or 'binary_little_endian'. The binary mode
+    reads coordinates and loop indices with foreach_get and writes whole buffers.
+    """
+    if file_format not in PLY_FORMATS:
+        raise ValueError(f"Unknown PLY format '{file_format}', expected one of {PLY_FORMATS}")
+    if file_format == 'binary_little_endian':
+        write_ply_binary(filepath, obj)
+        return
+
     vertices = obj.data.vertices
     faces = obj.data.polygons
 
@@ -31,7 +57,38 @@ def write_ply(filepath, obj):
                 file.write(f" {vert_index}")
             file.write("\n")
 
-def export_all_objects_as_ply(blend_file_path, export_folder):
+def write_ply_binary(filepath, obj):
+    """Write the given object as a binary little-endian PLY file."""
+    mesh = obj.data
+
+    # Pull the mesh data into flat arrays
+    coords = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", coords)
+    loop_totals = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+    vertex_indices = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", vertex_indices)
+
+    if len(loop_totals) and loop_totals.max() > 255:
+        raise ValueError(f"Object {obj.name} has faces with more than 255 vertices")
+
+    header = (
+        "ply\n"
+        "format binary_little_endian 1.0\n"
+        f"element vertex {len(mesh.vertices)}\n"
+        "property float x\n"
+        "property float y\n"
+        "property float z\n"
+        f"element face {len(mesh.polygons)}\n"
+        "property list uchar int vertex_indices\n"
+        "end_header\n"
+    )
+    with open(filepath, 'wb') as file:
+        file.write(header.encode('ascii'))
+        file.write(coords.astype('<f4').tobytes())
+        file.write(_face_buffer(loop_totals, vertex_indices).tobytes())
+
+def export_all_objects_as_ply(blend_file_path, export_folder, file_format='ascii'):
     # Load the .blend file
     bpy.ops.wm.open_mainfile(filepath=blend_file_path)
 
@@ -46,11 +103,11 @@ def export_all_objects_as_ply(blend_file_path, export_folder):
             export_path = os.path.join(export_folder, f"{obj.name}.ply")
 
             # Write the PLY file
-            write_ply(export_path, obj)
+            write_ply(export_path, obj, file_format)
             print(f"PLY file exported to: {export_path}")
 
 # Example usage
 blend_file_path = "../blender_dataset/blender-3.3-splash.blend"
 export_folder = "../blender_dataset-ply/blender-3.3-splash"
 
-export_all_objects_as_ply(blend_file_path, export_folder)
+export_all_objects_as_ply(blend_file_path, export_folder, file_format='binary_little_endian')
@@ -0,0 +1,41 @@
+def scaled_resolution(resolution_x, resolution_y, percentage):
+    """Return the pixel size Blender renders at, it rounds resolution * percentage / 100 down."""
+    return resolution_x * percentage // 100, resolution_y * percentage // 100
+
+def output_size(scene):
+    """Return the rendered image size of a scene in pixels."""
+    render = scene.render
+    return scaled_resolution(render.resolution_x, render.resolution_y, render.resolution_percentage)
+
+def split_range(size, count):
+    """Split 0..size into count nearly equal integer intervals."""
+    edges = [round(i * size / count) for i in range(count + 1)]
+    return list(zip(edges[:-1], edges[1:]))
+
+def border_value(pixel, size):
+    """Normalized border coordinate that Blender maps back to exactly this pixel.
+
+    Blender truncates border * size to an integer pixel, so the value is
+    nudged half a pixel in to avoid landing just below it in float precision.
+    """
+    return min(1.0, (pixel + 0.5) / size)
+
+def region_tile(core, width, height, overlap=0):
+    """Return the tile of a (x0, x1, y0, y1) rectangle, rendered grown by overlap pixels clamped to the frame."""
+    x0, x1, y0, y1 = core
+    render = (max(0, x0 - overlap), min(width, x1 + overlap), max(0, y0 - overlap), min(height, y1 + overlap))
+    return {"core": tuple(core), "render": render}
+
+def tile_regions(width, height, tiles_x, tiles_y, overlap=0):
+    """Return the tiles of a width x height frame as dicts of pixel rectangles.
+
+    'core' is the (x0, x1, y0, y1) part of the frame the tile contributes,
+    'render' the core grown by overlap pixels on each side and clamped to the
+    frame. y counts up from the bottom row like Blender's border.
+    """
+    return [region_tile((x0, x1, y0, y1), width, height, overlap)
+            for y0, y1 in split_range(height, tiles_y) for x0, x1 in split_range(width, tiles_x)]
+
+def tile_border(tile, width, height):
+    x0, x1, y0, y1 = tile["render"]
+    return [border_value(x0, width), border_value(x1, width), border_value(y0, height), border_value(y1, height)]
@@ -1,5 +1,31 @@
 import bpy
+import math
 import os
+import shutil
+import sys
+import tempfile
+import time
+import numpy as np
+
+# Blender does not put the script folder on sys.path when run with -P
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from frame_regions import output_size, region_tile, tile_border
+from mesh_builder import mesh_from_arrays
+from mesh_reader import ply_mesh_arrays, read_obj, read_ply
+from scene_index import box_corners, mesh_bounds, transform_bounds
+
+# Changes covering more of the frame than this are rendered in full
+MAX_DIRTY_FRACTION = 0.5
+# Growth of the changed bounds, as a fraction of their size, to catch nearby shadows and contact effects
+DIRTY_MARGIN = 0.1
+# Extra pixels around the dirty region for the pixel filter and anti-aliasing
+DIRTY_PADDING = 4
+# Pixels rendered around the region and cropped away, so its edge is filtered like in a full render
+REGION_OVERLAP = 8
+# Principled BSDFs smoother than this show sharp reflections of other objects
+REFLECTIVE_ROUGHNESS = 0.2
+# Shaders that reflect or refract other objects whatever their settings
+REFLECTIVE_SHADERS = {'BSDF_GLOSSY', 'BSDF_GLASS', 'BSDF_REFRACTION', 'BSDF_ANISOTROPIC'}
 
 def clear_objects():
     """Clear all mesh objects from the current scene."""
@@ -121,34 +147,7 @@ def import_obj2(obj_file_path):
 
 
     if imported_obj and old_obj:
-        # original_material = old_obj.active_material
-        # original_material_slot = old_obj.material_slots
-        original_materials = [slot.material for slot in old_obj.material_slots]
-        original_uv_layers = [uv.name for uv in old_obj.data.uv_layers]
-        original_vertex_groups = [vg.name for vg in old_obj.vertex_groups]
-        original_custom_properties = old_obj.data.items()
-
-
-        old_obj.data = imported_obj.data
-
-        for i, material in enumerate(original_materials):
-            if i < len(old_obj.material_slots):
-                old_obj.material_slots[i].material = material
-            else:
-                old_obj.data.materials.append(material)
-
-        for uv_layer_name in original_uv_layers:
-            if uv_layer_name in old_obj.data.uv_layers:
-                continue
-            old_obj.data.uv_layers.new(name=uv_layer_name)
-
-        for vg_name in original_vertex_groups:
-            if vg_name in old_obj.vertex_groups:
-                continue
-            old_obj.vertex_groups.new(name=vg_name)
-
-        for key, value in original_custom_properties:
-            old_obj.data[key] = value
+        swap_object_mesh(old_obj, imported_obj.data)
 
         # bpy.context.view_layer.update()
 
@@ -161,6 +160,98 @@ def import_obj2(obj_file_path):
     else:
         print(f"Error importing object: {obj_name}")
 
+def swap_object_mesh(old_obj, new_mesh):
+    """Give old_obj a new mesh, keeping its materials, UV-layer names, vertex groups and mesh properties."""
+    # original_material = old_obj.active_material
+    # original_material_slot = old_obj.material_slots
+    original_materials = [slot.material for slot in old_obj.material_slots]
+    original_uv_layers = [uv.name for uv in old_obj.data.uv_layers]
+    original_vertex_groups = [vg.name for vg in old_obj.vertex_groups]
+    original_custom_properties = old_obj.data.items()
+
+
+    old_obj.data = new_mesh
+
+    for i, material in enumerate(original_materials):
+        if i < len(old_obj.material_slots):
+            old_obj.material_slots[i].material = material
+        else:
+            old_obj.data.materials.append(material)
+
+    for uv_layer_name in original_uv_layers:
+        if uv_layer_name in old_obj.data.uv_layers:
+            continue
+        old_obj.data.uv_layers.new(name=uv_layer_name)
+
+    for vg_name in original_vertex_groups:
+        if vg_name in old_obj.vertex_groups:
+            continue
+        old_obj.vertex_groups.new(name=vg_name)
+
+    for key, value in original_custom_properties:
+        old_obj.data[key] = value
+
+def face_flags(old_mesh, material_slots, faces, num_faces):
+    """Return the (use_smooth, material_index) arrays of a decoded mesh replacing old_mesh.
+
+    Flags from the file win. OBJ material names are mapped to the object's
+    material slots by name. What the file lacks is copied from the old mesh
+    when the face count matches, otherwise the old mesh's prevailing smooth
+    flag is used and the material indices are left at 0.
+    """
+    old_smooth = np.empty(len(old_mesh.polygons), dtype=bool)
+    old_mesh.polygons.foreach_get("use_smooth", old_smooth)
+    old_material_index = np.empty(len(old_mesh.polygons), dtype=np.int32)
+    old_mesh.polygons.foreach_get("material_index", old_material_index)
+    same_topology = len(old_mesh.polygons) == num_faces
+
+    smooth = faces.get("smooth")
+    if smooth is None:
+        if same_topology:
+            smooth = old_smooth
+        else:
+            smooth = np.full(num_faces, bool(old_smooth.mean() >= 0.5) if len(old_smooth) else False)
+
+    material_index = None
+    if faces.get("material_index") is not None:
+        slots = {slot.material.name: index for index, slot in enumerate(material_slots) if slot.material}
+        missing = [name for name in faces["material_names"] if name not in slots]
+        if missing:
+            print(f"Materials {missing} are not on the object, their faces use the first slot")
+        lookup = np.array([slots.get(name, 0) for name in faces["material_names"]], dtype=np.int32)
+        material_index = lookup[faces["material_index"]]
+    elif same_topology:
+        material_index = old_material_index
+    return smooth, material_index
+
+def import_mesh_direct(obj_file_path):
+    """Swap the decoded .obj/.ply geometry into the scene object of the same name without operators.
+
+    Same result as import_obj2, but the file is parsed with mesh_reader and the
+    mesh is filled with foreach_set, so there is no temporary object, no
+    selection change and no operator overhead.
+    """
+    obj_name = os.path.splitext(os.path.basename(obj_file_path))[0]
+    if obj_name in bpy.data.objects:
+        old_obj = bpy.data.objects[obj_name]
+    else:
+        print(f"Object {obj_name} not found in the scene.")
+        return
+
+    if obj_file_path.endswith('.ply'):
+        positions, counts, indices = ply_mesh_arrays(read_ply(obj_file_path))
+        uvs, faces = None, {}
+    else:
+        positions, counts, indices, uvs, faces = read_obj(obj_file_path)
+
+    uv_name = old_obj.data.uv_layers[0].name if len(old_obj.data.uv_layers) else "UVMap"
+    # Keep the shading and materials the operator import (or the original mesh) would give
+    smooth, material_index = face_flags(old_obj.data, old_obj.material_slots, faces, len(counts))
+    new_mesh = mesh_from_arrays(obj_name, positions, counts, indices, uvs, uv_name, smooth, material_index,
+                                faces.get("normals"))
+    swap_object_mesh(old_obj, new_mesh)
+    print(f"Imported object: {obj_name}")
+
 def import_obj3(obj_file_path):
     obj_name = os.path.splitext(os.path.basename(obj_file_path))[0]
     # old_obj = bpy.data.objects[obj_name] if obj_name in bpy.data.objects else None
@@ -222,21 +313,239 @@ def import_obj3(obj_file_path):
 
     bpy.data.objects.remove(imported_obj, do_unlink=True)
 
-def render_and_save_image(output_path):
-    """Render the scene and save the image."""
+def set_fast_render_settings(scene):
+    scene.render.engine = 'BLENDER_EEVEE'
+    scene.render.resolution_percentage = 100
+    scene.eevee.taa_render_samples = 16
+    scene.eevee.use_gtao = True
+
+def render_and_save_image(output_path, cache_dir=None, progressive=False):
+    """Render the scene and save the image, with cache_dir unchanged scenes are not rendered again.
+
+    With progressive, samples stop increasing once the image has converged
+    (see progressive_render), the cache is not used then.
+    """
     bpy.context.scene.render.filepath = output_path
 
     # faster render setting
-    bpy.context.scene.render.engine = 'BLENDER_EEVEE'
-    bpy.context.scene.render.resolution_percentage = 100
-    bpy.context.scene.eevee.taa_render_samples = 16
-    bpy.context.scene.eevee.use_gtao = True
-
-    bpy.ops.render.render(write_still=True, )
+    set_fast_render_settings(bpy.context.scene)
+
+    if progressive:
+        from progressive_render import render_progressive
+        render_progressive(output_path)
+    elif cache_dir:
+        from render_cache import render_cached
+        render_cached(output_path, cache_dir)
+    else:
+        bpy.ops.render.render(write_still=True, )
     print(f"Rendered image saved at: {output_path}")
 
-def process_obj_files(input_folder, output_folder):
-    """Process all .obj files in the input folder and save rendered images to the output folder."""
+def changed_objects(snapshot):
+    """Return (object, original mesh) pairs for the objects whose mesh differs from the snapshot."""
+    changes = []
+    for obj_name, (mesh_name, use_fake_user) in snapshot["objects"].items():
+        obj = bpy.data.objects.get(obj_name)
+        if obj is not None and obj.data.name != mesh_name:
+            changes.append((obj, bpy.data.meshes[mesh_name]))
+    return changes
+
+def is_emissive(obj):
+    """Return True if any material of the object can emit light."""
+    for slot in obj.material_slots:
+        material = slot.material
+        if material is None or not material.use_nodes:
+            continue
+        for node in material.node_tree.nodes:
+            if node.type == 'EMISSION':
+                strength = node.inputs["Strength"]
+            elif node.type == 'BSDF_PRINCIPLED' and "Emission Strength" in node.inputs:
+                strength = node.inputs["Emission Strength"]
+            else:
+                continue
+            if strength.is_linked or strength.default_value > 0:
+                return True
+    return False
+
+def is_reflective(obj):
+    """Return True if any material of the object can show sharp reflections or refractions of other objects."""
+    for slot in obj.material_slots:
+        material = slot.material
+        if material is None or not material.use_nodes:
+            continue
+        for node in material.node_tree.nodes:
+            if node.type in REFLECTIVE_SHADERS:
+                return True
+            if node.type != 'BSDF_PRINCIPLED':
+                continue
+            for name in ("Metallic", "Transmission", "Transmission Weight"):
+                if name in node.inputs and (node.inputs[name].is_linked or node.inputs[name].default_value > 0):
+                    return True
+            roughness = node.inputs["Roughness"]
+            if roughness.is_linked or roughness.default_value < REFLECTIVE_ROUGHNESS:
+                return True
+    return False
+
+def traces_screen_space(scene):
+    """Return True if EEVEE reflects or refracts what is on screen (SSR, or ray tracing in newer versions)."""
+    return bool(getattr(scene.eevee, "use_ssr", False) or getattr(scene.eevee, "use_raytracing", False))
+
+def dirty_region(scene, changes, margin=DIRTY_MARGIN, padding=DIRTY_PADDING):
+    """Return the pixel rectangle (x0, x1, y0, y1) that the changed meshes can affect.
+
+    The old and new mesh bounds of every changed object are projected into the
+    camera view; y counts up from the bottom row like Blender's border. With
+    ambient occlusion on, the bounds also grow by its distance, since the
+    changes darken the surfaces that close to them. Returns
+    None when the bounds reach behind the camera and cannot be bounded on
+    screen, and an empty rectangle when the change is off screen.
+    """
+    from calculate_distance import world_to_camera_view_array
+
+    width, height = output_size(scene)
+    ao_distance = scene.eevee.gtao_distance if getattr(scene.eevee, "use_gtao", False) else 0.0
+
+    corners = []
+    for obj, original_mesh in changes:
+        matrix = np.array(obj.matrix_world, dtype=np.float64)
+        for mesh in (original_mesh, obj.data):
+            bounds = mesh_bounds(mesh)
+            if bounds is None:
+                continue
+            lo, hi = transform_bounds(bounds[0], bounds[1], matrix)
+            grow = (hi - lo).max() * margin + ao_distance
+            corners.append(box_corners(lo - grow, hi + grow))
+    if not corners:
+        return (0, 0, 0, 0)
+
+    co_cam = world_to_camera_view_array(scene, scene.camera, np.concatenate(corners))
+    if (co_cam[:, 2] <= 0).any():
+        return None
+    x0 = max(0, math.floor(co_cam[:, 0].min() * width) - padding)
+    x1 = min(width, math.ceil(co_cam[:, 0].max() * width) + padding)
+    y0 = max(0, math.floor(co_cam[:, 1].min() * height) - padding)
+    y1 = min(height, math.ceil(co_cam[:, 1].max() * height) + padding)
+    if x1 <= x0 or y1 <= y0:
+        return (0, 0, 0, 0)
+    return (x0, x1, y0, y1)
+
+def render_region(scene, tile, output_path):
+    """Render only the tile's 'render' rectangle of the frame, cropped to it, to output_path."""
+    render = scene.render
+    width, height = output_size(scene)
+    previous = (render.use_border, render.use_crop_to_border, render.border_min_x, render.border_max_x,
+                render.border_min_y, render.border_max_y, render.filepath)
+    render.use_border = True
+    render.use_crop_to_border = True
+    render.border_min_x, render.border_max_x, render.border_min_y, render.border_max_y = tile_border(
+        tile, width, height)
+    render.filepath = output_path
+    try:
+        bpy.ops.render.render(write_still=True)
+    finally:
+        (render.use_border, render.use_crop_to_border, render.border_min_x, render.border_max_x,
+         render.border_min_y, render.border_max_y, render.filepath) = previous
+
+def composite_region(baseline_path, region_path, tile, output_path):
+    """Paste the core of a rendered tile over the baseline image and save the result to output_path.
+
+    The overlap rendered around the core is cropped away like region_render.stitch_tiles does.
+    """
+    x0, x1, y0, y1 = tile["core"]
+    rx0, rx1, ry0, ry1 = tile["render"]
+    baseline = bpy.data.images.load(baseline_path, check_existing=False)
+    patch = bpy.data.images.load(region_path, check_existing=False)
+    try:
+        width, height = baseline.size
+        channels = baseline.channels
+        pixels = np.empty(width * height * channels, dtype=np.float32)
+        baseline.pixels.foreach_get(pixels)
+        patch_pixels = np.empty(patch.size[0] * patch.size[1] * patch.channels, dtype=np.float32)
+        patch.pixels.foreach_get(patch_pixels)
+        if tuple(patch.size) != (rx1 - rx0, ry1 - ry0) or patch.channels != channels:
+            raise RuntimeError(f"Region render is {patch.size[0]}x{patch.size[1]}x{patch.channels}, "
+                               f"expected {rx1 - rx0}x{ry1 - ry0}x{channels}")
+
+        # Image pixels start at the bottom row, like the border
+        pixels = pixels.reshape(height, width, channels)
+        patch_pixels = patch_pixels.reshape(ry1 - ry0, rx1 - rx0, channels)
+        pixels[y0:y1, x0:x1] = patch_pixels[y0 - ry0:y1 - ry0, x0 - rx0:x1 - rx0]
+        baseline.pixels.foreach_set(pixels.ravel())
+        baseline.filepath_raw = output_path
+        baseline.file_format = 'PNG'
+        baseline.save()
+    finally:
+        bpy.data.images.remove(baseline)
+        bpy.data.images.remove(patch)
+
+def render_dirty_region(output_path, baseline_path, changes, max_fraction=MAX_DIRTY_FRACTION):
+    """Re-render only the part of the frame the changed meshes cover and composite it onto the baseline.
+
+    changes are (object, original mesh) pairs, baseline_path a full render of
+    the scene with the original meshes and the same settings. The full frame
+    is rendered instead when a changed object emits light, when another
+    object can reflect or refract it (reflective materials, or EEVEE screen
+    space reflections), when its bounds reach behind the camera, or when the
+    region covers more than max_fraction of the frame, since such changes
+    reach far beyond their own pixels. Shadows are only caught within
+    DIRTY_MARGIN of the bounds, and ambient occlusion within its distance.
+    Returns the mode used: 'full', 'region' or 'unchanged'.
+    """
+    scene = bpy.context.scene
+    set_fast_render_settings(scene)
+    width, height = output_size(scene)
+    frame_pixels = width * height
+
+    start = time.perf_counter()
+    region = dirty_region(scene, changes)
+    changed = {obj for obj, original_mesh in changes}
+    others = [obj for obj in scene.objects if obj not in changed and not obj.hide_render]
+    if any(is_emissive(obj) for obj in changed):
+        mode, reason = 'full', "an emissive object changed"
+    elif traces_screen_space(scene):
+        mode, reason = 'full', "screen space reflections can show the changes"
+    elif any(is_reflective(obj) for obj in others if obj.type == 'MESH'):
+        mode, reason = 'full', "reflective materials can show the changes"
+    elif region is None:
+        mode, reason = 'full', "the changes reach behind the camera"
+    elif (region[1] - region[0]) * (region[3] - region[2]) == 0:
+        mode, reason = 'unchanged', "the changes are off screen"
+    elif (region[1] - region[0]) * (region[3] - region[2]) > max_fraction * frame_pixels:
+        mode, reason = 'full', "the changes cover most of the frame"
+    else:
+        mode, reason = 'region', None
+
+    if mode == 'full':
+        render_and_save_image(output_path)
+    elif mode == 'unchanged':
+        shutil.copyfile(baseline_path, output_path)
+    else:
+        region_path = os.path.join(tempfile.mkdtemp(prefix="dirty_region_"), "region.png")
+        tile = region_tile(region, width, height, REGION_OVERLAP)
+        render_region(scene, tile, region_path)
+        composite_region(baseline_path, region_path, tile, output_path)
+        os.remove(region_path)
+        os.rmdir(os.path.dirname(region_path))
+
+    elapsed = time.perf_counter() - start
+    if mode == 'region':
+        share = (region[1] - region[0]) * (region[3] - region[2]) / frame_pixels
+        print(f"Rendered {share * 100:.1f}% of the frame in {elapsed:.2f}s, saved at {output_path}")
+    else:
+        print(f"{mode.capitalize()} render ({reason}) in {elapsed:.2f}s, saved at {output_path}")
+    return mode
+
+def process_obj_files(input_folder, output_folder, loader=import_mesh_direct, cache_dir=None, baseline=None,
+                      progressive=False):
+    """Process all .obj files in the input folder and save rendered images to the output folder.
+
+    loader swaps one decoded file into the scene, import_obj2 is the operator-based one.
+    With baseline, a dict with the 'image' path of a full render of the original
+    scene and the mesh 'snapshot' taken for it, only the region of the frame
+    affected by the swapped meshes is rendered. Region renders are composited
+    onto a full-sample baseline, so baseline and progressive cannot be combined.
+    """
+    if progressive and baseline is not None:
+        raise ValueError("progressive rendering cannot be combined with dirty region renders (baseline)")
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
 
@@ -246,30 +555,101 @@ def process_obj_files(input_folder, output_folder):
             # image_output_path = os.path.join(output_folder, os.path.splitext(filename)[0] + ".png")
 
             # clear_objects()
-            import_obj2(obj_file_path)
+            loader(obj_file_path)
     image_output_path = os.path.join(output_folder, os.path.basename(input_folder)+".png")
-    render_and_save_image(image_output_path)
-
-def process_folders(root_folder, output_root_folder):
-    """Traverse folders and process .obj files in each."""
-    for folder_name in os.listdir(root_folder):
-        folder_path = os.path.join(root_folder, folder_name)
-        if os.path.isdir(folder_path):
-            # output_folder = os.path.join(output_root_folder, folder_name)
-            process_obj_files(folder_path, output_root_folder)
-
-# Load the initial .blend file
-blend_file_path = "../blender_dataset/ocean-scene.blend"
-bpy.ops.wm.open_mainfile(filepath=blend_file_path)
-
-for obj in bpy.data.objects:
-    # obj.select_set(True)
-    print(f"Object Name: {obj.name}, Type: {obj.type}, Collection: {obj.users_collection}")
-
-# Example usage
-root_folder = "../blender_dataset-ply2/ocean-scene-vmesh/decode/"
-output_root_folder = "../blender_dataset-ply2/ocean-scene-vmesh"
-
-# render_and_save_image(os.path.join(output_root_folder, "test.png"))
-
-process_folders(root_folder, output_root_folder)
+    if baseline is not None:
+        render_dirty_region(image_output_path, baseline["image"], changed_objects(baseline["snapshot"]))
+    else:
+        render_and_save_image(image_output_path, cache_dir, progressive)
+
+def snapshot_meshes():
+    """Remember the mesh datablock of every mesh object so decode variants can be rolled back.
+
+    The original meshes get a fake user so they survive while swapped out.
+    Returns {"objects": {object name: (mesh name, previous use_fake_user)},
+    "meshes": names of all meshes that existed}.
+    """
+    objects = {}
+    for obj in bpy.data.objects:
+        if obj.type == 'MESH':
+            objects[obj.name] = (obj.data.name, obj.data.use_fake_user)
+            obj.data.use_fake_user = True
+    return {"objects": objects, "meshes": {mesh.name_full for mesh in bpy.data.meshes}}
+
+def restore_meshes(snapshot):
+    """Put the snapshot meshes back on their objects and delete the meshes created since, left without users.
+
+    Meshes that were already orphaned when the snapshot was taken are kept.
+    """
+    for obj_name, (mesh_name, use_fake_user) in snapshot["objects"].items():
+        obj = bpy.data.objects.get(obj_name)
+        mesh = bpy.data.meshes[mesh_name]
+        if obj is not None and obj.data != mesh:
+            obj.data = mesh
+
+    orphans = [mesh for mesh in bpy.data.meshes if mesh.users == 0 and mesh.name_full not in snapshot["meshes"]]
+    if orphans:
+        bpy.data.batch_remove(orphans)
+
+def release_snapshot(snapshot):
+    """Restore the use_fake_user flags changed by snapshot_meshes."""
+    for mesh_name, use_fake_user in snapshot["objects"].values():
+        if mesh_name in bpy.data.meshes:
+            bpy.data.meshes[mesh_name].use_fake_user = use_fake_user
+
+def process_folders(root_folder, output_root_folder, cache_dir=None, dirty_regions=False, progressive=False):
+    """Traverse folders and process .obj files in each.
+
+    Every folder is a decode variant applied to the original scene: the meshes
+    are rolled back to a snapshot after each one instead of piling up. With
+    dirty_regions, the original scene is rendered once as the baseline and
+    each variant only re-renders the part of the frame its meshes affect.
+    With progressive, each variant is rendered until it has converged.
+    """
+    if progressive and dirty_regions:
+        raise ValueError("progressive rendering cannot be combined with dirty_regions")
+    snapshot = snapshot_meshes()
+    try:
+        baseline = None
+        if dirty_regions:
+            baseline_path = os.path.join(output_root_folder, "baseline.png")
+            render_and_save_image(baseline_path, cache_dir)
+            baseline = {"image": baseline_path, "snapshot": snapshot}
+
+        for folder_name in os.listdir(root_folder):
+            folder_path = os.path.join(root_folder, folder_name)
+            if os.path.isdir(folder_path):
+                # output_folder = os.path.join(output_root_folder, folder_name)
+                process_obj_files(folder_path, output_root_folder, cache_dir=cache_dir, baseline=baseline,
+                                  progressive=progressive)
+                restore_meshes(snapshot)
+                print(f"Restored original meshes, {len(bpy.data.meshes)} meshes in memory")
+    finally:
+        release_snapshot(snapshot)
+
+def main():
+    from render_cache import RENDER_CACHE_DIR, print_cache_stats
+
+    # Load the initial .blend file
+    blend_file_path = "../blender_dataset/ocean-scene.blend"
+    bpy.ops.wm.open_mainfile(filepath=blend_file_path)
+
+    for obj in bpy.data.objects:
+        # obj.select_set(True)
+        print(f"Object Name: {obj.name}, Type: {obj.type}, Collection: {obj.users_collection}")
+
+    # Example usage
+    root_folder = "../blender_dataset-ply2/ocean-scene-vmesh/decode/"
+    output_root_folder = "../blender_dataset-ply2/ocean-scene-vmesh"
+
+    # render_and_save_image(os.path.join(output_root_folder, "test.png"))
+
+    process_folders(root_folder, output_root_folder, cache_dir=RENDER_CACHE_DIR)
+    # Only re-render the part of the frame each variant changes
+    # process_folders(root_folder, output_root_folder, cache_dir=RENDER_CACHE_DIR, dirty_regions=True)
+    # Stop adding samples once each variant has converged, samples used go to progressive_renders.csv
+    # process_folders(root_folder, output_root_folder, progressive=True)
+    print_cache_stats(RENDER_CACHE_DIR)
+
+if __name__ == "__main__":
+    main()
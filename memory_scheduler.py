@@ -0,0 +1,221 @@
+import json
+import math
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
+from blend_list import BLEND_LIST
+from blender_process import parse_result, run_blender
+from render_log import RenderLog, parse_log_file, scene_summaries
+
+RENDER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "render_blend.py")
+MEMORY_HISTORY_PATH = "render_memory_history.json"
+
+# Peaks are reserved with this headroom, renders vary a little between runs and versions
+SAFETY_MARGIN = 1.2
+# Observed peaks kept per scene, the estimate is the largest of them
+HISTORY_LENGTH = 5
+# Rough cost of a scene never rendered before: Blender itself plus a multiple of the file size
+BASE_MEMORY_MB = 300.0
+FILE_SIZE_FACTOR = 4.0
+# Rough cost of scene_stats counts: bytes per vertex once evaluated and synced to the renderer (positions,
+# normals, loops and BVH), and copies of each decoded texture it holds (mipmaps, float conversion, device)
+VERTEX_BYTES = 200
+TEXTURE_COPIES = 4
+
+def scene_key(blend_file_path):
+    # The same name render_log gives the scene, so logs can seed the history
+    return Path(blend_file_path).stem
+
+def load_memory_history(filepath=MEMORY_HISTORY_PATH):
+    if os.path.exists(filepath):
+        with open(filepath) as f:
+            return json.load(f)
+    return {}
+
+def save_memory_history(history, filepath=MEMORY_HISTORY_PATH):
+    with open(filepath + ".tmp", "w") as f:
+        json.dump(history, f, indent=1)
+    os.replace(filepath + ".tmp", filepath)
+
+def record_peak(history, key, peak_mb):
+    """Add an observed peak (MB) to the scene's history, keeping the last HISTORY_LENGTH."""
+    entry = history.setdefault(key, {"peaks": []})
+    entry["peaks"] = (entry["peaks"] + [round(peak_mb, 1)])[-HISTORY_LENGTH:]
+    entry["updated"] = time.strftime("%Y-%m-%d %H:%M:%S")
+
+def seed_history_from_log(history, log_path):
+    """Record the peak memory of every scene in a saved render log such as blend_log.txt."""
+    log = parse_log_file(log_path)
+    arrays, phases, details = log.arrays()
+    meta = {"scenes": log.scenes, "phases": phases, "details": details, "totals": log.totals}
+    for scene, summary in scene_summaries(arrays, meta).items():
+        record_peak(history, scene, max(summary["peak_memory"], summary["peak_device_memory"] or 0.0))
+
+def observed_peak(peaks, device_peaks):
+    """Return the largest host or device peak (MB) of status lines, 0 when there are none.
+
+    On the CPU device Cycles reports its own memory apart from Blender's, either can be the larger.
+    """
+    values = [value for value in list(peaks) + list(device_peaks) if not math.isnan(value)]
+    return max(values, default=0.0)
+
+def estimate_from_stats(stats):
+    """Rough peak (MB) from scene_culling.scene_stats: Blender, geometry and decoded textures."""
+    return (BASE_MEMORY_MB + stats["vertices"] * VERTEX_BYTES / 1024 ** 2
+            + stats["texture_bytes"] * TEXTURE_COPIES / 1024 ** 2)
+
+def estimate_peak(history, job):
+    """Return the memory (MB) to reserve for a job.
+
+    Uses the largest recent observed peak of the scene, otherwise the job's
+    'stats' (see estimate_from_stats), otherwise the .blend file size.
+    """
+    entry = history.get(scene_key(job["blend"]))
+    if entry and entry["peaks"]:
+        return max(entry["peaks"]) * SAFETY_MARGIN
+    if job.get("stats"):
+        return estimate_from_stats(job["stats"]) * SAFETY_MARGIN
+    size_mb = os.path.getsize(job["blend"]) / 1024 ** 2 if os.path.exists(job["blend"]) else 0.0
+    return (BASE_MEMORY_MB + FILE_SIZE_FACTOR * size_mb) * SAFETY_MARGIN
+
+def job_args(job):
+    """Command line of a render_blend.py job: a still, or an animation when job['animation'] is set."""
+    args = ["--python", RENDER_SCRIPT, "--", "--blend", job["blend"], "--output", job["output"]]
+    if job.get("animation"):
+        args.append("--animation")
+        if job.get("frames"):
+            args += ["--frames", str(job["frames"][0]), str(job["frames"][1])]
+    return args
+
+class MemoryScheduler:
+    """Runs render jobs in concurrent Blender processes whose estimated peaks fit in a RAM budget.
+
+    Jobs are dicts with 'blend' and 'output', and optionally 'animation',
+    'frames' (start, end) and 'stats'. Pending jobs are admitted largest
+    first: whenever memory frees up, the largest job that fits is started.
+    A job larger than the whole budget runs alone. The reservation of a
+    running job grows if the host or device peak of its status lines exceeds
+    the estimate, and the observed peak is recorded in the history for the
+    next batch. A failed job records at least the peak its reservation
+    was estimated from, so a scene that ran out of memory is not estimated
+    lower next time.
+    """
+
+    def __init__(self, budget_mb, history=None, max_concurrent=None, threads=None, timeout=None):
+        self.budget_mb = budget_mb
+        self.history = {} if history is None else history
+        self.max_concurrent = max_concurrent or os.cpu_count() or 1
+        self.threads = threads
+        self.timeout = timeout
+        self.reserved = {}
+        self._lock = threading.Lock()
+
+    def reserved_mb(self):
+        with self._lock:
+            return sum(self.reserved.values())
+
+    def _run(self, index, job, estimate, finished):
+        log = RenderLog()
+
+        def on_line(line):
+            if log.feed(line):
+                peak = observed_peak(log.columns["peak"][-1:], log.columns["device_peak"][-1:]) * SAFETY_MARGIN
+                with self._lock:
+                    self.reserved[index] = max(self.reserved[index], peak)
+
+        start = time.perf_counter()
+        try:
+            returncode, lines = run_blender(job_args(job), self.timeout, self.threads, on_line)
+        except OSError as e:
+            returncode, lines = -1, [f"Could not start Blender: {e}"]
+        peak = observed_peak(log.columns["peak"], log.columns["device_peak"])
+        ok = returncode == 0 and parse_result(lines) is not None
+        finished.put({
+            "index": index,
+            "blend_file": job["blend"],
+            "ok": ok,
+            "returncode": returncode,
+            "wall_time": time.perf_counter() - start,
+            "estimate": estimate,
+            "peak": peak or None,
+            "error": None if ok else "\n".join(lines[-20:]),
+        })
+
+    def run(self, jobs):
+        """Run all jobs and return their results in job order."""
+        estimates = [estimate_peak(self.history, job) for job in jobs]
+        pending = sorted(range(len(jobs)), key=lambda index: -estimates[index])
+        finished = queue.Queue()
+        results = [None] * len(jobs)
+        running = 0
+
+        while pending or running:
+            free = self.budget_mb - self.reserved_mb()
+            while pending and running < self.max_concurrent:
+                fits = [index for index in pending if estimates[index] <= free]
+                if not running and estimates[pending[0]] > self.budget_mb:
+                    # Too large for the budget anyway, it gets the machine to itself
+                    fits = pending[:1]
+                    print(f"{jobs[fits[0]]['blend']}: estimated {estimates[fits[0]]:.0f} MB exceeds the "
+                          f"budget of {self.budget_mb:.0f} MB, running it alone")
+                elif not fits:
+                    break
+                index = fits[0]
+                pending.remove(index)
+                with self._lock:
+                    self.reserved[index] = estimates[index]
+                free -= estimates[index]
+                running += 1
+                print(f"Started {jobs[index]['blend']} (estimated {estimates[index]:.0f} MB, "
+                      f"{self.reserved_mb():.0f} / {self.budget_mb:.0f} MB reserved)")
+                threading.Thread(target=self._run, args=(index, jobs[index], estimates[index], finished),
+                                 daemon=True).start()
+
+            result = finished.get()
+            running -= 1
+            with self._lock:
+                reserved = self.reserved.pop(result["index"])
+            results[result["index"]] = result
+            if result["ok"] and result["peak"] is not None:
+                record_peak(self.history, scene_key(result["blend_file"]), result["peak"])
+            elif not result["ok"]:
+                # It may have run out of memory before printing its peak, never estimate it lower next time.
+                # The reservation includes SAFETY_MARGIN, recording it as is would grow it on every failure
+                record_peak(self.history, scene_key(result["blend_file"]),
+                            max(result["peak"] or 0.0, reserved / SAFETY_MARGIN))
+            status = "done" if result["ok"] else f"FAILED (exit code {result['returncode']})"
+            peak = f"{result['peak']:.0f} MB" if result["peak"] is not None else "unknown"
+            print(f"{result['blend_file']}: {status} in {result['wall_time']:.1f}s, peak {peak} "
+                  f"(estimated {result['estimate']:.0f} MB)")
+        return results
+
+def print_summary(results, wall_time):
+    succeeded = [r for r in results if r["ok"]]
+    print(f"Rendered {len(succeeded)}/{len(results)} jobs in {wall_time:.1f}s")
+    if succeeded:
+        total = sum(r["wall_time"] for r in succeeded)
+        print(f"Total render time: {total:.1f}s, speedup over serial: {total / wall_time:.1f}x")
+    for r in results:
+        if not r["ok"]:
+            print(f"Failed: {r['blend_file']} (exit code {r['returncode']})")
+            print(r["error"])
+
+def main():
+    budget_mb = 16 * 1024
+    history = load_memory_history()
+    if not history and os.path.exists("blend_log.txt"):
+        seed_history_from_log(history, "blend_log.txt")
+        print(f"Seeded the memory history with {len(history)} scenes from blend_log.txt")
+
+    jobs = [{"blend": blend_file_path, "output": Path(blend_file_path).stem + ".png"} for blend_file_path in BLEND_LIST]
+    scheduler = MemoryScheduler(budget_mb, history)
+    start = time.perf_counter()
+    results = scheduler.run(jobs)
+    print_summary(results, time.perf_counter() - start)
+    save_memory_history(history)
+
+if __name__ == "__main__":
+    main()
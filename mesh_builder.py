@@ -0,0 +1,41 @@
+import bpy
+import numpy as np
+
+def mesh_from_arrays(name, positions, counts, indices, uvs=None, uv_name="UVMap", smooth=None, material_index=None,
+                     normals=None):
+    """Build a new mesh from vertex positions, face sizes and flat face indices with foreach_set.
+
+    smooth and material_index are optional per-face arrays, normals optional
+    (indices, 3) custom loop normals.
+    """
+    loop_starts = np.zeros(len(counts), dtype=np.int32)
+    loop_starts[1:] = np.cumsum(counts[:-1])
+
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(positions))
+    mesh.vertices.foreach_set("co", np.ascontiguousarray(positions, dtype=np.float32).ravel())
+    mesh.loops.add(len(indices))
+    mesh.loops.foreach_set("vertex_index", np.ascontiguousarray(indices, dtype=np.int32))
+    mesh.polygons.add(len(counts))
+    mesh.polygons.foreach_set("loop_start", loop_starts)
+    # loop_total is derived from loop_start since Blender 4.0
+    if bpy.app.version < (4, 0, 0):
+        mesh.polygons.foreach_set("loop_total", np.ascontiguousarray(counts, dtype=np.int32))
+
+    if smooth is not None:
+        mesh.polygons.foreach_set("use_smooth", np.ascontiguousarray(smooth, dtype=bool))
+    if material_index is not None:
+        mesh.polygons.foreach_set("material_index", np.ascontiguousarray(material_index, dtype=np.int32))
+
+    if uvs is not None:
+        uv_layer = mesh.uv_layers.new(name=uv_name)
+        uv_layer.data.foreach_set("uv", np.ascontiguousarray(uvs, dtype=np.float32).ravel())
+
+    mesh.update(calc_edges=True)
+    mesh.validate()
+    # validate may drop degenerate faces, the custom normals only fit an unchanged mesh
+    if normals is not None and len(mesh.loops) == len(normals):
+        if bpy.app.version < (4, 1, 0):
+            mesh.use_auto_smooth = True
+        mesh.normals_split_custom_set(np.asarray(normals, dtype=np.float32))
+    return mesh
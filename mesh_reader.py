@@ -0,0 +1,228 @@
+import numpy as np
+
+# PLY property types and their NumPy equivalents
+PLY_TYPES = {
+    "char": "i1", "int8": "i1", "uchar": "u1", "uint8": "u1",
+    "short": "i2", "int16": "i2", "ushort": "u2", "uint16": "u2",
+    "int": "i4", "int32": "i4", "uint": "u4", "uint32": "u4",
+    "float": "f4", "float32": "f4", "double": "f8", "float64": "f8",
+}
+
+# Number of list records checked at once while looking for the end of a run of same-sized lists
+MIN_WINDOW = 4096
+
+def read_ply_header(f):
+    """Parse a PLY header from an open binary file.
+
+    Returns (format, elements, header size in bytes). Every element is a dict
+    with its name, count and properties; a property is (name, dtype) for a
+    scalar or (name, count dtype, item dtype) for a list.
+    """
+    if f.readline().strip() != b"ply":
+        raise ValueError("Not a PLY file")
+
+    file_format = None
+    elements = []
+    while True:
+        line = f.readline()
+        if not line:
+            raise ValueError("PLY header has no end_header line")
+        words = line.decode("ascii").split()
+        if not words or words[0] in ("comment", "obj_info"):
+            continue
+        if words[0] == "end_header":
+            break
+        if words[0] == "format":
+            file_format = words[1]
+        elif words[0] == "element":
+            elements.append({"name": words[1], "count": int(words[2]), "properties": []})
+        elif words[0] == "property":
+            if words[1] == "list":
+                elements[-1]["properties"].append((words[4], PLY_TYPES[words[2]], PLY_TYPES[words[3]]))
+            else:
+                elements[-1]["properties"].append((words[2], PLY_TYPES[words[1]]))
+
+    if file_format not in ("ascii", "binary_little_endian", "binary_big_endian"):
+        raise ValueError(f"Unsupported PLY format: {file_format}")
+    return file_format, elements, f.tell()
+
+def _check_element(element):
+    properties = element["properties"]
+    is_list = [len(p) == 3 for p in properties]
+    if any(is_list) and len(properties) > 1:
+        raise ValueError(f"Element '{element['name']}' mixes list and other properties, which is not supported")
+    return any(is_list)
+
+def _lists_result(runs, count):
+    """Turn runs of (list size, (k, size) array) into the counts/indices result."""
+    if len(runs) == 1:
+        size, items = runs[0]
+        return {"counts": np.full(count, size, dtype=np.int64), "indices": items}
+    counts = np.concatenate([np.full(len(items), size, dtype=np.int64) for size, items in runs]) if runs \
+        else np.zeros(0, dtype=np.int64)
+    indices = np.concatenate([items.ravel() for size, items in runs]) if runs else np.zeros(0, dtype=np.int64)
+    return {"counts": counts, "indices": indices}
+
+def _read_binary_lists(buffer, offset, count, count_dtype, item_dtype):
+    """Read count binary list records starting at offset, returning (result, end offset).
+
+    Lists of the same size are read as zero-copy runs of fixed-size records,
+    so a mesh of only triangles or of large triangle/quad patches is parsed
+    in a handful of vectorized steps.
+    """
+    runs = []
+    done = 0
+    window = MIN_WINDOW
+    while done < count:
+        size = int(np.frombuffer(buffer, count_dtype, 1, offset)[0])
+        record = np.dtype([("size", count_dtype), ("items", item_dtype, (size,))])
+        available = min(count - done, window, (len(buffer) - offset) // record.itemsize)
+        if available <= 0:
+            raise ValueError("PLY file ends in the middle of an element")
+        records = np.frombuffer(buffer, record, available, offset)
+        mismatch = np.flatnonzero(records["size"] != size)
+        run = mismatch[0] if len(mismatch) else available
+
+        runs.append((size, records["items"][:run]))
+        done += run
+        offset += run * record.itemsize
+        window = max(MIN_WINDOW, 2 * run)
+    return _lists_result(runs, count), offset
+
+def _read_ascii_lists(values, position, count, item_dtype):
+    """Read count list records from the flat array of ASCII numbers, returning (result, end position)."""
+    runs = []
+    done = 0
+    window = MIN_WINDOW
+    while done < count:
+        size = int(values[position])
+        available = min(count - done, window, (len(values) - position) // (size + 1))
+        if available <= 0:
+            raise ValueError("PLY file ends in the middle of an element")
+        records = values[position:position + available * (size + 1)].reshape(available, size + 1)
+        mismatch = np.flatnonzero(records[:, 0] != size)
+        run = mismatch[0] if len(mismatch) else available
+
+        runs.append((size, records[:run, 1:].astype(item_dtype)))
+        done += run
+        position += run * (size + 1)
+        window = max(MIN_WINDOW, 2 * run)
+    return _lists_result(runs, count), position
+
+def read_ply(filepath, mmap=True):
+    """Read a PLY file without Blender.
+
+    Returns {element name: data}. Elements with scalar properties, like vertex,
+    are structured arrays; for binary files opened with mmap these are
+    zero-copy views of the memory-mapped file. Elements with a list property,
+    like face, are {"counts": list sizes, "indices": items}, where indices is a
+    (count, size) array if all lists have the same size and a flat array otherwise.
+    """
+    with open(filepath, "rb") as f:
+        file_format, elements, header_size = read_ply_header(f)
+        if file_format == "ascii":
+            values = np.array(f.read().split(), dtype=np.float64)
+
+    data = {}
+    if file_format == "ascii":
+        position = 0
+        for element in elements:
+            if _check_element(element):
+                name, count_dtype, item_dtype = element["properties"][0]
+                data[element["name"]], position = _read_ascii_lists(values, position, element["count"], item_dtype)
+            else:
+                num_properties = len(element["properties"])
+                rows = values[position:position + element["count"] * num_properties]
+                rows = rows.reshape(element["count"], num_properties)
+                array = np.empty(element["count"], dtype=[(p[0], p[1]) for p in element["properties"]])
+                for i, (name, dtype) in enumerate(element["properties"]):
+                    array[name] = rows[:, i]
+                data[element["name"]] = array
+                position += len(rows) * num_properties
+        return data
+
+    byte_order = "<" if file_format == "binary_little_endian" else ">"
+    if mmap:
+        buffer = np.memmap(filepath, dtype=np.uint8, mode="r")
+    else:
+        with open(filepath, "rb") as f:
+            buffer = f.read()
+
+    offset = header_size
+    for element in elements:
+        if _check_element(element):
+            name, count_dtype, item_dtype = element["properties"][0]
+            data[element["name"]], offset = _read_binary_lists(buffer, offset, element["count"],
+                                                               byte_order + count_dtype, byte_order + item_dtype)
+        else:
+            dtype = np.dtype([(p[0], byte_order + p[1]) for p in element["properties"]])
+            data[element["name"]] = np.frombuffer(buffer, dtype, element["count"], offset)
+            offset += element["count"] * dtype.itemsize
+    return data
+
+def ply_mesh_arrays(ply):
+    """Return (positions, face sizes, flat face vertex indices) of a mesh read with read_ply."""
+    vertex = ply["vertex"]
+    positions = np.column_stack([vertex["x"], vertex["y"], vertex["z"]]).astype(np.float32)
+    faces = ply.get("face", {"counts": np.zeros(0, dtype=np.int64), "indices": np.zeros(0, dtype=np.int32)})
+    return positions, faces["counts"], np.ascontiguousarray(faces["indices"]).ravel()
+
+def _obj_index(tokens, count):
+    """Convert 1-based (or negative, relative) OBJ indices to 0-based ones."""
+    indices = np.array(tokens, dtype=np.int64)
+    return np.where(indices < 0, indices + count, indices - 1)
+
+def read_obj(filepath):
+    """Read the geometry of an OBJ file without Blender.
+
+    Returns (positions, face sizes, flat face vertex indices, loop UVs, faces).
+    The loop UVs are an (indices, 2) array, or None when the faces reference no
+    texture coordinates. faces holds the per-face 'smooth' flags from the 's'
+    lines, the 'material_index' of every face into 'material_names' from the
+    'usemtl' lines, and the (indices, 3) loop 'normals' from 'vn'; each is None
+    when the file does not have it. Groups are ignored.
+    """
+    with open(filepath) as f:
+        lines = f.read().splitlines()
+
+    vertex_lines = [line[2:].split()[:3] for line in lines if line.startswith("v ")]
+    uv_lines = [line[3:].split()[:2] for line in lines if line.startswith("vt ")]
+    normal_lines = [line[3:].split()[:3] for line in lines if line.startswith("vn ")]
+
+    # Smoothing and material are states that apply to the faces that follow them
+    face_lines, face_smooth, face_materials = [], [], []
+    smooth, material = False, None
+    has_smooth = False
+    for line in lines:
+        if line.startswith("f "):
+            face_lines.append(line[2:].split())
+            face_smooth.append(smooth)
+            face_materials.append(material)
+        elif line.startswith("s "):
+            smooth = line[2:].strip() not in ("off", "0")
+            has_smooth = True
+        elif line.startswith("usemtl "):
+            material = line[7:].strip()
+
+    positions = np.array(vertex_lines, dtype=np.float32).reshape(-1, 3)
+    counts = np.array([len(face) for face in face_lines], dtype=np.int64)
+    corners = [corner.split("/") for face in face_lines for corner in face]
+    indices = _obj_index([corner[0] for corner in corners], len(positions)).astype(np.int32)
+
+    uvs = None
+    if uv_lines and corners and all(len(corner) > 1 and corner[1] for corner in corners):
+        texture_coords = np.array(uv_lines, dtype=np.float32).reshape(-1, 2)
+        uvs = texture_coords[_obj_index([corner[1] for corner in corners], len(texture_coords))]
+
+    faces = {"smooth": None, "material_names": None, "material_index": None, "normals": None}
+    if has_smooth:
+        faces["smooth"] = np.array(face_smooth, dtype=bool)
+    if any(name is not None for name in face_materials):
+        names = list(dict.fromkeys(name for name in face_materials if name is not None))
+        lookup = {name: index for index, name in enumerate(names)}
+        faces["material_names"] = names
+        faces["material_index"] = np.array([lookup.get(name, 0) for name in face_materials], dtype=np.int32)
+    if normal_lines and corners and all(len(corner) > 2 and corner[2] for corner in corners):
+        normals = np.array(normal_lines, dtype=np.float32).reshape(-1, 3)
+        faces["normals"] = normals[_obj_index([corner[2] for corner in corners], len(normals))]
+    return positions, counts, indices, uvs, faces
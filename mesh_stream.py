@@ -0,0 +1,151 @@
+import numpy as np
+
+from columnar import open_columns
+
+PLY_FORMATS = ('ascii', 'binary_little_endian')
+
+DEFAULT_MEMORY_BUDGET = 64 * 2**20
+# Bytes a chunk holds per item beyond its values: slicing a bpy collection
+# wraps every item in a Python object, and the values pass through temporaries
+ITEM_OVERHEAD = 256
+
+def face_buffer(loop_totals, vertex_indices):
+    """Pack PLY face records (uchar count + int indices) into one byte buffer."""
+    num_faces = len(loop_totals)
+    counts_offset = np.zeros(num_faces, dtype=np.int64)
+    counts_offset[1:] = np.cumsum(loop_totals[:-1].astype(np.int64) * 4 + 1)
+
+    buffer = np.empty(num_faces + len(vertex_indices) * 4, dtype=np.uint8)
+    is_count = np.zeros(len(buffer), dtype=bool)
+    is_count[counts_offset] = True
+    buffer[is_count] = loop_totals
+    buffer[~is_count] = vertex_indices.astype('<i4').view(np.uint8)
+    return buffer
+
+def ply_header(num_vertices, num_faces, file_format):
+    return (
+        "ply\n"
+        f"format {file_format} 1.0\n"
+        f"element vertex {num_vertices}\n"
+        "property float x\n"
+        "property float y\n"
+        "property float z\n"
+        f"element face {num_faces}\n"
+        "property list uchar int vertex_indices\n"
+        "end_header\n"
+    ).encode('ascii')
+
+def chunk_items(memory_budget, item_bytes):
+    """Number of items of item_bytes each that a chunk can hold within memory_budget bytes."""
+    return max(1, memory_budget // (item_bytes + ITEM_OVERHEAD))
+
+def read_range(collection, attribute, start, stop, dtype, width, out=None):
+    """Copy the attribute of items start..stop of a collection into a (stop - start, width) array.
+
+    foreach_get only copies whole collections, so the items of the range are
+    read one by one into out (or a new array): memory grows with the range,
+    not with the collection.
+    """
+    out = np.empty((stop - start, width), dtype=dtype) if out is None else out[:stop - start]
+    for row, item in zip(out, collection[start:stop]):
+        row[:] = getattr(item, attribute)
+    return out
+
+def read_items(collection, attribute, indices, dtype):
+    """Copy the scalar attribute of the items at indices of a collection into an array."""
+    out = np.empty(len(indices), dtype=dtype)
+    for i, index in enumerate(indices.tolist()):
+        out[i] = getattr(collection[index], attribute)
+    return out
+
+def iter_attribute_chunks(collection, attribute, dtype, width, chunk_size):
+    """Yield (start, array) chunks of at most chunk_size items of a collection attribute.
+
+    Every chunk is read into the same buffer, which is only valid until the next one.
+    """
+    count = len(collection)
+    buffer = np.empty((min(chunk_size, count), width), dtype=dtype)
+    for start in range(0, count, chunk_size):
+        yield start, read_range(collection, attribute, start, min(start + chunk_size, count), dtype, width, buffer)
+
+def iter_face_chunks(mesh, chunk_size):
+    """Yield (loop_totals, vertex_indices) for chunks of at most chunk_size polygons.
+
+    loop_start and loop_total are read per face, so the faces do not have to
+    be stored in loop order; vertex_indices are the corners of the chunk's
+    faces in face order.
+    """
+    polygons = mesh.polygons
+    for start in range(0, len(polygons), chunk_size):
+        stop = min(start + chunk_size, len(polygons))
+        loop_starts = read_range(polygons, "loop_start", start, stop, np.int64, 1).ravel()
+        loop_totals = read_range(polygons, "loop_total", start, stop, np.int32, 1).ravel()
+        first_corner = np.cumsum(loop_totals) - loop_totals
+        loops = np.repeat(loop_starts - first_corner, loop_totals) + np.arange(int(loop_totals.sum()))
+        yield loop_totals, read_items(mesh.loops, "vertex_index", loops, np.int32)
+
+def loop_normals(mesh):
+    """Return the (collection, attribute) holding the mesh's per-corner normals."""
+    # corner_normals replaces the loop normals in newer Blender versions
+    if hasattr(mesh, "corner_normals"):
+        return mesh.corner_normals, "vector"
+    return mesh.loops, "normal"
+
+def write_ply_streaming(filepath, obj, file_format='binary_little_endian', memory_budget=DEFAULT_MEMORY_BUDGET):
+    """Write the given object as a PLY file in chunks that fit in memory_budget bytes.
+
+    Vertices and faces are read a chunk at a time, so the extra memory stays
+    within memory_budget whatever the mesh size, at the cost of reading items
+    one by one (write_ply_binary is faster when the mesh fits in memory). The
+    ASCII output matches write_ply.
+    """
+    if file_format not in PLY_FORMATS:
+        raise ValueError(f"Unknown PLY format '{file_format}', expected one of {PLY_FORMATS}")
+    mesh = obj.data
+    loops_per_face = len(mesh.loops) / max(1, len(mesh.polygons))
+    vertex_chunk = chunk_items(memory_budget, 12)
+    # Per face its start and size, per corner its loop index, vertex index and text
+    face_chunk = chunk_items(memory_budget, int(16 + 32 * loops_per_face))
+
+    with open(filepath, 'wb') as file:
+        file.write(ply_header(len(mesh.vertices), len(mesh.polygons), file_format))
+
+        for start, coords in iter_attribute_chunks(mesh.vertices, "co", np.float32, 3, vertex_chunk):
+            if file_format == 'ascii':
+                # Python floats print like vertex.co.x in write_ply
+                file.write("".join(f"{x} {y} {z}\n" for x, y, z in coords.tolist()).encode('ascii'))
+            else:
+                file.write(coords.astype('<f4').tobytes())
+
+        for loop_totals, vertex_indices in iter_face_chunks(mesh, face_chunk):
+            if loop_totals.max() > 255:
+                raise ValueError(f"Object {obj.name} has faces with more than 255 vertices")
+            if file_format == 'ascii':
+                faces = np.split(vertex_indices, np.cumsum(loop_totals)[:-1])
+                file.write("".join(f"{total} {' '.join(map(str, face.tolist()))}\n"
+                                   for total, face in zip(loop_totals.tolist(), faces)).encode('ascii'))
+            else:
+                file.write(face_buffer(loop_totals.astype(np.uint8), vertex_indices).tobytes())
+
+def write_vertex_data_streaming(filepath, mesh, meta=None, memory_budget=DEFAULT_MEMORY_BUDGET):
+    """Write the same columns as vertex_data_arrays to a .vtx file in chunks that fit in memory_budget bytes."""
+    normals, normal_attribute = loop_normals(mesh)
+    attributes = {
+        "positions": (mesh.vertices, "co", np.float32, 3),
+        "normals": (normals, normal_attribute, np.float32, 3),
+        "loop_vertex_index": (mesh.loops, "vertex_index", np.int32, 1),
+        "polygon_loop_total": (mesh.polygons, "loop_total", np.int32, 1),
+    }
+    for uv_layer in mesh.uv_layers:
+        attributes[f"uv:{uv_layer.name}"] = (uv_layer.data, "uv", np.float32, 2)
+
+    specs = {name: (dtype, (len(collection), width) if width > 1 else (len(collection),))
+             for name, (collection, attribute, dtype, width) in attributes.items()}
+    file, columns = open_columns(filepath, specs, meta)
+    with file:
+        for name, (collection, attribute, dtype, width) in attributes.items():
+            item_size = np.dtype(dtype).itemsize * width
+            chunk_size = chunk_items(memory_budget, item_size)
+            for start, chunk in iter_attribute_chunks(collection, attribute, dtype, width, chunk_size):
+                file.seek(columns[name]["offset"] + start * item_size)
+                file.write(chunk.astype(np.dtype(dtype).newbyteorder("<"), copy=False).tobytes())
@@ -0,0 +1,138 @@
+import bpy
+import os
+import sys
+import numpy as np
+
+# Blender does not put the script folder on sys.path when run with -P
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from rasterizer import clip_near, draw_triangles
+
+def camera_projection(cam_ob, scene, resolution):
+    """Return the camera's view matrix and a function projecting camera-space points to pixels.
+
+    The projection takes (N, 3) points with x, y in camera space and the
+    depth in front of the camera as z, and returns (pixel x, pixel y).
+    """
+    camera = cam_ob.data
+    frame = camera.view_frame(scene=scene)[:3]
+    min_x, max_x = frame[2].x, frame[1].x
+    min_y, max_y = frame[1].y, frame[0].y
+    frame_depth = -frame[0].z
+    view_matrix = np.array(cam_ob.matrix_world.normalized().inverted(), dtype=np.float64)
+    width, height = resolution
+
+    def project(points):
+        x, y = points[:, 0], points[:, 1]
+        if camera.type != 'ORTHO':
+            # Same normalization as world_to_camera_view, for points in front of the camera
+            x = x * frame_depth / points[:, 2]
+            y = y * frame_depth / points[:, 2]
+        px = (x - min_x) / (max_x - min_x) * width
+        py = (y - min_y) / (max_y - min_y) * height
+        return px, py
+
+    return view_matrix, project
+
+def object_triangles(obj, depsgraph):
+    """Return the world-space triangles of the evaluated object as a (T, 3, 3) array."""
+    evaluated = obj.evaluated_get(depsgraph)
+    mesh = evaluated.to_mesh()
+    try:
+        mesh.calc_loop_triangles()
+        coords = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", coords)
+        triangles = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+        mesh.loop_triangles.foreach_get("vertices", triangles)
+    finally:
+        evaluated.to_mesh_clear()
+    matrix = np.array(evaluated.matrix_world, dtype=np.float64)
+    coords = coords.reshape(-1, 3) @ matrix[:3, :3].T + matrix[:3, 3]
+    return coords[triangles.reshape(-1, 3)]
+
+def object_coverage(scene, cam_ob, resolution=(160, 90), objects=None):
+    """Rasterize the scene into a low-resolution depth buffer and measure each object's coverage.
+
+    Returns {object name: {"pixels", "coverage", "in_frustum", "occluded"}}.
+    pixels is the number of depth buffer pixels where the object is the
+    nearest surface, coverage the fraction of the frame. An object is occluded
+    when it has pixels inside the frame but is hidden behind others in all of them.
+    """
+    width, height = resolution
+    view_matrix, project = camera_projection(cam_ob, scene, resolution)
+    near = cam_ob.data.clip_start if cam_ob.data.type != 'ORTHO' else 0.0
+    is_ortho = cam_ob.data.type == 'ORTHO'
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+
+    if objects is None:
+        objects = [obj for obj in scene.objects if obj.type == 'MESH' and obj.visible_get()]
+
+    depth_buffer = np.full(width * height, np.inf)
+    id_buffer = np.full(width * height, -1, dtype=np.int64)
+    in_frustum = np.zeros(len(objects), dtype=bool)
+    # Vertices of objects too small to hit a pixel center, checked against the final depth buffer
+    subpixel_points = {}
+
+    for obj_index, obj in enumerate(objects):
+        triangles = object_triangles(obj, depsgraph)
+        if not len(triangles):
+            continue
+
+        # Camera space with the depth in front of the camera as z
+        local = triangles @ view_matrix[:3, :3].T + view_matrix[:3, 3]
+        local[:, :, 2] *= -1
+        local = clip_near(local, near)
+        if not len(local):
+            continue
+
+        px, py = project(local.reshape(-1, 3))
+        px, py, depth = px.reshape(-1, 3), py.reshape(-1, 3), local[:, :, 2]
+        # 1 / depth is linear in screen space for perspective projections
+        key = depth if is_ortho else -1.0 / depth
+
+        hit = draw_triangles(depth_buffer, id_buffer, width, height, px, py, key, obj_index)
+
+        on_screen = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+        in_frustum[obj_index] = hit or on_screen.any()
+        if not hit and on_screen.any():
+            subpixel_points[obj_index] = (px[on_screen], py[on_screen], key[on_screen])
+
+    pixel_counts = np.bincount(id_buffer[id_buffer >= 0], minlength=len(objects))
+    occluded = in_frustum & (pixel_counts == 0)
+    for obj_index, (px, py, keys) in subpixel_points.items():
+        pixels = py.astype(np.int64) * width + px.astype(np.int64)
+        if (keys < depth_buffer[pixels]).any():
+            occluded[obj_index] = False
+
+    result = {}
+    for obj_index, obj in enumerate(objects):
+        result[obj.name] = {
+            "pixels": int(pixel_counts[obj_index]),
+            "coverage": pixel_counts[obj_index] / (width * height),
+            "in_frustum": bool(in_frustum[obj_index]),
+            "occluded": bool(occluded[obj_index]),
+        }
+    return result
+
+def rank_by_coverage(coverage):
+    """Return (name, coverage) pairs of the objects on screen, largest coverage first."""
+    ranked = [(name, info["coverage"]) for name, info in coverage.items() if info["pixels"] > 0]
+    return sorted(ranked, key=lambda item: item[1], reverse=True)
+
+def hidden_objects(coverage):
+    """Return the names of the objects that are outside the frame or fully occluded."""
+    return [name for name, info in coverage.items() if not info["in_frustum"] or info["occluded"]]
+
+def main():
+    blend_file_path = "../blender_dataset/classroom/classroom.blend"
+    bpy.ops.wm.open_mainfile(filepath=blend_file_path)
+    scene = bpy.context.scene
+
+    coverage = object_coverage(scene, scene.camera)
+    for name, share in rank_by_coverage(coverage):
+        print(f"{name}: {share * 100:.2f}% of the frame")
+    occluded = [name for name, info in coverage.items() if info["occluded"]]
+    print(f"{len(occluded)} objects in the frame are fully occluded: {occluded}")
+    print(f"{len(hidden_objects(coverage))} of {len(coverage)} objects are hidden")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import bpy
+import csv
+import os
+import sys
+import time
+from pathlib import Path
+
+# Blender does not put the script folder on sys.path when run with -P
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from convergence import estimate_full_time, image_change
+from render_worker import EEVEE_ENGINES
+from viewer_node import VIEWER_IMAGE, result_viewer, viewer_pixels
+
+PROGRESSIVE_LOG_PATH = "progressive_renders.csv"
+LOG_FIELDS = ["scene", "output", "engine", "samples", "max_samples", "passes", "change", "converged",
+              "progressive_time", "full_time_estimate", "time_saved"]
+
+# Root mean square change between passes, on pixel values clipped to 0..1
+DEFAULT_TOLERANCE = 0.005
+START_SAMPLES = 4
+
+def sample_count(scene):
+    if scene.render.engine == 'CYCLES':
+        return scene.cycles.samples
+    if scene.render.engine in EEVEE_ENGINES:
+        return scene.eevee.taa_render_samples
+    return None
+
+def set_sample_count(scene, samples):
+    if scene.render.engine == 'CYCLES':
+        scene.cycles.samples = samples
+    else:
+        scene.eevee.taa_render_samples = samples
+
+def log_progressive_render(row, log_path=PROGRESSIVE_LOG_PATH):
+    new_file = not os.path.exists(log_path)
+    with open(log_path, "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=LOG_FIELDS)
+        if new_file:
+            writer.writeheader()
+        writer.writerow(row)
+
+def render_progressive(output_path, tolerance=DEFAULT_TOLERANCE, max_samples=None, start_samples=START_SAMPLES,
+                       log_path=PROGRESSIVE_LOG_PATH):
+    """Render at doubling sample counts until a pass changes the image by less than tolerance.
+
+    Stops at max_samples, the scene's own sample count by default, and saves
+    the last pass to output_path with the scene's output settings. Cycles
+    keeps its synced scene between passes (persistent data). The samples
+    used, the time taken and the time saved against one render at
+    max_samples (extrapolated from the passes) are appended to log_path.
+    Returns that row.
+    """
+    scene = bpy.context.scene
+    original_samples = sample_count(scene)
+    if original_samples is None:
+        raise ValueError(f"Progressive rendering supports Cycles and EEVEE, not {scene.render.engine}")
+    max_samples = max_samples or original_samples
+    original_persistent_data = scene.render.use_persistent_data
+    if scene.render.engine == 'CYCLES':
+        scene.render.use_persistent_data = True
+
+    start = time.perf_counter()
+    passes = []
+    previous = None
+    change = None
+    samples = min(start_samples, max_samples)
+    try:
+        with result_viewer(scene):
+            while True:
+                set_sample_count(scene, samples)
+                pass_start = time.perf_counter()
+                bpy.ops.render.render(write_still=False)
+                passes.append((samples, time.perf_counter() - pass_start))
+
+                pixels = viewer_pixels()[:, :3]
+                if previous is not None:
+                    change = image_change(pixels, previous)
+                    print(f"{samples} samples: change {change:.4f}")
+                    if change < tolerance:
+                        break
+                if samples >= max_samples:
+                    break
+                previous = pixels
+                samples = min(samples * 2, max_samples)
+
+            bpy.data.images[VIEWER_IMAGE].save_render(output_path, scene=scene)
+    finally:
+        scene.render.use_persistent_data = original_persistent_data
+        set_sample_count(scene, original_samples)
+
+    progressive_time = time.perf_counter() - start
+    full_time = estimate_full_time(passes, max_samples)
+    row = {
+        "scene": Path(bpy.data.filepath).stem or scene.name,
+        "output": output_path,
+        "engine": scene.render.engine,
+        "samples": samples,
+        "max_samples": max_samples,
+        "passes": len(passes),
+        "change": f"{change:.5f}" if change is not None else "",
+        "converged": change is not None and change < tolerance,
+        "progressive_time": f"{progressive_time:.2f}",
+        "full_time_estimate": f"{full_time:.2f}",
+        "time_saved": f"{full_time - progressive_time:.2f}",
+    }
+    if log_path:
+        log_progressive_render(row, log_path)
+    print(f"Progressive render stopped at {samples}/{max_samples} samples after {len(passes)} passes in "
+          f"{progressive_time:.2f}s (about {full_time:.2f}s at full samples), saved at {output_path}")
+    return row
+
+def main():
+    blend_file_path = "../blender_dataset/classroom/classroom.blend"
+    bpy.ops.wm.open_mainfile(filepath=blend_file_path)
+    bpy.context.scene.render.resolution_percentage = 25
+    render_progressive("classroom-progressive.png")
+
+if __name__ == "__main__":
+    main()
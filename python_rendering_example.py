@@ -1,6 +1,16 @@
 import bpy
+import queue
 import subprocess
 import os
+import threading
+import sys
+import time
+import numpy as np
+
+# Blender does not put the script folder on sys.path when run with -P
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from frame_regions import output_size
+from viewer_node import result_viewer, viewer_pixels
 
 # Function to create a cube
 def create_cube():
@@ -97,6 +107,127 @@ def render_animation(output_directory, start_frame=1, end_frame=50, file_format=
     bpy.ops.render.render(animation=True, write_still=True)
     print(f"Animation rendered and saved in {output_directory}")
 
+def ffmpeg_command(output_video_path, fps, raw_size=None):
+    """ffmpeg reading PNG images, or raw RGB frames of raw_size (width, height), from stdin."""
+    if raw_size:
+        input_args = ["-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{raw_size[0]}x{raw_size[1]}"]
+    else:
+        input_args = ["-f", "image2pipe", "-c:v", "png"]
+    return (["ffmpeg", "-y", "-loglevel", "error", "-framerate", str(fps)] + input_args +
+            ["-i", "-", "-c:v", "libx264", "-pix_fmt", "yuv420p", output_video_path])
+
+class FrameEncoder:
+    """A long-lived ffmpeg process encoding frames as they are handed over.
+
+    Frames go through a bounded queue to a writer thread, so encoding
+    overlaps rendering; when ffmpeg falls behind, put() blocks the render
+    until there is room again.
+    """
+
+    def __init__(self, output_video_path, fps, raw_size=None, queue_size=8):
+        self.output_video_path = output_video_path
+        self.process = subprocess.Popen(ffmpeg_command(output_video_path, fps, raw_size), stdin=subprocess.PIPE)
+        self.frames = queue.Queue(maxsize=queue_size)
+        self.error = None
+        self.count = 0
+        self._writer = threading.Thread(target=self._write_frames, daemon=True)
+        self._writer.start()
+
+    def _write_frames(self):
+        while True:
+            frame = self.frames.get()
+            if frame is None:
+                break
+            if self.error is None:
+                try:
+                    self.process.stdin.write(frame)
+                except OSError as e:
+                    # Keep draining the queue so the render side never blocks on a dead encoder
+                    self.error = e
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+
+    def put(self, frame):
+        """Queue the bytes of one frame, blocking while the queue is full."""
+        if self.error is not None:
+            raise RuntimeError(f"ffmpeg stopped accepting frames: {self.error}")
+        self.frames.put(frame)
+        self.count += 1
+
+    def close(self):
+        """Wait for ffmpeg to encode the queued frames and finish the video."""
+        self.frames.put(None)
+        self._writer.join()
+        returncode = self.process.wait()
+        if self.error is not None or returncode != 0:
+            raise RuntimeError(f"ffmpeg failed with exit code {returncode}: {self.error}")
+        print(f"Encoded {self.count} frames into {self.output_video_path}")
+
+def check_standard_view(scene):
+    """Raise ValueError unless the scene's colour management is the plain sRGB transform viewer_frame applies."""
+    view, display = scene.view_settings, scene.display_settings
+    if (view.view_transform != 'Standard' or view.look not in ('None', '') or view.exposure != 0.0
+            or view.gamma != 1.0 or view.use_curve_mapping or display.display_device != 'sRGB'):
+        raise ValueError(f"Frames can only be piped without image files under the Standard view transform on an "
+                         f"sRGB display with no look, exposure, gamma or curves, not '{view.view_transform}' "
+                         f"(look '{view.look}'); pass output_directory to encode the saved images instead")
+
+def viewer_frame(width, height):
+    """Return the Viewer node image as top-down sRGB rgb24 bytes.
+
+    The Viewer image is scene linear, only the standard sRGB transform is
+    applied here, see check_standard_view.
+    """
+    rgb = np.clip(viewer_pixels().reshape(height, width, 4)[::-1, :, :3], 0.0, 1.0)
+    srgb = np.where(rgb <= 0.0031308, rgb * 12.92, 1.055 * np.power(rgb, 1 / 2.4) - 0.055)
+    return (srgb * 255 + 0.5).astype(np.uint8).tobytes()
+
+def render_animation_to_video(output_video_path, start_frame=1, end_frame=50, fps=24, output_directory=None,
+                              queue_size=8):
+    """Render the frame range and encode it into output_video_path while it renders.
+
+    With output_directory the PNG frames are written there as usual and each
+    one is handed to ffmpeg from a render_write handler as soon as it is
+    saved. Without it no image files are written: every frame is rendered in
+    memory and its pixels are piped to ffmpeg as raw video, which needs the
+    Standard view transform (ValueError otherwise, see check_standard_view).
+    """
+    scene = bpy.context.scene
+    scene.frame_start = start_frame
+    scene.frame_end = end_frame
+    scene.render.fps = fps
+
+    if output_directory:
+        scene.render.image_settings.file_format = 'PNG'
+        scene.render.filepath = output_directory
+        encoder = FrameEncoder(output_video_path, fps, queue_size=queue_size)
+
+        def on_frame_written(scene, *args):
+            with open(scene.render.frame_path(frame=scene.frame_current), "rb") as f:
+                encoder.put(f.read())
+
+        bpy.app.handlers.render_write.append(on_frame_written)
+        try:
+            bpy.ops.render.render(animation=True, write_still=True)
+        finally:
+            bpy.app.handlers.render_write.remove(on_frame_written)
+            encoder.close()
+        return
+
+    check_standard_view(scene)
+    width, height = output_size(scene)
+    with result_viewer(scene):
+        encoder = FrameEncoder(output_video_path, fps, raw_size=(width, height), queue_size=queue_size)
+        try:
+            for frame in range(start_frame, end_frame + 1):
+                scene.frame_set(frame)
+                bpy.ops.render.render(write_still=False)
+                encoder.put(viewer_frame(width, height))
+        finally:
+            encoder.close()
+
 # Custom operator example
 class SimpleOperator(bpy.types.Operator):
     bl_idname = "object.simple_operator"
@@ -119,6 +250,21 @@ def unregister():
     bpy.types.VIEW3D_MT_mesh_add.remove(menu_func)
 
 
+def encode_image_sequence(output_dir, output_video_path, fps=24):
+    # Combine the rendered images into a video once they are all written
+    image_sequence_pattern = os.path.join(output_dir, "%4d.png")  # Adjust the pattern to match your rendered filenames
+
+    command = [
+        "ffmpeg",
+        "-framerate", str(fps),
+        "-i", image_sequence_pattern,
+        "-c:v", "libx264",
+        "-pix_fmt", "yuv420p",
+        output_video_path
+    ]
+    subprocess.run(command)
+    print(f"Video rendered and saved at {output_video_path}")
+
 def main():
     # Create a cube
     create_cube()
@@ -135,24 +281,16 @@ def main():
     if not os.path.isdir(output_dir):
         os.makedirs(output_dir)
     fps = 24
-    render_animation(output_dir, start_frame=1, end_frame=50,file_format="PNG", fps=fps)
-
-
-    # ## create video
-    # # Additional lines to combine the output images into a video
     output_video_path = os.path.join(output_dir, "animation.mp4")
-    image_sequence_pattern = os.path.join(output_dir, "%4d.png")  # Adjust the pattern to match your rendered filenames
 
-    ffmpeg_command = [
-        "ffmpeg",
-        "-framerate", str(fps),
-        "-i", image_sequence_pattern,
-        "-c:v", "libx264",
-        "-pix_fmt", "yuv420p",
-        output_video_path
-    ]
-    subprocess.run(ffmpeg_command)
-    print(f"Video rendered and saved at {output_video_path}")
+    # Encode while rendering, keeping the PNG frames; output_directory=None skips writing them
+    start = time.perf_counter()
+    render_animation_to_video(output_video_path, start_frame=1, end_frame=50, fps=fps, output_directory=output_dir)
+    print(f"Video rendered and saved at {output_video_path} in {time.perf_counter() - start:.1f}s")
+
+    # Previous two-step version: render every PNG, then encode them
+    # render_animation(output_dir, start_frame=1, end_frame=50,file_format="PNG", fps=fps)
+    # encode_image_sequence(output_dir, output_video_path, fps)
 
 
     # Register the custom operator
@@ -0,0 +1,98 @@
+import numpy as np
+
+# Triangles whose pixel bounding box is at most this many pixels are rasterized
+# together in vectorized batches; larger ones are filled one by one.
+SMALL_TRIANGLE_PIXELS = 64
+# Upper bound on the number of candidate pixel samples held at once
+MAX_BATCH_SAMPLES = 4_000_000
+
+def clip_near(triangles, near):
+    """Clip (T, 3, 3) camera-space triangles (depth as z) against the near plane."""
+    behind = triangles[:, :, 2] < near
+    num_behind = behind.sum(axis=1)
+    result = [triangles[num_behind == 0]]
+
+    def intersect(a, b):
+        t = ((near - a[:, 2]) / (b[:, 2] - a[:, 2]))[:, None]
+        return a + (b - a) * t
+
+    for count in (1, 2):
+        selected = triangles[num_behind == count]
+        if not len(selected):
+            continue
+        # Rotate the vertices so the odd one out (behind for 1, in front for 2) comes first
+        odd = behind[num_behind == count] if count == 1 else ~behind[num_behind == count]
+        first = np.argmax(odd, axis=1)
+        order = (first[:, None] + np.arange(3)) % 3
+        selected = np.take_along_axis(selected, order[:, :, None], axis=1)
+        a, b, c = selected[:, 0], selected[:, 1], selected[:, 2]
+        ab, ac = intersect(a, b), intersect(a, c)
+        if count == 1:
+            # a is behind: the visible part is the quad ab, b, c, ac
+            result.append(np.stack([ab, b, c], axis=1))
+            result.append(np.stack([ab, c, ac], axis=1))
+        else:
+            # only a is in front
+            result.append(np.stack([a, ab, ac], axis=1))
+    return np.concatenate(result)
+
+def rasterize(px, py, key, width, height):
+    """Yield (pixel index, depth key) samples of screen-space triangles in batches."""
+    x0, x1, x2 = px[:, 0], px[:, 1], px[:, 2]
+    y0, y1, y2 = py[:, 0], py[:, 1], py[:, 2]
+    area = (x1 - x0) * (y2 - y0) - (x2 - x0) * (y1 - y0)
+
+    # Pixel bounding boxes, sampling at pixel centers
+    min_x = np.clip(np.ceil(px.min(axis=1) - 0.5), 0, width).astype(np.int64)
+    max_x = np.clip(np.floor(px.max(axis=1) - 0.5), -1, width - 1).astype(np.int64)
+    min_y = np.clip(np.ceil(py.min(axis=1) - 0.5), 0, height).astype(np.int64)
+    max_y = np.clip(np.floor(py.max(axis=1) - 0.5), -1, height - 1).astype(np.int64)
+    box_w = max_x - min_x + 1
+    box_h = max_y - min_y + 1
+    valid = (box_w > 0) & (box_h > 0) & (area != 0)
+
+    def samples(tri, sx, sy):
+        cx, cy = sx + 0.5, sy + 0.5
+        w0 = ((x1[tri] - cx) * (y2[tri] - cy) - (x2[tri] - cx) * (y1[tri] - cy)) / area[tri]
+        w1 = ((x2[tri] - cx) * (y0[tri] - cy) - (x0[tri] - cx) * (y2[tri] - cy)) / area[tri]
+        w2 = 1.0 - w0 - w1
+        inside = (w0 >= 0) & (w1 >= 0) & (w2 >= 0)
+        depth = w0 * key[tri, 0] + w1 * key[tri, 1] + w2 * key[tri, 2]
+        return (sy * width + sx)[inside], depth[inside]
+
+    small = np.flatnonzero(valid & (box_w * box_h <= SMALL_TRIANGLE_PIXELS))
+    batch_size = MAX_BATCH_SAMPLES // SMALL_TRIANGLE_PIXELS
+    for batch in range(0, len(small), batch_size):
+        # Expand every small triangle to all pixels of its bounding box at once
+        batch_triangles = small[batch:batch + batch_size]
+        sizes = (box_w * box_h)[batch_triangles]
+        tri = np.repeat(batch_triangles, sizes)
+        offset = np.arange(len(tri)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        sx = min_x[tri] + offset % box_w[tri]
+        sy = min_y[tri] + offset // box_w[tri]
+        yield samples(tri, sx, sy)
+
+    for t in np.flatnonzero(valid & (box_w * box_h > SMALL_TRIANGLE_PIXELS)):
+        sy, sx = np.mgrid[min_y[t]:max_y[t] + 1, min_x[t]:max_x[t] + 1]
+        yield samples(np.full(sx.size, t), sx.ravel(), sy.ravel())
+
+def draw_triangles(depth_buffer, id_buffer, width, height, px, py, key, obj_index):
+    """Depth test screen-space triangles into the buffers, returning True if any covered a pixel center.
+
+    depth_buffer holds the smallest key seen per pixel, id_buffer the index
+    of the object it belongs to; both are flat width * height arrays.
+    """
+    hit = False
+    for pixels, keys in rasterize(px, py, key, width, height):
+        if not len(pixels):
+            continue
+        hit = True
+        # Nearest sample of this object per pixel, then merge into the buffers
+        order = np.lexsort((keys, pixels))
+        pixels, keys = pixels[order], keys[order]
+        first = np.concatenate([[True], pixels[1:] != pixels[:-1]])
+        pixels, keys = pixels[first], keys[first]
+        closer = keys < depth_buffer[pixels]
+        depth_buffer[pixels[closer]] = keys[closer]
+        id_buffer[pixels[closer]] = obj_index
+    return hit
@@ -0,0 +1,129 @@
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+from PIL import Image
+
+from frame_regions import tile_border, tile_regions
+from render_client import RenderWorker
+from render_farm import render_jobs
+
+# Tiles are stitched with PIL, which reads 8-bit PNGs losslessly
+TILE_SETTINGS = {"file_format": "PNG", "color_depth": "8"}
+
+def stitch_tiles(tiles, width, height, output_path):
+    """Paste the core of every rendered tile into one image and save it as PNG."""
+    result = None
+    for tile in tiles:
+        x0, x1, y0, y1 = tile["core"]
+        rx0, rx1, ry0, ry1 = tile["render"]
+        with Image.open(tile["path"]) as image:
+            if image.size != (rx1 - rx0, ry1 - ry0):
+                raise RuntimeError(f"Tile {tile['path']} is {image.size[0]}x{image.size[1]}, "
+                                   f"expected {rx1 - rx0}x{ry1 - ry0}")
+            if result is None:
+                result = Image.new(image.mode, (width, height))
+            # Image rows start at the top, Blender's border at the bottom
+            left, top = x0 - rx0, ry1 - y1
+            core = image.crop((left, top, left + x1 - x0, top + y1 - y0))
+            result.paste(core, (x0, height - y1))
+    result.save(output_path)
+
+def render_resolution(blend_file_path, settings):
+    """Ask a render worker for the output resolution of the .blend file under settings."""
+    with RenderWorker() as worker:
+        message = worker.info(blend_file_path, **settings)
+    if message["status"] != "done":
+        raise RuntimeError(message["error"])
+    return message["resolution"]
+
+def render_still_tiled(blend_file_path, output_path, tiles=(2, 2), overlap=8, num_workers=4, settings=None,
+                       resolution=None):
+    """Render a still as border regions in parallel workers and stitch them into output_path.
+
+    Each tile is rendered with use_border and use_crop_to_border, grown by
+    overlap pixels so that filters reaching across tile edges (pixel filter,
+    adaptive sampling) see the same neighbourhood as in a full render; the
+    overlap is cropped away when stitching. Cycles samples every pixel
+    independently, so without denoising the result matches a single render
+    pixel for pixel. Denoising, bloom, glare and other screen-space or
+    compositor effects look at a wider area and can show seams. Returns the
+    per-tile results.
+    """
+    settings = dict(settings or {}, **TILE_SETTINGS)
+    if resolution is None:
+        resolution = render_resolution(blend_file_path, settings)
+    width, height = resolution
+
+    tile_folder = tempfile.mkdtemp(prefix="region_render_")
+    try:
+        regions = tile_regions(width, height, tiles[0], tiles[1], overlap)
+        jobs = []
+        for index, tile in enumerate(regions):
+            tile["path"] = os.path.join(tile_folder, f"tile_{index:03d}.png")
+            jobs.append((f"Tile {index}", dict(settings, border=tile_border(tile, width, height)), tile["path"]))
+
+        results = render_jobs(blend_file_path, jobs, num_workers, max_retries=1)
+        failed = [result for result in results if not result["ok"]]
+        if failed:
+            raise RuntimeError(f"{len(failed)} of {len(jobs)} tiles failed:\n{failed[0]['error']}")
+        stitch_tiles(regions, width, height, output_path)
+    finally:
+        shutil.rmtree(tile_folder, ignore_errors=True)
+
+    print(f"Stitched {len(regions)} tiles into {output_path}")
+    return results
+
+def render_still(blend_file_path, output_path, settings=None):
+    """Render a still in a single worker with the same settings as the tiled render."""
+    settings = dict(settings or {}, **TILE_SETTINGS)
+    results = render_jobs(blend_file_path, [("Full frame", settings, output_path)], num_workers=1, max_retries=0)
+    if not results[0]["ok"]:
+        raise RuntimeError(results[0]["error"])
+    return results[0]
+
+def compare_images(path_a, path_b):
+    """Return the number of differing pixels and the largest channel difference of two images."""
+    with Image.open(path_a) as image_a, Image.open(path_b) as image_b:
+        if image_a.size != image_b.size or image_a.mode != image_b.mode:
+            raise ValueError(f"Cannot compare {image_a.size} {image_a.mode} with {image_b.size} {image_b.mode}")
+        a = np.asarray(image_a, dtype=np.int32)
+        b = np.asarray(image_b, dtype=np.int32)
+    difference = np.abs(a - b)
+    if difference.ndim == 3:
+        difference = difference.max(axis=2)
+    return int((difference > 0).sum()), int(difference.max(initial=0))
+
+def verify_tiled_render(blend_file_path, settings, tiles=(2, 2), overlap=8, num_workers=2):
+    """Render the scene both tiled and in one piece and report whether the images match pixel for pixel."""
+    full_path, tiled_path = "verify-full.png", "verify-tiled.png"
+
+    start = time.perf_counter()
+    render_still(blend_file_path, full_path, settings)
+    full_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    render_still_tiled(blend_file_path, tiled_path, tiles, overlap, num_workers, settings)
+    tiled_time = time.perf_counter() - start
+
+    differing, max_difference = compare_images(full_path, tiled_path)
+    print(f"Single render {full_time:.2f}s, {tiles[0]}x{tiles[1]} tiles {tiled_time:.2f}s")
+    if differing:
+        print(f"Images differ in {differing} pixels, by up to {max_difference}")
+    else:
+        print("Tiled render is pixel-identical to the single render")
+    return differing == 0
+
+def main():
+    blend_file_path = "../blender_dataset/classroom/classroom.blend"
+
+    # Small test render without denoising, which is the case tiles reproduce exactly
+    test_settings = {"engine": "CYCLES", "samples": 16, "denoising": False, "resolution_percentage": 10}
+    verify_tiled_render(blend_file_path, test_settings)
+
+    # render_still_tiled("../blender_dataset/castle-landscape.blend", "castle-landscape.png",
+    #                    tiles=(4, 4), num_workers=4)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from blend_list import BLEND_LIST, SMOKE_SCENE_NAMES
+from blender_process import parse_result, run_blender
+from render_log import RenderLog, time_to_first_sample
+
+BENCHMARK_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_render_scene.py")
+# Fixed settings per tier, changing them makes earlier baselines incomparable
+TIER_SETTINGS = {
+    "smoke": {"engine": "CYCLES", "samples": 16, "resolution_percentage": 100, "denoising": False},
+    "full": {"engine": "CYCLES", "samples": 64, "resolution_percentage": 25, "denoising": False},
+}
+
+METRICS = ["wall_time", "load_time", "sync_time", "render_time", "peak_memory"]
+# Changes smaller than these (seconds, MB) are noise and never flagged, whatever the ratio
+NOISE_FLOORS = {"wall_time": 0.5, "load_time": 0.2, "sync_time": 0.2, "render_time": 0.5, "peak_memory": 50.0}
+
+def benchmark_cases(tier):
+    """Return (case name, scene arguments) of the tier's scenes."""
+    if tier == "smoke":
+        return [(name, ["--smoke", name]) for name in SMOKE_SCENE_NAMES]
+    return [(Path(blend_file_path).stem, ["--blend", blend_file_path]) for blend_file_path in BLEND_LIST]
+
+def run_case(scene_args, settings, timeout=None, threads=None):
+    """Render one benchmark scene in a fresh Blender process and return its metrics.
+
+    Load and render times come from the scene script, sync time (everything
+    before the first sample) and peak memory from Blender's status lines.
+    """
+    args = (["--factory-startup", "--python", BENCHMARK_SCRIPT, "--"] + scene_args +
+            ["--settings", json.dumps(settings)])
+    log = RenderLog()
+    start = time.perf_counter()
+    try:
+        returncode, lines = run_blender(args, timeout=timeout, threads=threads, on_line=log.feed)
+    except OSError as e:
+        returncode, lines = -1, [f"Could not start Blender: {e}"]
+    wall_time = time.perf_counter() - start
+
+    result = parse_result(lines)
+    if returncode != 0 or result is None:
+        return {"ok": False, "returncode": returncode, "error": "\n".join(lines[-20:])}
+
+    arrays, phases, _ = log.arrays()
+    device_peak = arrays["device_peak"]
+    return {
+        "ok": True,
+        "wall_time": wall_time,
+        "load_time": result["timings"]["load"],
+        "sync_time": time_to_first_sample(arrays, phases),
+        "render_time": result["timings"]["render"],
+        "peak_memory": float(arrays["peak"].max()) if len(arrays["peak"]) else math.nan,
+        "peak_device_memory": float(np.nanmax(device_peak)) if np.isfinite(device_peak).any() else math.nan,
+        "resolution": result["resolution"],
+        "blender_version": result["blender_version"],
+    }
+
+def merge_repeats(runs):
+    """Combine repeated runs of a case: the fastest time and the largest memory peak of each metric."""
+    merged = dict(runs[0])
+    for name in ("wall_time", "load_time", "sync_time", "render_time", "peak_memory", "peak_device_memory"):
+        values = [run[name] for run in runs if not math.isnan(run[name])]
+        if values:
+            merged[name] = max(values) if name.startswith("peak") else min(values)
+    merged["repeats"] = len(runs)
+    return merged
+
+def run_benchmark(tier="smoke", repeat=1, timeout=None, threads=None):
+    """Render every scene of the tier repeat times and return the results document."""
+    settings = TIER_SETTINGS[tier]
+    cases = {}
+    for name, scene_args in benchmark_cases(tier):
+        runs = []
+        for _ in range(repeat):
+            run = run_case(scene_args, settings, timeout, threads)
+            if not run["ok"]:
+                runs = [run]
+                break
+            runs.append(run)
+        cases[name] = merge_repeats(runs) if runs[0]["ok"] else runs[0]
+        if cases[name]["ok"]:
+            print(f"{name}: {cases[name]['wall_time']:.1f}s")
+        else:
+            print(f"{name}: FAILED (exit code {cases[name]['returncode']})\n{cases[name]['error']}")
+
+    versions = {case["blender_version"] for case in cases.values() if case["ok"]}
+    return {
+        "tier": tier,
+        "settings": settings,
+        "threads": threads,
+        "blender_version": versions.pop() if len(versions) == 1 else sorted(versions),
+        "machine": {"node": platform.node(), "processor": platform.processor(), "cpu_count": os.cpu_count()},
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "cases": cases,
+    }
+
+def replace_nan(value):
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, dict):
+        return {key: replace_nan(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [replace_nan(item) for item in value]
+    return value
+
+def save_results(results, filepath):
+    # Missing metrics (NaN) are written as null so the file stays plain JSON
+    with open(filepath, "w") as f:
+        json.dump(replace_nan(results), f, indent=1)
+
+def load_results(filepath):
+    with open(filepath) as f:
+        return json.load(f)
+
+def compare_results(results, baseline, threshold=0.1):
+    """Return the regressions of results against baseline as (case, metric, old, new) tuples.
+
+    A metric regresses when it grows by more than threshold (a fraction) and
+    by more than its noise floor. Cases or values missing on either side are
+    skipped.
+    """
+    if results["settings"] != baseline["settings"]:
+        raise ValueError(f"Render settings {results['settings']} differ from the baseline's {baseline['settings']}")
+    regressions = []
+    for name, case in results["cases"].items():
+        old_case = baseline["cases"].get(name)
+        if not case["ok"] or not old_case or not old_case["ok"]:
+            continue
+        for metric in METRICS:
+            old, new = old_case.get(metric), case.get(metric)
+            if old is None or new is None or math.isnan(old) or math.isnan(new):
+                continue
+            if new > old * (1 + threshold) and new - old > NOISE_FLOORS[metric]:
+                regressions.append((name, metric, old, new))
+    return regressions
+
+def format_metric(metric, value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return "-"
+    return f"{value:.0f} MB" if metric == "peak_memory" else f"{value:.2f}s"
+
+def print_comparison(results, baseline):
+    print(f"{'case':<42} " + " ".join(f"{metric:>20}" for metric in METRICS))
+    for name, case in results["cases"].items():
+        if not case["ok"]:
+            print(f"{name:<42} FAILED")
+            continue
+        old_case = baseline["cases"].get(name, {}) if baseline else {}
+        cells = []
+        for metric in METRICS:
+            cell = format_metric(metric, case.get(metric))
+            old = old_case.get(metric) if old_case.get("ok") else None
+            if old and case.get(metric) is not None and not math.isnan(case[metric]):
+                cell += f" ({(case[metric] / old - 1) * 100:+.0f}%)"
+            cells.append(f"{cell:>20}")
+        print(f"{name:<42} " + " ".join(cells))
+
+def main():
+    # python render_benchmark.py [--tier smoke|full] [--repeat N] [--update-baseline]
+    parser = argparse.ArgumentParser(description="Render benchmark scenes under fixed settings and compare "
+                                                 "them with a stored baseline.")
+    parser.add_argument("--tier", choices=sorted(TIER_SETTINGS), default="smoke")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per scene, the fastest one counts")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Allowed growth of a metric, as a fraction")
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=None, help="Seconds before a render is killed")
+    parser.add_argument("--results", default=None, help="Default render_benchmark_<tier>.json")
+    parser.add_argument("--baseline", default=None, help="Default render_benchmark_<tier>_baseline.json")
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the new baseline")
+    args = parser.parse_args()
+    results_path = args.results or f"render_benchmark_{args.tier}.json"
+    baseline_path = args.baseline or f"render_benchmark_{args.tier}_baseline.json"
+
+    start = time.perf_counter()
+    results = run_benchmark(args.tier, args.repeat, args.timeout, args.threads)
+    save_results(results, results_path)
+    print(f"Benchmarked {len(results['cases'])} scenes in {time.perf_counter() - start:.1f}s, "
+          f"results saved at {results_path}\n")
+
+    baseline = load_results(baseline_path) if os.path.exists(baseline_path) else None
+    print_comparison(results, baseline)
+    if baseline is None or args.update_baseline:
+        save_results(results, baseline_path)
+        print(f"\nBaseline saved at {baseline_path}")
+        return
+
+    if baseline["blender_version"] != results["blender_version"]:
+        print(f"\nNote: baseline rendered with Blender {baseline['blender_version']}, "
+              f"now {results['blender_version']}")
+    regressions = compare_results(results, baseline, args.threshold)
+    failed = [name for name, case in results["cases"].items() if not case["ok"]]
+    for name, metric, old, new in regressions:
+        print(f"REGRESSION {name} {metric}: {format_metric(metric, old)} -> {format_metric(metric, new)} "
+              f"({(new / old - 1) * 100:+.0f}%)")
+    if regressions or failed:
+        sys.exit(1)
+    print(f"\nNo regressions beyond {args.threshold * 100:.0f}%")
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,21 @@
 import bpy
+import argparse
+import os
+import sys
 from pathlib import Path
 
-def render_image(blend_file_path, output_image_path):
+# Blender does not put the script folder on sys.path when run with -P
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from blend_list import BLEND_LIST
+from blender_process import print_result, script_args
+from progressive_render import render_progressive
+from render_cache import RENDER_CACHE_DIR, print_cache_stats, render_cached
+
+def render_image(blend_file_path, output_image_path, cache_dir=None, progressive=False):
+    """Render a still, or with cache_dir reuse the image of an identical earlier render.
+
+    With progressive, stop adding samples once the image has converged (see progressive_render).
+    """
     # Load the .blend file
     bpy.ops.wm.open_mainfile(filepath=blend_file_path)
 
@@ -10,7 +24,12 @@ def render_image(blend_file_path, output_image_path):
     bpy.context.scene.render.filepath = output_image_path
 
     # Render the image
-    bpy.ops.render.render(write_still=True)
+    if progressive:
+        render_progressive(output_image_path)
+    elif cache_dir:
+        render_cached(output_image_path, cache_dir)
+    else:
+        bpy.ops.render.render(write_still=True)
     print(f"Rendered image saved at {output_image_path}")
 
 
@@ -102,26 +121,39 @@ def render_opengl(blend_file_path, output_image_path, frame=1):
     bpy.ops.render.opengl(animation=False, write_still=True)
     print(f"OpenGL rendered image saved at {output_image_path}")
 
+def run_from_command_line(args):
+    parser = argparse.ArgumentParser(description="Render a still or an animation of a .blend file.")
+    parser.add_argument("--blend", required=True)
+    parser.add_argument("--output", required=True, help="Image path, or output directory with --animation")
+    parser.add_argument("--animation", action="store_true")
+    parser.add_argument("--frames", nargs=2, type=int, default=None, metavar=("START", "END"))
+    parser.add_argument("--cache-dir", default=None)
+    parser.add_argument("--progressive", action="store_true", help="Stop adding samples once converged")
+    args = parser.parse_args(args)
+
+    if not args.animation:
+        render_image(args.blend, args.output, cache_dir=args.cache_dir, progressive=args.progressive)
+    elif args.frames:
+        render_animation_start_end(args.blend, args.output, *args.frames)
+    else:
+        render_animation(args.blend, args.output)
+    print_result({"blend_file": args.blend, "output": args.output})
 
 def main():
-    blend_list = [
-    # "../blender_dataset/Blender_partytug.blend",
-    # "../blender_dataset/barbershop_interior.blend",
-    # "../blender_dataset/blender-3.3-splash.blend",
-    # "../blender_dataset/castle-landscape.blend",
-    # "../blender_dataset/lone-monk_cycles_and_exposure-node_demo.blend",
-    # "../blender_dataset/ocean-scene.blend",
-    "../blender_dataset/classroom/classroom.blend",
-    # "../blender_dataset/restaurant_anim_test/rain_restaurant.blend",
-    # "../blender_dataset/splash279/splash279.blend",
-    # "../blender_dataset/blender-278-splash/Blenderman.blend"
-    ]
+    # blender -b -P render_blend.py -- --blend <file> --output <path> [--animation [--frames START END]]
+    if script_args():
+        run_from_command_line(script_args())
+        return
+
+    blend_list = [blend_file_path for blend_file_path in BLEND_LIST if Path(blend_file_path).stem == "classroom"]
+    # blend_list = BLEND_LIST
 
     # blend_list = ["../blender_dataset/restaurant_anim_test/rain_restaurant.blend"]
 
     for blend_file_path in blend_list:
         output_image_path = Path(blend_file_path).stem + '.png'
-        render_image(blend_file_path, output_image_path)
+        render_image(blend_file_path, output_image_path, cache_dir=RENDER_CACHE_DIR)
+    print_cache_stats(RENDER_CACHE_DIR)
 
 
     # blend_file_path = "../blender_dataset/restaurant_anim_test/rain_restaurant.blend"
@@ -0,0 +1,299 @@
+import bpy
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+import numpy as np
+
+# Blender does not put the script folder on sys.path when run with -P
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from blender_export_script import mesh_hash
+
+RENDER_CACHE_DIR = "render_cache"
+CACHE_MANIFEST_NAME = "render_cache.json"
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+# Properties that change with every call, with the session or only in the editors, not in the rendered image
+IGNORED_PROPERTIES = {
+    "rna_type", "filepath", "name_full", "users", "use_fake_user", "use_extra_user", "tag", "is_evaluated",
+    "original", "session_uid", "is_missing", "is_runtime_data", "is_embedded_data", "is_library_indirect",
+    "show_expanded", "show_in_editmode", "show_on_cage", "is_override_data_local",
+}
+# Layout of nodes in the node editor, elsewhere (lights, cameras, ...) these names can change the image
+NODE_UI_PROPERTIES = {
+    "select", "location", "width", "width_hidden", "height", "dimensions", "show_options", "show_preview",
+    "show_texture", "is_active",
+}
+# Geometry whose data is not hashed here, scenes with these objects are rendered without the cache
+UNCACHED_OBJECT_TYPES = {'CURVES', 'POINTCLOUD', 'VOLUME'}
+# Per-point curve data read with foreach_get, with its width
+SPLINE_POINT_ATTRIBUTES = (("co", 4), ("radius", 1), ("tilt", 1), ("weight", 1))
+BEZIER_POINT_ATTRIBUTES = (("co", 3), ("handle_left", 3), ("handle_right", 3), ("radius", 1), ("tilt", 1))
+SPLINE_SETTINGS = ("type", "use_cyclic_u", "use_cyclic_v", "resolution_u", "resolution_v", "order_u", "order_v",
+                   "use_endpoint_u", "use_endpoint_v", "use_bezier_u", "use_bezier_v", "use_smooth",
+                   "material_index", "tilt_interpolation", "radius_interpolation")
+
+def plain(value):
+    """Convert an RNA value to something json can encode."""
+    if isinstance(value, bpy.types.ID):
+        return value.name
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, set):
+        return sorted(value)
+    try:
+        return np.array(value, dtype=np.float64).ravel().tolist()
+    except (TypeError, ValueError):
+        return str(value)
+
+def rna_values(struct, ignored=IGNORED_PROPERTIES):
+    """Return the render-relevant property values of an RNA struct, ID pointers by name."""
+    values = {}
+    for prop in struct.bl_rna.properties:
+        if prop.identifier in ignored or prop.type == 'COLLECTION':
+            continue
+        value = getattr(struct, prop.identifier, None)
+        if prop.type == 'POINTER' and not isinstance(value, bpy.types.ID):
+            # Nested structs (settings groups) are fingerprinted by their owners where they matter
+            continue
+        values[prop.identifier] = plain(value)
+    return values
+
+def node_tree_values(tree, seen=None):
+    """Return the nodes, socket values and links of a node tree, node groups included."""
+    seen = set() if seen is None else seen
+    if tree is None or tree.name in seen:
+        return None
+    seen.add(tree.name)
+    nodes = {}
+    for node in tree.nodes:
+        entry = rna_values(node, IGNORED_PROPERTIES | NODE_UI_PROPERTIES)
+        entry["inputs"] = [plain(getattr(socket, "default_value", None)) for socket in node.inputs]
+        if getattr(node, "node_tree", None) is not None:
+            entry["group"] = node_tree_values(node.node_tree, seen)
+        nodes[node.name] = entry
+    links = sorted((link.from_node.name, link.from_socket.identifier, link.to_node.name, link.to_socket.identifier)
+                   for link in tree.links)
+    return {"nodes": nodes, "links": links}
+
+def mesh_render_hash(mesh):
+    """Hash the mesh topology, UVs, material indices and smooth flags."""
+    digest = hashlib.sha256(mesh_hash(mesh, {}).encode())
+    for uv_layer in mesh.uv_layers:
+        uvs = np.empty(len(uv_layer.data) * 2, dtype=np.float32)
+        uv_layer.data.foreach_get("uv", uvs)
+        digest.update(uv_layer.name.encode())
+        digest.update(uvs.tobytes())
+    for attribute, dtype in (("material_index", np.int32), ("use_smooth", bool)):
+        data = np.empty(len(mesh.polygons), dtype=dtype)
+        mesh.polygons.foreach_get(attribute, data)
+        digest.update(data.tobytes())
+    return digest.hexdigest()
+
+def curve_render_hash(curve):
+    """Hash the splines of a curve or surface: settings, points, bezier handles, radius and tilt."""
+    digest = hashlib.sha256()
+    for spline in curve.splines:
+        digest.update(json.dumps([plain(getattr(spline, name)) for name in SPLINE_SETTINGS]).encode())
+        for points, attributes in ((spline.points, SPLINE_POINT_ATTRIBUTES),
+                                   (spline.bezier_points, BEZIER_POINT_ATTRIBUTES)):
+            for attribute, width in attributes:
+                data = np.empty(len(points) * width, dtype=np.float32)
+                points.foreach_get(attribute, data)
+                digest.update(data.tobytes())
+    return digest.hexdigest()
+
+def modifier_values(modifier):
+    """Return the settings of a modifier, with the inputs and node tree of a geometry nodes modifier."""
+    values = rna_values(modifier)
+    if modifier.type == 'NODES':
+        # Group inputs are ID properties of the modifier, not RNA properties
+        values["inputs"] = {key: plain(modifier[key]) for key in modifier.keys()}
+        values["nodes"] = node_tree_values(modifier.node_group)
+    return values
+
+def particle_values(particle_system):
+    """Return the seed and settings of a particle system."""
+    values = rna_values(particle_system)
+    values["settings"] = rna_values(particle_system.settings)
+    return values
+
+def file_hash(filepath, file_hashes):
+    """Hash a file's content, reusing the stored hash while its size and modification time are unchanged."""
+    stat = os.stat(filepath)
+    cached = file_hashes.get(filepath)
+    if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+        return cached[2]
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    file_hashes[filepath] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+    return digest.hexdigest()
+
+def image_fingerprint(image, file_hashes):
+    # Only the settings that decide the pixels: has_data, bindcode and the like change once it is loaded
+    values = {"name": image.name, "source": image.source, "alpha_mode": image.alpha_mode,
+              "colorspace": image.colorspace_settings.name}
+    if image.source == 'GENERATED':
+        values["generated"] = [image.generated_type, image.generated_width, image.generated_height,
+                               plain(image.generated_color)]
+    if image.packed_file is not None:
+        values["content"] = hashlib.sha256(image.packed_file.data).hexdigest()
+    elif image.source in {'FILE', 'SEQUENCE', 'TILED'} and image.filepath:
+        filepath = bpy.path.abspath(image.filepath)
+        values["content"] = file_hash(filepath, file_hashes) if os.path.exists(filepath) else "missing"
+    return values
+
+def scene_fingerprint(scene, file_hashes=None):
+    """Hash everything that decides the rendered image of the scene's current frame.
+
+    Covers render, cycles, eevee and color management settings, the frame,
+    the view layers and the compositor node tree, every object's transform, visibility and modifiers (geometry nodes inputs
+    and trees included), particle systems, mesh data (through mesh_hash),
+    curve splines, light and camera data, materials and the world node
+    trees, and the content of every image file in use. file_hashes caches the
+    file hashes between calls. Returns None when the scene holds objects in
+    UNCACHED_OBJECT_TYPES. Simulation caches and drivers evaluated only at
+    render time are not covered.
+    """
+    file_hashes = {} if file_hashes is None else file_hashes
+    digest = hashlib.sha256()
+
+    def add(value):
+        digest.update(json.dumps(value, sort_keys=True, default=str).encode())
+
+    add({"frame": scene.frame_current, "subframe": scene.frame_subframe})
+    for settings in (scene.render, scene.render.image_settings, scene.view_settings, scene.display_settings,
+                     getattr(scene, "cycles", None), scene.eevee):
+        if settings is not None:
+            add(rna_values(settings))
+    add({"camera": scene.camera.name if scene.camera else None})
+    for view_layer in scene.view_layers:
+        add(rna_values(view_layer))
+        if getattr(view_layer, "cycles", None) is not None:
+            add(rna_values(view_layer.cycles))
+    add({"use_nodes": scene.use_nodes})
+    if scene.use_nodes:
+        add(node_tree_values(scene.node_tree))
+    if scene.world is not None:
+        add(rna_values(scene.world))
+        add(node_tree_values(scene.world.node_tree))
+
+    mesh_hashes = {}
+    for obj in sorted(scene.objects, key=lambda obj: obj.name):
+        if obj.type in UNCACHED_OBJECT_TYPES:
+            return None
+        entry = {
+            "name": obj.name,
+            "type": obj.type,
+            "hide_render": obj.hide_render,
+            "matrix_world": plain(obj.matrix_world),
+            "modifiers": [modifier_values(modifier) for modifier in obj.modifiers],
+            "particles": [particle_values(particle_system) for particle_system in obj.particle_systems],
+            "materials": [slot.material.name if slot.material else None for slot in obj.material_slots],
+        }
+        if obj.type == 'MESH':
+            # name_full, linked meshes from different libraries can share a name
+            if obj.data.name_full not in mesh_hashes:
+                mesh_hashes[obj.data.name_full] = mesh_render_hash(obj.data)
+            entry["data"] = mesh_hashes[obj.data.name_full]
+        elif obj.data is not None:
+            entry["data"] = rna_values(obj.data)
+            if hasattr(obj.data, "splines"):
+                entry["splines"] = curve_render_hash(obj.data)
+            if getattr(obj.data, "node_tree", None) is not None:
+                entry["nodes"] = node_tree_values(obj.data.node_tree)
+        add(entry)
+
+    for material in sorted(bpy.data.materials, key=lambda material: material.name):
+        if material.users:
+            add(rna_values(material))
+            add(node_tree_values(material.node_tree))
+    for image in sorted(bpy.data.images, key=lambda image: image.name):
+        # The Render Result and Viewer Node images appear after the first render
+        if image.users and image.type not in {'RENDER_RESULT', 'COMPOSITING'}:
+            add(image_fingerprint(image, file_hashes))
+    return digest.hexdigest()
+
+def load_cache_manifest(cache_dir):
+    manifest_path = os.path.join(cache_dir, CACHE_MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            return json.load(f)
+    return {"entries": {}, "file_hashes": {}, "total_hits": 0, "total_misses": 0}
+
+def save_cache_manifest(cache_dir, manifest):
+    manifest_path = os.path.join(cache_dir, CACHE_MANIFEST_NAME)
+    with open(manifest_path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(manifest_path + ".tmp", manifest_path)
+
+def evict(cache_dir, manifest, max_bytes):
+    """Delete the least recently used images until the cache fits in max_bytes."""
+    entries = manifest["entries"]
+    total = sum(entry["size"] for entry in entries.values())
+    for fingerprint in sorted(entries, key=lambda fingerprint: entries[fingerprint]["last_used"]):
+        if total <= max_bytes:
+            break
+        entry = entries.pop(fingerprint)
+        total -= entry["size"]
+        cached_path = os.path.join(cache_dir, entry["file"])
+        if os.path.exists(cached_path):
+            os.remove(cached_path)
+
+def render_to_file(scene, output_path):
+    """Render the scene to output_path, leaving scene.render.filepath as it was."""
+    original_filepath = scene.render.filepath
+    scene.render.filepath = output_path
+    try:
+        bpy.ops.render.render(write_still=True)
+    finally:
+        scene.render.filepath = original_filepath
+
+def render_cached(output_path, cache_dir=RENDER_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+    """Render the current scene to output_path, or copy the cached image of an identical earlier render.
+
+    Returns True on a cache hit. Cached images are evicted least recently
+    used first once the cache holds more than max_bytes.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    scene = bpy.context.scene
+    manifest = load_cache_manifest(cache_dir)
+    fingerprint = scene_fingerprint(scene, manifest["file_hashes"])
+    if fingerprint is None:
+        print("Scene has geometry the render cache cannot fingerprint, rendering without the cache")
+        render_to_file(scene, output_path)
+        return False
+
+    entry = manifest["entries"].get(fingerprint)
+    if entry and os.path.exists(os.path.join(cache_dir, entry["file"])):
+        shutil.copyfile(os.path.join(cache_dir, entry["file"]), output_path)
+        entry["last_used"] = time.time()
+        manifest["total_hits"] += 1
+        save_cache_manifest(cache_dir, manifest)
+        print(f"Render cache hit, copied {fingerprint[:12]} to {output_path}")
+        return True
+
+    manifest["total_misses"] += 1
+    render_to_file(scene, output_path)
+    if os.path.exists(output_path):
+        cached_file = fingerprint + (os.path.splitext(output_path)[1] or ".png")
+        shutil.copyfile(output_path, os.path.join(cache_dir, cached_file))
+        manifest["entries"][fingerprint] = {"file": cached_file, "size": os.path.getsize(output_path),
+                                            "last_used": time.time()}
+        evict(cache_dir, manifest, max_bytes)
+    else:
+        print(f"Rendered image not found at {output_path}, not cached")
+    save_cache_manifest(cache_dir, manifest)
+    return False
+
+def print_cache_stats(cache_dir=RENDER_CACHE_DIR):
+    manifest = load_cache_manifest(cache_dir)
+    hits, misses = manifest["total_hits"], manifest["total_misses"]
+    size = sum(entry["size"] for entry in manifest["entries"].values())
+    rate = hits / (hits + misses) * 100 if hits + misses else 0.0
+    print(f"Render cache: {hits} hits, {misses} misses ({rate:.0f}% hit rate), "
+          f"{len(manifest['entries'])} images, {size / 1024 ** 2:.1f} MB")
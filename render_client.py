@@ -0,0 +1,142 @@
+import collections
+import os
+import secrets
+import subprocess
+import threading
+import time
+from multiprocessing.connection import Client
+
+from blender_process import RESULT_PREFIX, blender_command, parse_result
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "render_worker.py")
+# Must match render_worker.AUTHKEY_ENV, render_worker imports bpy so it cannot be imported here
+AUTHKEY_ENV = "RENDER_WORKER_AUTHKEY"
+
+class RenderWorker:
+    """A long-lived headless Blender process that keeps the last .blend file loaded between jobs.
+
+    Jobs are dicts with a 'type' of 'render', 'export' or 'info' and the .blend
+    file as 'blend'. Render jobs take optional 'frame', 'engine', 'samples',
+    'denoising', 'resolution_percentage', 'file_format', 'color_depth',
+    'border' (normalized min x, max x, min y, max y) and 'output' (no file is
+    written without it).
+    Export jobs take 'export_folder', 'exporters' and 'memory_budget' like
+    blender_export_script.export_pipeline. Info jobs return the scene's output
+    'resolution' and frame range.
+    """
+
+    def __init__(self, threads=None, startup_timeout=120):
+        authkey = secrets.token_bytes(32)
+        env = dict(os.environ, **{AUTHKEY_ENV: authkey.hex()})
+        self.process = subprocess.Popen(blender_command(["--python", WORKER_SCRIPT], threads),
+                                        stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                        text=True, errors="replace", env=env)
+        # Tail of the worker's output, for diagnosing a worker that died
+        self.log = collections.deque(maxlen=200)
+        self._address = None
+        self._started = threading.Event()
+        self._reader = threading.Thread(target=self._read_output, daemon=True)
+        self._reader.start()
+
+        if not self._started.wait(startup_timeout) or self._address is None:
+            self.process.kill()
+            raise RuntimeError("Render worker did not start:\n" + "\n".join(self.log))
+        self.connection = Client(tuple(self._address), authkey=authkey)
+        self._next_id = 0
+
+    def _read_output(self):
+        # Keep draining the pipe so a chatty render never blocks the worker
+        for line in self.process.stdout:
+            line = line.rstrip("\n")
+            self.log.append(line)
+            if self._address is None and line.startswith(RESULT_PREFIX):
+                self._address = parse_result([line])["address"]
+                self._started.set()
+        self._started.set()
+
+    def submit(self, job):
+        """Send a job to the worker without waiting for it and return its id."""
+        job = dict(job, id=self._next_id)
+        self._next_id += 1
+        self.connection.send(job)
+        return job["id"]
+
+    def run(self, jobs):
+        """Submit all jobs at once and yield the worker's messages as they arrive.
+
+        Messages are dicts with the job 'id' and a 'status' of 'started',
+        'done' or 'error'. Finished jobs carry the worker's 'timings'.
+        """
+        pending = {self.submit(job) for job in jobs}
+        while pending:
+            try:
+                message = self.connection.recv()
+            except EOFError:
+                # Let the reader collect the rest of the output before reporting it
+                self.process.wait()
+                self._reader.join()
+                raise RuntimeError("\n".join(self.log) +
+                                   f"\nRender worker exited with code {self.process.returncode}") from None
+            if message["status"] != "started":
+                pending.discard(message["id"])
+            yield message
+
+    def run_job(self, job):
+        """Run a single job and return its final message."""
+        for message in self.run([job]):
+            if message["status"] != "started":
+                return message
+
+    def render(self, blend_file_path, **settings):
+        return self.run_job(dict(settings, type="render", blend=blend_file_path))
+
+    def info(self, blend_file_path, **settings):
+        return self.run_job(dict(settings, type="info", blend=blend_file_path))
+
+    def export(self, blend_file_path, export_folder, **options):
+        return self.run_job(dict(options, type="export", blend=blend_file_path, export_folder=export_folder))
+
+    def close(self, timeout=30):
+        """Ask the worker to exit, killing it if it does not within timeout seconds."""
+        try:
+            self.connection.send({"type": "shutdown"})
+            self.connection.close()
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def print_message(message):
+    if message["status"] == "started":
+        print(f"Job {message['id']} started")
+    elif message["status"] == "error":
+        print(f"Job {message['id']} failed:\n{message['error']}")
+    else:
+        timings = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in message["timings"].items())
+        print(f"Job {message['id']} done: {timings}")
+
+def main():
+    blend_file_path = "../blender_dataset/classroom/classroom.blend"
+
+    start = time.perf_counter()
+    with RenderWorker() as worker:
+        print(f"Worker started in {time.perf_counter() - start:.2f}s")
+        # The first job loads the file, the following ones reuse it
+        jobs = [{"type": "render", "blend": blend_file_path, "frame": frame, "samples": 16,
+                 "resolution_percentage": 25, "output": f"classroom-preview-{frame:04d}.png"}
+                for frame in (1, 2, 3)]
+        for message in worker.run(jobs):
+            print_message(message)
+    print(f"All jobs finished in {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    main()
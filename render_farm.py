@@ -0,0 +1,152 @@
+import os
+import queue
+import re
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from render_client import RenderWorker
+
+def frame_output_path(output_pattern, frame, extension=".png"):
+    """Return the file Blender writes for a frame of an animation rendered to output_pattern.
+
+    Like Blender, the last run of '#' is replaced by the zero-padded frame
+    number, and without one a four-digit frame number is appended.
+    """
+    runs = list(re.finditer(r"#+", output_pattern))
+    if runs:
+        run = runs[-1]
+        path = output_pattern[:run.start()] + str(frame).zfill(len(run.group())) + output_pattern[run.end():]
+    else:
+        path = f"{output_pattern}{frame:04d}"
+    if not path.lower().endswith(extension):
+        path += extension
+    return path
+
+def partial_path(path):
+    """Temporary file a frame is rendered to, so an interrupted write is never taken for a finished frame."""
+    root, extension = os.path.splitext(path)
+    return f"{root}.partial{extension}"
+
+def farm_worker(blend_file_path, jobs, results, threads, max_retries):
+    """Run render jobs from the shared queue in one persistent Blender worker until the queue is empty."""
+    worker = None
+    try:
+        while True:
+            try:
+                name, job, path, attempt = jobs.get_nowait()
+            except queue.Empty:
+                return
+            if worker is None:
+                try:
+                    worker = RenderWorker(threads=threads)
+                except RuntimeError as e:
+                    # Leave the job to the other workers
+                    jobs.put((name, job, path, attempt))
+                    print(f"Could not start a render worker: {e}")
+                    return
+
+            start = time.perf_counter()
+            try:
+                message = worker.render(blend_file_path, output=partial_path(path), **job)
+            except RuntimeError as e:
+                # The Blender process died, the next job starts a new one
+                message = {"status": "error", "error": str(e)}
+                worker.close()
+                worker = None
+            wall_time = time.perf_counter() - start
+
+            if message["status"] == "done" and os.path.exists(partial_path(path)):
+                os.replace(partial_path(path), path)
+                render_time = message["timings"]["render"]
+                results.append({"name": name, "job": job, "path": path, "ok": True, "wall_time": wall_time,
+                                "render_time": render_time})
+                print(f"{name} rendered in {render_time:.2f}s ({wall_time:.2f}s with load and setup)")
+            elif attempt < max_retries:
+                print(f"{name} failed, retrying ({attempt + 1}/{max_retries})")
+                jobs.put((name, job, path, attempt + 1))
+            else:
+                results.append({"name": name, "job": job, "path": path, "ok": False, "wall_time": wall_time,
+                                "error": message.get("error", "no output written")})
+                print(f"{name} failed after {max_retries} retries")
+    finally:
+        if worker is not None:
+            worker.close()
+
+def render_jobs(blend_file_path, jobs, num_workers=2, max_retries=2):
+    """Run (name, render job settings, output path) jobs in num_workers parallel Blender workers.
+
+    The jobs are kept in one shared queue. Each worker takes the next job when
+    it finishes its current one, so slow jobs do not hold up a fixed share of
+    the work. Failed jobs are requeued up to max_retries times. Returns one
+    result per job, in no particular order.
+    """
+    queued = queue.Queue()
+    for name, job, path in jobs:
+        queued.put((name, job, path, 0))
+
+    # Split the CPU between the workers instead of letting every Blender grab all cores
+    threads = max(1, (os.cpu_count() or 1) // num_workers)
+    results = []
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        for _ in range(num_workers):
+            executor.submit(farm_worker, blend_file_path, queued, results, threads, max_retries)
+
+    # Jobs left over when no worker could be started
+    while not queued.empty():
+        name, job, path, attempt = queued.get_nowait()
+        results.append({"name": name, "job": job, "path": path, "ok": False, "wall_time": 0.0,
+                        "error": "no render worker available"})
+    return results
+
+def render_frames(blend_file_path, output_pattern, frame_start, frame_end, num_workers=2, extension=".png",
+                  skip_existing=True, max_retries=2, settings=None):
+    """Render frame_start..frame_end in num_workers parallel Blender workers.
+
+    Frames are written under Blender's animation naming scheme (see
+    frame_output_path). With skip_existing, frames that are already on disk
+    are not rendered again, so an interrupted run can be resumed. settings are
+    passed to every render job (engine, samples, ...). Returns the per-frame
+    results sorted by frame and the number of skipped frames.
+    """
+    settings = dict(settings or {})
+    settings.setdefault("file_format", "PNG")
+    output_dir = os.path.dirname(output_pattern)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    jobs = []
+    skipped = 0
+    for frame in range(frame_start, frame_end + 1):
+        path = frame_output_path(output_pattern, frame, extension)
+        if skip_existing and os.path.exists(path) and os.path.getsize(path) > 0:
+            skipped += 1
+            continue
+        jobs.append((f"Frame {frame}", dict(settings, frame=frame), path))
+    print(f"Rendering {len(jobs)} frames with {num_workers} workers, {skipped} already rendered")
+
+    results = render_jobs(blend_file_path, jobs, num_workers, max_retries)
+    return sorted(results, key=lambda result: result["job"]["frame"]), skipped
+
+def print_summary(results, skipped, wall_time):
+    rendered = [result for result in results if result["ok"]]
+    failed = [result for result in results if not result["ok"]]
+    print(f"\n{len(rendered)} frames rendered, {skipped} skipped, {len(failed)} failed in {wall_time:.1f}s")
+    if rendered:
+        render_times = [result["render_time"] for result in rendered]
+        print(f"Frame render time: mean {statistics.mean(render_times):.2f}s, "
+              f"median {statistics.median(render_times):.2f}s, max {max(render_times):.2f}s")
+        print(f"Throughput: {len(rendered) / wall_time * 60:.2f} frames per minute")
+    for result in failed:
+        print(f"  {result['name']}: {result['error'].strip().splitlines()[-1] if result['error'] else ''}")
+
+def main():
+    blend_file_path = "../blender_dataset/restaurant_anim_test/rain_restaurant.blend"
+    output_pattern = "rain_restaurant_animation/frame_####"
+
+    start = time.perf_counter()
+    results, skipped = render_frames(blend_file_path, output_pattern, 1, 20, num_workers=2)
+    print_summary(results, skipped, time.perf_counter() - start)
+
+if __name__ == "__main__":
+    main()
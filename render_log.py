@@ -0,0 +1,236 @@
+import os
+import re
+import sys
+import time
+import numpy as np
+
+from columnar import read_columns, write_columns
+
+# Fra:2 Mem:1476.20M (Peak 3107.06M) | Time:14:44.13 | Compositing | Tile 2-18
+FRAME_LINE = re.compile(r"Fra:(-?\d+) Mem:([\d.]+)M \(Peak ([\d.]+)M\) \| Time:([\d:.]+) \| (.*)")
+# Cycles adds the device memory and the render layer: Mem:16.00M, Peak:16.00M | Scene, ViewLayer | ...
+DEVICE_MEMORY = re.compile(r"Mem:([\d.]+)M, Peak:([\d.]+)M")
+# Sample 5/512, Rendering 26 / 64 samples, Tile 2-18, Updating Geometry BVH Plane.016 1/13
+PROGRESS = re.compile(r"\s*(\d+) ?[/-] ?(\d+)(?: samples)?$")
+# Phases that name the object they work on
+OBJECT_PHASE = re.compile(r"(Syncing|Updating Geometry BVH) (.+)")
+READ_BLEND = re.compile(r'Read blend: "(.*)"')
+SAVED = re.compile(r"Saved: '(.*)'")
+TOTAL_TIME = re.compile(r"Time: ([\d:.]+) \(Saving: ([\d:.]+)\)")
+
+SYNC_PHASES = {"Syncing", "Synchronizing object"}
+# Status lines once the scene is synced and the engine renders samples
+SAMPLE_PHASES = {"Sample", "Rendering"}
+
+def parse_time(text):
+    """Convert Blender's [HH:]MM:SS.ss time stamps to seconds."""
+    seconds = 0.0
+    for part in text.split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+class RenderLog:
+    """Structured records of Blender render output, fed one line at a time.
+
+    Works on a saved log or live, e.g. run_blender(args, on_line=log.feed).
+    Each 'Fra:' line becomes a record of the scene, frame, memory and peak
+    (MB), elapsed and remaining render time (s), the Cycles device memory and
+    peak when present, the phase ('Syncing', 'Sample', 'Compositing', ...),
+    its detail (object name, step, ...) and progress as done / total (tiles,
+    samples), NaN or -1 when missing. The 'Saved:' and 'Time:' summary lines
+    give the total time of each render.
+    """
+
+    def __init__(self):
+        self.scene = None
+        self.scenes = []
+        self.columns = {name: [] for name in ("scene", "frame", "time", "remaining", "memory", "peak",
+                                              "device_memory", "device_peak", "progress_done", "progress_total")}
+        self.phases = []
+        self.details = []
+        self.totals = {}
+
+    def __len__(self):
+        return len(self.phases)
+
+    def feed(self, line):
+        """Parse one line of output, returning True if it was a render status line."""
+        match = FRAME_LINE.match(line)
+        if match is None:
+            self._feed_other(line)
+            return False
+        if self.scene is None:
+            self._start_scene("unknown")
+
+        frame, memory, peak, elapsed, status = match.groups()
+        remaining = device_memory = device_peak = np.nan
+        fields = []
+        has_device = False
+        for field in status.split(" | "):
+            device = DEVICE_MEMORY.fullmatch(field)
+            if device:
+                device_memory, device_peak = float(device.group(1)), float(device.group(2))
+                has_device = True
+            elif field.startswith("Remaining:"):
+                remaining = parse_time(field[len("Remaining:"):])
+            else:
+                fields.append(field)
+        if has_device:
+            # Drop the 'Scene, ViewLayer' field that follows the device memory
+            fields = fields[1:]
+        phase = fields[0] if fields else ""
+        detail = " | ".join(fields[1:])
+
+        progress = PROGRESS.search(phase)
+        if progress:
+            phase = phase[:progress.start()]
+        else:
+            progress = PROGRESS.search(detail)
+            if progress:
+                detail = detail[:progress.start()]
+        named = OBJECT_PHASE.fullmatch(phase)
+        if named:
+            phase, detail = named.groups()
+
+        columns = self.columns
+        columns["scene"].append(len(self.scenes) - 1)
+        columns["frame"].append(int(frame))
+        columns["time"].append(parse_time(elapsed))
+        columns["remaining"].append(remaining)
+        columns["memory"].append(float(memory))
+        columns["peak"].append(float(peak))
+        columns["device_memory"].append(device_memory)
+        columns["device_peak"].append(device_peak)
+        columns["progress_done"].append(int(progress.group(1)) if progress else -1)
+        columns["progress_total"].append(int(progress.group(2)) if progress else -1)
+        self.phases.append(phase)
+        self.details.append(detail.strip())
+        return True
+
+    def _start_scene(self, name):
+        self.scene = name
+        self.scenes.append(name)
+
+    def _feed_other(self, line):
+        match = READ_BLEND.match(line)
+        if match:
+            self._start_scene(os.path.splitext(os.path.basename(match.group(1)))[0])
+            return
+        if self.scene is None:
+            return
+        match = SAVED.match(line)
+        if match:
+            self.totals.setdefault(self.scene, {})["saved"] = match.group(1)
+            return
+        match = TOTAL_TIME.match(line)
+        if match:
+            total = self.totals.setdefault(self.scene, {})
+            total["render_time"] = parse_time(match.group(1))
+            total["saving_time"] = parse_time(match.group(2))
+
+    def arrays(self):
+        """Return the records as numpy columns, with phase and detail as indices into lookup lists."""
+        arrays = {
+            "scene": np.array(self.columns["scene"], dtype=np.int16),
+            "frame": np.array(self.columns["frame"], dtype=np.int32),
+            "time": np.array(self.columns["time"], dtype=np.float64),
+            "progress_done": np.array(self.columns["progress_done"], dtype=np.int32),
+            "progress_total": np.array(self.columns["progress_total"], dtype=np.int32),
+        }
+        for name in ("remaining", "memory", "peak", "device_memory", "device_peak"):
+            arrays[name] = np.array(self.columns[name], dtype=np.float32)
+        phases, arrays["phase"] = np.unique(np.array(self.phases, dtype=object).astype(str), return_inverse=True)
+        details, arrays["detail"] = np.unique(np.array(self.details, dtype=object).astype(str), return_inverse=True)
+        arrays["phase"] = arrays["phase"].astype(np.int16)
+        arrays["detail"] = arrays["detail"].astype(np.int32)
+        return arrays, phases.tolist(), details.tolist()
+
+    def write(self, filepath):
+        """Write the records as a column file, the lookup lists and totals go in its metadata."""
+        arrays, phases, details = self.arrays()
+        meta = {"scenes": self.scenes, "phases": phases, "details": details, "totals": self.totals}
+        write_columns(filepath, arrays, meta)
+
+def parse_log_file(filepath):
+    log = RenderLog()
+    with open(filepath, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            log.feed(line.rstrip("\n"))
+    return log
+
+def read_log(filepath):
+    """Return (arrays, meta) from a file written by RenderLog.write."""
+    return read_columns(filepath)
+
+def sync_durations(arrays, phases):
+    """Return (record index, seconds) of every object sync step.
+
+    A step lasts until the next status line of the same scene and frame.
+    """
+    sync_phase = np.isin(np.array(phases)[arrays["phase"]], list(SYNC_PHASES))
+    same_render = (arrays["scene"][1:] == arrays["scene"][:-1]) & (arrays["frame"][1:] == arrays["frame"][:-1])
+    duration = np.where(same_render, np.diff(arrays["time"]), 0.0)
+    index = np.flatnonzero(sync_phase[:-1] & same_render)
+    return index, duration[index]
+
+def time_to_first_sample(arrays, phases):
+    """Return the render time (s) at the first sampling status line, the scene sync and setup time.
+
+    NaN when the log has no sampling lines.
+    """
+    sampling = np.flatnonzero(np.isin(np.array(phases)[arrays["phase"]], list(SAMPLE_PHASES)))
+    return float(arrays["time"][sampling[0]]) if len(sampling) else float("nan")
+
+def slowest_syncs(arrays, meta, count=10):
+    """Return the (scene, object, seconds) sync steps that took longest."""
+    index, duration = sync_durations(arrays, meta["phases"])
+    order = np.argsort(-duration, kind="stable")[:count]
+    return [(meta["scenes"][arrays["scene"][index[i]]], meta["details"][arrays["detail"][index[i]]],
+             float(duration[i])) for i in order]
+
+def scene_summaries(arrays, meta):
+    """Return per-scene record counts, peak host and device memory, and render times."""
+    summaries = {}
+    for scene_index, scene in enumerate(meta["scenes"]):
+        selected = arrays["scene"] == scene_index
+        if not selected.any():
+            continue
+        device_peak = arrays["device_peak"][selected]
+        total = meta["totals"].get(scene, {})
+        summaries[scene] = {
+            "records": int(selected.sum()),
+            "peak_memory": float(arrays["peak"][selected].max()),
+            "peak_device_memory": float(np.nanmax(device_peak)) if np.isfinite(device_peak).any() else None,
+            "last_status_time": float(arrays["time"][selected].max()),
+            "render_time": total.get("render_time"),
+        }
+    return summaries
+
+def print_summary(arrays, meta):
+    print(f"{'scene':<45} {'records':>8} {'peak MB':>9} {'device MB':>10} {'render time':>12}")
+    for scene, summary in scene_summaries(arrays, meta).items():
+        device = f"{summary['peak_device_memory']:.0f}" if summary["peak_device_memory"] is not None else "-"
+        render_time = summary["render_time"] if summary["render_time"] is not None else summary["last_status_time"]
+        print(f"{scene:<45} {summary['records']:>8} {summary['peak_memory']:>9.0f} {device:>10} "
+              f"{render_time:>11.1f}s")
+    print("\nSlowest objects to sync:")
+    for scene, name, seconds in slowest_syncs(arrays, meta):
+        print(f"  {seconds:6.2f}s  {scene}: {name}")
+
+def main():
+    # python render_log.py [log file] [output file]
+    log_path = sys.argv[1] if len(sys.argv) > 1 else "blend_log.txt"
+    output_path = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(log_path)[0] + ".cols"
+
+    start = time.perf_counter()
+    log = parse_log_file(log_path)
+    log.write(output_path)
+    elapsed = time.perf_counter() - start
+    print(f"Parsed {len(log)} status lines of {len(log.scenes)} renders in {elapsed * 1000:.0f} ms, "
+          f"saved at {output_path}\n")
+
+    arrays, meta = read_log(output_path)
+    print_summary(arrays, meta)
+
+if __name__ == "__main__":
+    main()
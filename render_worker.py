@@ -0,0 +1,166 @@
+import bpy
+import os
+import sys
+import time
+import traceback
+from multiprocessing.connection import Listener
+
+# Blender does not put the script folder on sys.path when run with -P
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from blender_export_script import export_pipeline
+from blender_process import print_result
+from frame_regions import output_size
+
+# Started by render_client.RenderWorker, which passes the connection key in this variable
+AUTHKEY_ENV = "RENDER_WORKER_AUTHKEY"
+
+EEVEE_ENGINES = {'BLENDER_EEVEE', 'BLENDER_EEVEE_NEXT'}
+
+def ensure_loaded(state, blend_file_path, reload=False):
+    """Open blend_file_path unless it is already the loaded file, and return the load time."""
+    blend_file_path = os.path.abspath(blend_file_path)
+    if state.get("blend_file") == blend_file_path and not reload:
+        return 0.0
+    start = time.perf_counter()
+    bpy.ops.wm.open_mainfile(filepath=blend_file_path)
+    state["blend_file"] = blend_file_path
+    return time.perf_counter() - start
+
+def set_attribute(previous, owner, attribute, value):
+    """Set owner.attribute and remember the old value so the job can be undone."""
+    previous.append((owner, attribute, getattr(owner, attribute)))
+    setattr(owner, attribute, value)
+
+def apply_render_settings(scene, job, previous=None):
+    """Apply the job's render settings to the scene and return the values they replaced.
+
+    The replaced values are appended to previous as they are set, so a
+    setting that fails half way still leaves a complete list to restore.
+    """
+    previous = [] if previous is None else previous
+    render = scene.render
+    if job.get("engine"):
+        set_attribute(previous, render, "engine", job["engine"])
+    if job.get("samples"):
+        if render.engine == 'CYCLES':
+            set_attribute(previous, scene.cycles, "samples", job["samples"])
+        elif render.engine in EEVEE_ENGINES:
+            set_attribute(previous, scene.eevee, "taa_render_samples", job["samples"])
+    if job.get("denoising") is not None and render.engine == 'CYCLES':
+        set_attribute(previous, scene.cycles, "use_denoising", job["denoising"])
+    if job.get("resolution_percentage"):
+        set_attribute(previous, render, "resolution_percentage", job["resolution_percentage"])
+    if job.get("file_format"):
+        set_attribute(previous, render.image_settings, "file_format", job["file_format"])
+    if job.get("color_depth"):
+        set_attribute(previous, render.image_settings, "color_depth", job["color_depth"])
+    if job.get("output"):
+        set_attribute(previous, render, "filepath", job["output"])
+    if job.get("border"):
+        # Normalized (min x, max x, min y, max y), the output is cropped to the region
+        min_x, max_x, min_y, max_y = job["border"]
+        set_attribute(previous, render, "use_border", True)
+        set_attribute(previous, render, "use_crop_to_border", True)
+        set_attribute(previous, render, "border_min_x", min_x)
+        set_attribute(previous, render, "border_max_x", max_x)
+        set_attribute(previous, render, "border_min_y", min_y)
+        set_attribute(previous, render, "border_max_y", max_y)
+    return previous
+
+def restore_settings(previous):
+    for owner, attribute, value in reversed(previous):
+        setattr(owner, attribute, value)
+
+def run_render_job(state, job):
+    """Render one frame of the job's .blend file, the scene settings are restored afterwards."""
+    timings = {"load": ensure_loaded(state, job["blend"], job.get("reload", False))}
+    scene = bpy.context.scene
+
+    start = time.perf_counter()
+    current_frame = scene.frame_current
+    previous = []
+    try:
+        apply_render_settings(scene, job, previous)
+        if job.get("frame") is not None:
+            scene.frame_set(job["frame"])
+        timings["setup"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        bpy.ops.render.render(write_still=bool(job.get("output")))
+        timings["render"] = time.perf_counter() - start
+    finally:
+        restore_settings(previous)
+        scene.frame_set(current_frame)
+    return {"output": job.get("output"), "timings": timings}
+
+def run_export_job(state, job):
+    """Run the export pipeline on the job's .blend file, reusing it if it is already loaded."""
+    load_time = ensure_loaded(state, job["blend"], job.get("reload", False))
+    timings = export_pipeline(job["blend"], job["export_folder"], job.get("exporters", ("ply",)),
+                              memory_budget=job.get("memory_budget"), load=False)
+    timings["load"] = load_time
+    return {"export_folder": job["export_folder"], "timings": timings}
+
+def run_info_job(state, job):
+    """Return the output resolution and frame range of the job's .blend file under the job's settings."""
+    timings = {"load": ensure_loaded(state, job["blend"], job.get("reload", False))}
+    scene = bpy.context.scene
+    render = scene.render
+    previous = []
+    try:
+        apply_render_settings(scene, job, previous)
+        return {
+            "resolution": list(output_size(scene)),
+            "frame_start": scene.frame_start,
+            "frame_end": scene.frame_end,
+            "engine": render.engine,
+            "timings": timings,
+        }
+    finally:
+        restore_settings(previous)
+
+JOB_TYPES = {
+    "render": run_render_job,
+    "export": run_export_job,
+    "info": run_info_job,
+}
+
+def serve(connection):
+    """Run the jobs received on the connection until it closes or a shutdown job arrives.
+
+    Every job is answered with a 'started' message and then a 'done' or
+    'error' message carrying the job id, so the client can stream results.
+    """
+    state = {}
+    while True:
+        try:
+            job = connection.recv()
+        except EOFError:
+            return
+        if job.get("type") == "shutdown":
+            return
+
+        job_id = job.get("id")
+        connection.send({"id": job_id, "status": "started"})
+        start = time.perf_counter()
+        try:
+            if job.get("type") not in JOB_TYPES:
+                raise ValueError(f"Unknown job type '{job.get('type')}', expected one of {list(JOB_TYPES)}")
+            result = JOB_TYPES[job["type"]](state, job)
+            result.update({"id": job_id, "status": "done"})
+        except Exception:
+            result = {"id": job_id, "status": "error", "error": traceback.format_exc()}
+        result.setdefault("timings", {})["total"] = time.perf_counter() - start
+        connection.send(result)
+
+def main():
+    # blender -b -P render_worker.py, started by render_client.RenderWorker
+    authkey = bytes.fromhex(os.environ[AUTHKEY_ENV])
+    with Listener(("localhost", 0), authkey=authkey) as listener:
+        # The driver reads the port from this line, then connects
+        print_result({"address": list(listener.address)})
+        with listener.accept() as connection:
+            serve(connection)
+
+if __name__ == "__main__":
+    main()
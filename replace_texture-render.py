@@ -1,7 +1,12 @@
 import bpy
 import os
+import sys
 import numpy as np
 
+# Blender does not put the script folder on sys.path when run with -P
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from render_cache import RENDER_CACHE_DIR, print_cache_stats, render_cached
+
 def get_image_data(image):
     """Get the image data as a numpy array."""
     image_pixels = np.array(image.pixels[:])
@@ -24,8 +29,11 @@ def compare_image_data(image, new_texture_file_path):
 
     return is_different
 
-def replace_textures_and_render(blend_file_path, textures_folder, output_image_path):
-    """Replace textures in the Blender file with modified textures and render an image."""
+def replace_textures_and_render(blend_file_path, textures_folder, output_image_path, cache_dir=None):
+    """Replace textures in the Blender file with modified textures and render an image.
+
+    With cache_dir, a texture set that was rendered before is not rendered again.
+    """
     # Load the Blender file
     bpy.ops.wm.open_mainfile(filepath=blend_file_path)
 
@@ -53,7 +61,10 @@ def replace_textures_and_render(blend_file_path, textures_folder, output_image_p
     bpy.context.scene.render.filepath = output_image_path
 
     # Render the image
-    bpy.ops.render.render(write_still=True)
+    if cache_dir:
+        render_cached(output_image_path, cache_dir)
+    else:
+        bpy.ops.render.render(write_still=True)
     print(f"Rendered image saved at: {output_image_path}")
 
 # Example usage
@@ -61,4 +72,5 @@ blend_file_path = "../blender_dataset/ocean-scene.blend"
 textures_folder = "../blender_dataset-texture/ocean-scene-compressed"
 output_image_path = "ocean-scene-compressed-texture.png"
 
-replace_textures_and_render(blend_file_path, textures_folder, output_image_path)
+replace_textures_and_render(blend_file_path, textures_folder, output_image_path, cache_dir=RENDER_CACHE_DIR)
+print_cache_stats(RENDER_CACHE_DIR)
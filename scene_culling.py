@@ -0,0 +1,203 @@
+import bpy
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+# Blender does not put the script folder on sys.path when run with -P
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from batch_visibility import visibility_matrix
+from blender_process import print_result, script_args
+from occlusion import hidden_objects, object_coverage
+from scene_dependencies import kept_objects
+
+def scene_stats(scene):
+    """Return the object, vertex and texture memory counts of what the scene renders."""
+    objects = [obj for obj in scene.objects if not obj.hide_render]
+    meshes = [obj for obj in objects if obj.type == 'MESH']
+    texture_bytes = 0
+    for image in bpy.data.images:
+        if image.users == 0 or image.type not in {'IMAGE', 'MULTILAYER'}:
+            continue
+        # Size of the decoded pixels, which is what the renderer holds in memory
+        width, height = image.size
+        texture_bytes += width * height * image.channels * (4 if image.is_float else 1)
+    return {
+        "objects": len(objects),
+        "mesh_objects": len(meshes),
+        "vertices": sum(len(obj.data.vertices) for obj in meshes),
+        "images": len([image for image in bpy.data.images if image.users > 0]),
+        "texture_bytes": texture_bytes,
+    }
+
+def id_references(value, result):
+    """Add an Object, or the objects of a Collection, to result."""
+    if isinstance(value, bpy.types.Object):
+        result.add(value)
+    elif isinstance(value, bpy.types.Collection):
+        result.update(value.all_objects)
+
+def node_tree_references(tree, result, visited=None):
+    """Add the objects and collections set on the sockets of a node tree and its nested groups."""
+    visited = set() if visited is None else visited
+    if tree is None or tree.name_full in visited:
+        return
+    visited.add(tree.name_full)
+    for node in tree.nodes:
+        for socket in node.inputs:
+            id_references(getattr(socket, "default_value", None), result)
+        if node.type == 'GROUP':
+            node_tree_references(node.node_tree, result, visited)
+
+def referenced_objects(obj):
+    """Return the objects obj needs to render.
+
+    Follows parents, modifier and constraint targets, instanced collections,
+    particle instance objects and collections, and the Object and Collection
+    inputs of geometry nodes modifiers and their node trees.
+    """
+    result = set()
+    if obj.parent is not None:
+        result.add(obj.parent)
+    for owner in list(obj.modifiers) + list(obj.constraints):
+        for prop in owner.bl_rna.properties:
+            if prop.type == 'POINTER':
+                id_references(getattr(owner, prop.identifier), result)
+    for modifier in obj.modifiers:
+        if modifier.type == 'NODES':
+            # Group inputs are ID properties of the modifier, not RNA properties
+            for key in modifier.keys():
+                id_references(modifier[key], result)
+            node_tree_references(modifier.node_group, result)
+    for particle_system in getattr(obj, "particle_systems", []):
+        settings = particle_system.settings
+        id_references(settings.instance_object, result)
+        id_references(settings.instance_collection, result)
+    if obj.instance_type == 'COLLECTION' and obj.instance_collection is not None:
+        result.update(obj.instance_collection.all_objects)
+    return result
+
+def seen_objects(scene, cameras=None, frames=None, use_occlusion=False, resolution=(160, 90)):
+    """Return the set of mesh objects seen by any of the cameras on any of the frames.
+
+    frames is a (start, end) pair and defaults to the scene frame range. With
+    use_occlusion, objects in the frustum are also dropped when the depth
+    buffer of occlusion.object_coverage finds them hidden behind others for
+    every camera and frame. The depth buffer treats all surfaces as opaque,
+    so leave it off for scenes seen through glass or alpha-blended cards.
+    """
+    frame_start, frame_end = frames if frames is not None else (None, None)
+    objects = [obj for obj in scene.objects if obj.type == 'MESH' and not obj.hide_render]
+    visible, cameras, objects, frame_list = visibility_matrix(scene, cameras, objects, frame_start, frame_end)
+    if use_occlusion and len(objects) and len(cameras):
+        current_frame = scene.frame_current
+        try:
+            for frame_index, frame in enumerate(frame_list):
+                scene.frame_set(frame)
+                for camera_index, cam_ob in enumerate(cameras):
+                    in_view = [objects[i] for i in np.flatnonzero(visible[camera_index, :, frame_index])]
+                    if not in_view:
+                        continue
+                    coverage = object_coverage(scene, cam_ob, resolution, objects=in_view)
+                    hidden = set(hidden_objects(coverage))
+                    for i, obj in enumerate(objects):
+                        if obj.name in hidden:
+                            visible[camera_index, i, frame_index] = False
+        finally:
+            scene.frame_set(current_frame)
+
+    seen = visible.any(axis=(0, 2))
+    return {obj for obj, is_seen in zip(objects, seen) if is_seen}
+
+def cull_scene(scene, cameras=None, frames=None, mode='remove', use_occlusion=False):
+    """Remove or hide the mesh objects that none of the cameras ever see.
+
+    Objects the seen ones depend on (parents, modifier and constraint targets,
+    instanced collections, particle instances, geometry nodes inputs) are
+    kept. Lights, cameras and other non-mesh objects are never culled, and
+    neither are the objects they depend on, such as the objects of a
+    collection instance. Off-screen objects still cast shadows and show up in reflections, so
+    check the result render. With mode='remove' the
+    culled objects are deleted and orphan data (meshes, materials, images) is
+    purged, with mode='hide' they are only excluded from rendering.
+    Returns the names of the culled objects.
+    """
+    if mode not in ('remove', 'hide'):
+        raise ValueError(f"Unknown culling mode '{mode}'")
+
+    seen = seen_objects(scene, cameras, frames, use_occlusion)
+    keep = kept_objects(scene.objects, seen, referenced_objects)
+
+    culled = [obj for obj in scene.objects if obj.type == 'MESH' and obj not in keep and not obj.hide_render]
+    names = [obj.name for obj in culled]
+    if mode == 'hide':
+        for obj in culled:
+            obj.hide_render = True
+    else:
+        for obj in culled:
+            bpy.data.objects.remove(obj, do_unlink=True)
+        bpy.data.orphans_purge(do_local_ids=True, do_linked_ids=True, do_recursive=True)
+    return names
+
+def time_render(scene):
+    """Render the current frame without writing it and return the render time in seconds."""
+    start = time.perf_counter()
+    bpy.ops.render.render(write_still=False)
+    return time.perf_counter() - start
+
+def print_stats(before, after, render_times=None):
+    for key in before:
+        print(f"  {key}: {before[key]} -> {after[key]} ({after[key] - before[key]:+d})")
+    if render_times:
+        before_time, after_time = render_times
+        print(f"  render time: {before_time:.2f}s -> {after_time:.2f}s ({after_time - before_time:+.2f}s)")
+
+def slim_blend_file(blend_file_path, output_path, camera_names=None, frames=None, mode='remove',
+                    use_occlusion=False, time_renders=False):
+    """Cull the objects of a .blend file that its cameras never see and save the result to output_path."""
+    bpy.ops.wm.open_mainfile(filepath=blend_file_path)
+    scene = bpy.context.scene
+    cameras = [bpy.data.objects[name] for name in camera_names] if camera_names else None
+
+    before = scene_stats(scene)
+    render_times = None
+    before_time = time_render(scene) if time_renders else None
+
+    culled = cull_scene(scene, cameras, frames, mode, use_occlusion)
+    after = scene_stats(scene)
+    if time_renders:
+        render_times = (before_time, time_render(scene))
+
+    bpy.ops.wm.save_as_mainfile(filepath=output_path)
+    print(f"Culled {len(culled)} objects from {blend_file_path}, saved at {output_path}")
+    print_stats(before, after, render_times)
+    return {"culled": culled, "before": before, "after": after, "render_times": render_times}
+
+def run_from_command_line(args):
+    parser = argparse.ArgumentParser(description="Remove the objects a .blend file's cameras never see.")
+    parser.add_argument("--blend", required=True)
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--cameras", nargs="*", default=None, help="Camera object names, all cameras by default")
+    parser.add_argument("--frames", nargs=2, type=int, default=None, metavar=("START", "END"))
+    parser.add_argument("--mode", choices=("remove", "hide"), default="remove")
+    parser.add_argument("--occlusion", action="store_true", help="Also cull objects hidden behind others")
+    parser.add_argument("--time-renders", action="store_true", help="Render before and after culling")
+    args = parser.parse_args(args)
+
+    result = slim_blend_file(args.blend, args.output, args.cameras, args.frames, args.mode,
+                             args.occlusion, args.time_renders)
+    print_result(result)
+
+def main():
+    # blender -b -P scene_culling.py -- --blend <file> --output <file> [--occlusion] [--time-renders]
+    if script_args():
+        run_from_command_line(script_args())
+        return
+
+    blend_file_path = "../blender_dataset/classroom/classroom.blend"
+    output_path = "classroom-culled.blend"
+    slim_blend_file(blend_file_path, output_path, time_renders=True)
+
+if __name__ == "__main__":
+    main()
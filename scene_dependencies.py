@@ -0,0 +1,19 @@
+def kept_objects(objects, seen, references):
+    """Return the objects that have to stay in the scene for the seen ones to render the same.
+
+    objects are the scene objects and references(obj) returns the objects obj
+    needs (parents, modifier targets, instanced collections, ...). Besides
+    the seen objects, every rendered non-mesh object is kept, since lights,
+    cameras and empties are never culled; their dependencies, such as the
+    objects of an instanced collection, are followed like those of the seen
+    meshes.
+    """
+    keep = set(seen)
+    keep.update(obj for obj in objects if obj.type != 'MESH' and not obj.hide_render)
+    stack = list(keep)
+    while stack:
+        for dependency in references(stack.pop()):
+            if dependency not in keep:
+                keep.add(dependency)
+                stack.append(dependency)
+    return keep
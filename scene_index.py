@@ -0,0 +1,207 @@
+import numpy as np
+
+# Results of classifying a box against the camera frustum
+OUTSIDE, STRADDLING, INSIDE = 0, 1, 2
+
+def frustum_planes(cam_ob, scene):
+    """Return the camera frustum as a (5, 4) array of world-space planes.
+
+    A point p is inside when plane[:3] @ p + plane[3] >= 0 for all five
+    planes: the four sides of the view frame and the camera plane. These are
+    the same bounds is_object_visible tests with world_to_camera_view.
+    """
+    camera = cam_ob.data
+    frame = camera.view_frame(scene=scene)[:3]
+    min_x, max_x = frame[2].x, frame[1].x
+    min_y, max_y = frame[1].y, frame[0].y
+
+    # Planes in camera space, where the camera looks down -z
+    if camera.type != 'ORTHO':
+        depth = -frame[0].z
+        local_planes = np.array([
+            [depth, 0.0, min_x, 0.0],     # x * depth - min_x * z >= 0, with z = -local z
+            [-depth, 0.0, -max_x, 0.0],   # max_x * z - x * depth >= 0
+            [0.0, depth, min_y, 0.0],
+            [0.0, -depth, -max_y, 0.0],
+            [0.0, 0.0, -1.0, 0.0],        # z >= 0
+        ])
+    else:
+        local_planes = np.array([
+            [1.0, 0.0, 0.0, -min_x],
+            [-1.0, 0.0, 0.0, max_x],
+            [0.0, 1.0, 0.0, -min_y],
+            [0.0, -1.0, 0.0, max_y],
+            [0.0, 0.0, -1.0, 0.0],
+        ])
+
+    # Move the planes to world space: local = view_matrix @ world
+    view_matrix = np.array(cam_ob.matrix_world.normalized().inverted(), dtype=np.float64)
+    return local_planes @ view_matrix
+
+def classify_boxes(planes, lo, hi):
+    """Classify (N, 3) boxes against frustum planes as OUTSIDE, STRADDLING or INSIDE."""
+    center = (lo + hi) * 0.5
+    extent = (hi - lo) * 0.5
+    distance = center @ planes[:, :3].T + planes[:, 3]
+    radius = extent @ np.abs(planes[:, :3]).T
+
+    result = np.full(len(lo), STRADDLING, dtype=np.int8)
+    result[((distance - radius) >= 0).all(axis=1)] = INSIDE
+    result[((distance + radius) < 0).any(axis=1)] = OUTSIDE
+    return result
+
+def mesh_bounds(mesh):
+    """Return the local (lo, hi) bounds of the mesh vertices, or None for an empty mesh."""
+    if not len(mesh.vertices):
+        return None
+    coords = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", coords)
+    coords = coords.reshape(-1, 3)
+    return coords.min(axis=0), coords.max(axis=0)
+
+def box_corners(lo, hi):
+    """Return the 8 corners of the box lo..hi as an (8, 3) array."""
+    return np.array([[x, y, z] for x in (lo[0], hi[0]) for y in (lo[1], hi[1]) for z in (lo[2], hi[2])])
+
+def transform_bounds(lo, hi, matrix):
+    """Return the world-space AABB of a local box transformed by a 4x4 matrix."""
+    corners = box_corners(lo, hi) @ matrix[:3, :3].T + matrix[:3, 3]
+    return corners.min(axis=0), corners.max(axis=0)
+
+class SceneIndex:
+    """World-space bounding boxes of the mesh objects of a scene, with a BVH over them.
+
+    Build it once per scene (or after objects move) and use it to classify
+    objects against a camera frustum and to answer distance queries. The boxes
+    bound the mesh data vertices, the same vertices is_object_visible tests.
+    """
+
+    def __init__(self, objects, leaf_size=4):
+        bounds_cache = {}
+        names, lows, highs = [], [], []
+        for obj in objects:
+            if obj.type != 'MESH':
+                continue
+            # Linked duplicates share their mesh bounds
+            if obj.data.name_full not in bounds_cache:
+                bounds_cache[obj.data.name_full] = mesh_bounds(obj.data)
+            bounds = bounds_cache[obj.data.name_full]
+            if bounds is None:
+                continue
+            lo, hi = transform_bounds(bounds[0], bounds[1], np.array(obj.matrix_world, dtype=np.float64))
+            names.append(obj.name)
+            lows.append(lo)
+            highs.append(hi)
+
+        self.names = names
+        self.lo = np.array(lows, dtype=np.float64).reshape(-1, 3)
+        self.hi = np.array(highs, dtype=np.float64).reshape(-1, 3)
+        self._build(leaf_size)
+
+    def _build(self, leaf_size):
+        """Build the BVH by splitting at the median of the box centers along the widest axis."""
+        self.order = np.arange(len(self.names))
+        self.nodes = []  # (lo, hi, start, count, left, right), left/right are -1 for leaves
+        self.node_lo = []
+        self.node_hi = []
+        if not self.names:
+            return
+
+        centers = (self.lo + self.hi) * 0.5
+        stack = [(0, len(self.order), None)]
+        while stack:
+            start, stop, parent = stack.pop()
+            items = self.order[start:stop]
+            node = len(self.nodes)
+            self.node_lo.append(self.lo[items].min(axis=0))
+            self.node_hi.append(self.hi[items].max(axis=0))
+            self.nodes.append([start, stop - start, -1, -1])
+            if parent is not None:
+                self.nodes[parent[0]][2 + parent[1]] = node
+
+            if stop - start > leaf_size:
+                item_centers = centers[items]
+                axis = np.argmax(item_centers.max(axis=0) - item_centers.min(axis=0))
+                self.order[start:stop] = items[np.argsort(item_centers[:, axis], kind="stable")]
+                middle = (start + stop) // 2
+                stack.append((middle, stop, (node, 1)))
+                stack.append((start, middle, (node, 0)))
+
+        self.node_lo = np.array(self.node_lo)
+        self.node_hi = np.array(self.node_hi)
+
+    def classify(self, cam_ob, scene):
+        """Classify every object against the camera frustum.
+
+        Returns (inside, outside, straddling) lists of object names. Only the
+        straddling objects need a per-vertex test.
+        """
+        planes = frustum_planes(cam_ob, scene)
+        result = np.full(len(self.names), OUTSIDE, dtype=np.int8)
+        if not self.names:
+            return [], [], []
+
+        node_class = classify_boxes(planes, self.node_lo, self.node_hi)
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            start, count, left, right = self.nodes[node]
+            if node_class[node] == OUTSIDE:
+                continue
+            items = self.order[start:start + count]
+            if node_class[node] == INSIDE:
+                result[items] = INSIDE
+            elif left < 0:
+                result[items] = classify_boxes(planes, self.lo[items], self.hi[items])
+            else:
+                stack.extend([left, right])
+
+        inside = [self.names[i] for i in np.flatnonzero(result == INSIDE)]
+        outside = [self.names[i] for i in np.flatnonzero(result == OUTSIDE)]
+        straddling = [self.names[i] for i in np.flatnonzero(result == STRADDLING)]
+        return inside, outside, straddling
+
+    def distances(self, point, mode="nearest"):
+        """Return the distance from point to every object's box.
+
+        mode is 'nearest' (closest point of the box), 'farthest' (farthest
+        corner) or 'center' (box center).
+        """
+        point = np.asarray(point, dtype=np.float64)
+        if mode == "nearest":
+            delta = np.maximum(np.maximum(self.lo - point, point - self.hi), 0.0)
+        elif mode == "farthest":
+            delta = np.maximum(np.abs(point - self.lo), np.abs(point - self.hi))
+        elif mode == "center":
+            delta = (self.lo + self.hi) * 0.5 - point
+        else:
+            raise ValueError(f"Unknown distance mode '{mode}'")
+        return np.sqrt((delta * delta).sum(axis=1))
+
+    def sorted_by_distance(self, point, mode="nearest", reverse=False):
+        """Return (name, distance) pairs sorted by distance from point."""
+        distances = self.distances(point, mode)
+        order = np.argsort(distances, kind="stable")
+        if reverse:
+            order = order[::-1]
+        return [(self.names[i], float(distances[i])) for i in order]
+
+    def k_nearest(self, point, k, mode="nearest"):
+        """Return the k objects closest to point as (name, distance) pairs, nearest first."""
+        distances = self.distances(point, mode)
+        k = min(k, len(distances))
+        if k == 0:
+            return []
+        order = np.argpartition(distances, k - 1)[:k]
+        order = order[np.argsort(distances[order], kind="stable")]
+        return [(self.names[i], float(distances[i])) for i in order]
+
+    def k_farthest(self, point, k, mode="farthest"):
+        """Return the k objects farthest from point as (name, distance) pairs, farthest first."""
+        distances = self.distances(point, mode)
+        k = min(k, len(distances))
+        if k == 0:
+            return []
+        order = np.argpartition(-distances, k - 1)[:k]
+        order = order[np.argsort(-distances[order], kind="stable")]
+        return [(self.names[i], float(distances[i])) for i in order]
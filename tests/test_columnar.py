@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from columnar import ALIGNMENT, open_columns, read_columns, read_header, write_columns
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_round_trip(tmp_path, mmap):
+    arrays = {
+        "position": np.arange(30, dtype=np.float32).reshape(10, 3),
+        "index": np.arange(7, dtype=np.int64),
+        "flag": np.array([True, False, True]),
+        "empty": np.zeros((0, 2), dtype=np.float64),
+    }
+    path = tmp_path / "data.cols"
+    write_columns(path, arrays, {"source": "test", "count": 10})
+
+    columns, meta = read_columns(path, mmap=mmap)
+    assert meta == {"source": "test", "count": 10}
+    assert set(columns) == set(arrays)
+    for name, array in arrays.items():
+        assert columns[name].dtype == array.dtype
+        assert np.array_equal(columns[name], array)
+
+def test_columns_are_aligned(tmp_path):
+    path = tmp_path / "data.cols"
+    write_columns(path, {"a": np.ones(3, dtype=np.uint8), "b": np.ones(5, dtype=np.float64)})
+    for column in read_header(path)["columns"].values():
+        assert column["offset"] % ALIGNMENT == 0
+
+def test_write_in_pieces(tmp_path):
+    path = tmp_path / "data.cols"
+    values = np.arange(100, dtype=np.int32)
+    f, columns = open_columns(path, {"values": (np.int32, (100,))})
+    with f:
+        for start in range(0, 100, 30):
+            f.seek(columns["values"]["offset"] + start * values.itemsize)
+            f.write(values[start:start + 30].tobytes())
+    assert np.array_equal(read_columns(path)[0]["values"], values)
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "data.cols"
+    path.write_bytes(b"not a column file")
+    with pytest.raises(ValueError):
+        read_columns(path)
@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+
+from convergence import estimate_full_time, image_change
+
+def test_estimate_full_time_extrapolates_last_passes():
+    # 0.5s of setup plus 0.1s per sample
+    passes = [(4, 0.9), (8, 1.3), (16, 2.1)]
+    assert estimate_full_time(passes, 128) == pytest.approx(0.5 + 0.1 * 128)
+
+def test_estimate_full_time_single_pass_scales_linearly():
+    assert estimate_full_time([(4, 2.0)], 64) == pytest.approx(32.0)
+
+def test_estimate_full_time_never_below_last_pass():
+    assert estimate_full_time([(4, 2.0), (8, 1.5)], 64) == pytest.approx(1.5)
+
+def test_image_change_ignores_values_above_one():
+    a = np.zeros((10, 3), dtype=np.float32)
+    b = a.copy()
+    b[0] = 50.0
+    assert image_change(a, b) == pytest.approx(np.sqrt(3 / 30))
+    assert image_change(a, a) == 0.0
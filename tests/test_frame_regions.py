@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+from frame_regions import border_value, scaled_resolution, split_range, tile_regions
+from region_render import stitch_tiles
+
+@pytest.mark.parametrize("resolution, percentage, expected", [
+    (720, 35, 252),
+    (720, 70, 504),
+    (100, 29, 29),
+    (100, 57, 57),
+    (100, 58, 58),
+    (1920, 33, 633),
+])
+def test_scaled_resolution(resolution, percentage, expected):
+    assert scaled_resolution(resolution, resolution, percentage) == (expected, expected)
+
+def test_split_range_covers_size():
+    ranges = split_range(101, 4)
+    assert ranges[0][0] == 0 and ranges[-1][1] == 101
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+
+def test_border_value_maps_back_to_pixel():
+    for size in (97, 252, 1080):
+        for pixel in range(size):
+            assert int(border_value(pixel, size) * size) == pixel
+
+def test_tile_regions_overlap_is_clamped():
+    tiles = tile_regions(100, 60, 2, 2, overlap=8)
+    assert [tile["core"] for tile in tiles] == [(0, 50, 0, 30), (50, 100, 0, 30), (0, 50, 30, 60), (50, 100, 30, 60)]
+    assert tiles[0]["render"] == (0, 58, 0, 38)
+    assert tiles[3]["render"] == (42, 100, 22, 60)
+
+def test_stitch_tiles_reproduces_frame(tmp_path):
+    width, height = 37, 23
+    frame = np.random.default_rng(0).integers(0, 256, (height, width, 3), dtype=np.uint8)
+    tiles = tile_regions(width, height, 3, 2, overlap=4)
+    for index, tile in enumerate(tiles):
+        x0, x1, y0, y1 = tile["render"]
+        # Image rows start at the top, tile rectangles at the bottom
+        tile["path"] = str(tmp_path / f"tile_{index}.png")
+        Image.fromarray(frame[height - y1:height - y0, x0:x1]).save(tile["path"])
+
+    output_path = tmp_path / "stitched.png"
+    stitch_tiles(tiles, width, height, output_path)
+    with Image.open(output_path) as image:
+        assert np.array_equal(np.asarray(image), frame)
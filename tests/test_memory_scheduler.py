@@ -0,0 +1,80 @@
+import pytest
+
+import memory_scheduler
+from blender_process import RESULT_PREFIX
+from memory_scheduler import (BASE_MEMORY_MB, HISTORY_LENGTH, SAFETY_MARGIN, MemoryScheduler, estimate_peak,
+                              observed_peak, record_peak)
+
+NAN = float("nan")
+
+def test_observed_peak_skips_nan_and_takes_the_largest():
+    assert observed_peak([100.0, NAN, 250.0], [NAN, 300.0]) == 300.0
+    assert observed_peak([NAN], [NAN]) == 0.0
+    assert observed_peak([], []) == 0.0
+
+def test_record_peak_keeps_the_last_peaks():
+    history = {}
+    for peak in range(HISTORY_LENGTH + 2):
+        record_peak(history, "classroom", float(peak))
+    assert history["classroom"]["peaks"] == [float(peak) for peak in range(2, HISTORY_LENGTH + 2)]
+
+def test_estimate_peak_prefers_history_then_stats_then_file_size(tmp_path):
+    blend = tmp_path / "classroom.blend"
+    blend.write_bytes(b"\0" * 2 * 1024 ** 2)
+    job = {"blend": str(blend)}
+    assert estimate_peak({}, job) == pytest.approx((BASE_MEMORY_MB + 4.0 * 2) * SAFETY_MARGIN)
+
+    stats = {"vertices": 0, "texture_bytes": 0}
+    assert estimate_peak({}, dict(job, stats=stats)) == pytest.approx(BASE_MEMORY_MB * SAFETY_MARGIN)
+
+    history = {"classroom": {"peaks": [800.0, 1000.0, 900.0]}}
+    assert estimate_peak(history, dict(job, stats=stats)) == pytest.approx(1000.0 * SAFETY_MARGIN)
+
+def test_estimate_peak_of_a_missing_file():
+    assert estimate_peak({}, {"blend": "missing.blend"}) == pytest.approx(BASE_MEMORY_MB * SAFETY_MARGIN)
+
+@pytest.fixture
+def fake_blender(monkeypatch):
+    """Run jobs without Blender: every job's estimate is job['estimate'], jobs with 'fail' exit with 1."""
+    monkeypatch.setattr(memory_scheduler, "estimate_peak", lambda history, job: job["estimate"])
+
+    def run_blender(args, timeout=None, threads=None, on_line=None):
+        blend = args[args.index("--blend") + 1]
+        if "fail" in blend:
+            return 1, ["Error: Out of memory"]
+        return 0, [RESULT_PREFIX + "{}"]
+
+    monkeypatch.setattr(memory_scheduler, "run_blender", run_blender)
+
+def jobs(*estimates, fail=()):
+    return [{"blend": f"{'fail' if index in fail else 'scene'}{index}.blend", "output": f"scene{index}.png",
+             "estimate": estimate} for index, estimate in enumerate(estimates)]
+
+def started(output):
+    return [line.split()[1] for line in output.splitlines() if line.startswith("Started")]
+
+def test_jobs_start_largest_first(fake_blender, capsys):
+    MemoryScheduler(1000.0, max_concurrent=1).run(jobs(300.0, 600.0, 500.0))
+    assert started(capsys.readouterr().out) == ["scene1.blend", "scene2.blend", "scene0.blend"]
+
+def test_largest_job_that_fits_starts_next(fake_blender, capsys):
+    # After the 600 MB job only 400 MB are free: the 300 MB job starts before the 500 MB one
+    results = MemoryScheduler(1000.0, max_concurrent=4).run(jobs(500.0, 600.0, 300.0))
+    assert started(capsys.readouterr().out)[:2] == ["scene1.blend", "scene2.blend"]
+    assert [result["ok"] for result in results] == [True, True, True]
+
+def test_job_larger_than_the_budget_runs_alone(fake_blender, capsys):
+    results = MemoryScheduler(1000.0, max_concurrent=4).run(jobs(1500.0, 200.0))
+    output = capsys.readouterr().out
+    assert "running it alone" in output
+    assert started(output) == ["scene0.blend", "scene1.blend"]
+    assert all(result["ok"] for result in results)
+
+def test_failed_job_records_the_estimated_peak(fake_blender):
+    history = {}
+    scheduler = MemoryScheduler(1000.0, history)
+    for _ in range(3):
+        result, = scheduler.run(jobs(600.0, fail=(0,)))
+        assert not result["ok"]
+    # The reservation without its margin, so repeated failures do not inflate the estimate
+    assert history["fail0"]["peaks"] == [pytest.approx(600.0 / SAFETY_MARGIN)] * 3
@@ -0,0 +1,116 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from mesh_reader import ply_mesh_arrays, read_obj, read_ply
+from mesh_stream import write_ply_streaming
+
+class Collection:
+    """Just enough of a bpy collection for write_ply_streaming."""
+
+    def __init__(self, **arrays):
+        self.arrays = arrays
+
+    def __len__(self):
+        return len(next(iter(self.arrays.values())))
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self[i] for i in range(*key.indices(len(self)))]
+        return SimpleNamespace(**{name: array[key] for name, array in self.arrays.items()})
+
+def mesh_object(positions, counts, indices):
+    counts = np.asarray(counts, dtype=np.int32)
+    mesh = SimpleNamespace(
+        vertices=Collection(co=np.asarray(positions, dtype=np.float32)),
+        polygons=Collection(loop_start=np.cumsum(counts) - counts, loop_total=counts),
+        loops=Collection(vertex_index=np.asarray(indices, dtype=np.int32)),
+    )
+    return SimpleNamespace(name="Mesh", data=mesh)
+
+POSITIONS = np.array([[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0], [0.5, 1.5, 0.25], [-1, 0.5, 2]], dtype=np.float32)
+
+@pytest.mark.parametrize("file_format", ["ascii", "binary_little_endian"])
+@pytest.mark.parametrize("mmap", [True, False])
+def test_round_trip(tmp_path, file_format, mmap):
+    # Mixed face sizes, with runs long enough to be read as fixed-size blocks
+    counts = [3] * 10 + [4] * 5 + [5, 3, 6]
+    rng = np.random.default_rng(1)
+    indices = rng.integers(0, len(POSITIONS), sum(counts))
+    path = tmp_path / "mesh.ply"
+    write_ply_streaming(path, mesh_object(POSITIONS, counts, indices), file_format)
+
+    positions, read_counts, read_indices = ply_mesh_arrays(read_ply(path, mmap=mmap))
+    assert np.array_equal(positions, POSITIONS)
+    assert read_counts.tolist() == counts
+    assert read_indices.tolist() == indices.tolist()
+
+def test_same_size_faces_are_a_block(tmp_path):
+    path = tmp_path / "mesh.ply"
+    write_ply_streaming(path, mesh_object(POSITIONS, [3, 3], [0, 1, 2, 2, 3, 0]))
+    faces = read_ply(path)["face"]
+    assert faces["indices"].shape == (2, 3)
+    assert faces["counts"].tolist() == [3, 3]
+
+PROPERTIES_HEADER = """ply
+format {} 1.0
+comment extra vertex properties
+element vertex 2
+property float x
+property float y
+property float z
+property float nx
+property uchar red
+property double quality
+element face 1
+property list uchar int vertex_indices
+end_header
+"""
+
+def test_extra_vertex_properties_ascii(tmp_path):
+    path = tmp_path / "mesh.ply"
+    path.write_text(PROPERTIES_HEADER.format("ascii") + "0 1 2 0.5 255 0.25\n3 4 5 -1 7 1e3\n3 0 1 1\n")
+    ply = read_ply(path)
+    vertex = ply["vertex"]
+    assert vertex.dtype.names == ("x", "y", "z", "nx", "red", "quality")
+    assert vertex["red"].tolist() == [255, 7]
+    assert vertex["quality"].tolist() == [0.25, 1000.0]
+    assert ply["face"]["indices"].tolist() == [[0, 1, 1]]
+
+@pytest.mark.parametrize("file_format, order", [("binary_little_endian", "<"), ("binary_big_endian", ">")])
+def test_extra_vertex_properties_binary(tmp_path, file_format, order):
+    vertex = np.array([(0, 1, 2, 0.5, 255, 0.25), (3, 4, 5, -1, 7, 1e3)],
+                      dtype=[("x", order + "f4"), ("y", order + "f4"), ("z", order + "f4"), ("nx", order + "f4"),
+                             ("red", "u1"), ("quality", order + "f8")])
+    face = np.array([(3, [0, 1, 1])], dtype=[("count", "u1"), ("indices", order + "i4", (3,))])
+    path = tmp_path / "mesh.ply"
+    path.write_bytes(PROPERTIES_HEADER.format(file_format).encode("ascii") + vertex.tobytes() + face.tobytes())
+
+    ply = read_ply(path)
+    assert ply["vertex"]["red"].tolist() == [255, 7]
+    assert ply["vertex"]["quality"].tolist() == [0.25, 1000.0]
+    positions, counts, indices = ply_mesh_arrays(ply)
+    assert positions.tolist() == [[0, 1, 2], [3, 4, 5]]
+    assert indices.tolist() == [0, 1, 1]
+
+def test_truncated_file(tmp_path):
+    path = tmp_path / "mesh.ply"
+    write_ply_streaming(path, mesh_object(POSITIONS, [3, 4], [0, 1, 2, 0, 1, 2, 3]))
+    path.write_bytes(path.read_bytes()[:-3])
+    with pytest.raises(ValueError):
+        read_ply(path)
+
+def test_read_obj(tmp_path):
+    path = tmp_path / "mesh.obj"
+    path.write_text("v 0 0 0\nv 1 0 0\nv 1 1 0\nv 0 1 0\nvt 0 0\nvt 1 1\n"
+                    "usemtl Red\ns 1\nf 1/1 2/2 3/1\ns off\nusemtl Blue\nf -4/1 -2/2 -1/1 -3/2\n")
+    positions, counts, indices, uvs, faces = read_obj(path)
+    assert positions.shape == (4, 3)
+    assert counts.tolist() == [3, 4]
+    assert indices.tolist() == [0, 1, 2, 0, 2, 3, 1]
+    assert uvs.shape == (7, 2)
+    assert faces["smooth"].tolist() == [True, False]
+    assert faces["material_names"] == ["Red", "Blue"]
+    assert faces["material_index"].tolist() == [0, 1]
+    assert faces["normals"] is None
@@ -0,0 +1,122 @@
+import tracemalloc
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from columnar import read_columns
+from mesh_reader import ply_mesh_arrays, read_ply
+from mesh_stream import write_ply_streaming, write_vertex_data_streaming
+
+class Item:
+    """One item of a Collection, its attributes read from the collection's arrays."""
+    __slots__ = ("arrays", "index")
+
+    def __init__(self, arrays, index):
+        self.arrays = arrays
+        self.index = index
+
+    def __getattr__(self, name):
+        return self.arrays[name][self.index]
+
+class Collection:
+    """Like a bpy collection: indexing gives one item, slicing a list of items."""
+
+    def __init__(self, **arrays):
+        self.arrays = arrays
+
+    def __len__(self):
+        return len(next(iter(self.arrays.values())))
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [Item(self.arrays, i) for i in range(*key.indices(len(self)))]
+        return Item(self.arrays, key)
+
+def fake_mesh(positions, counts, indices, face_order=None):
+    """A mesh with the given faces, stored in the loops in face_order (default: in order)."""
+    counts = np.asarray(counts, dtype=np.int32)
+    starts = np.cumsum(counts) - counts
+    face_order = np.arange(len(counts)) if face_order is None else np.asarray(face_order)
+    # Lay the faces out in the loops in face_order, so loop_start is not increasing
+    loop_starts = np.empty(len(counts), dtype=np.int64)
+    loop_vertex_index = np.empty(len(indices), dtype=np.int32)
+    position = 0
+    for face in face_order:
+        loop_starts[face] = position
+        loop_vertex_index[position:position + counts[face]] = indices[starts[face]:starts[face] + counts[face]]
+        position += counts[face]
+    normals = np.tile(np.array([0.0, 0.0, 1.0], dtype=np.float32), (len(indices), 1))
+    mesh = SimpleNamespace(
+        vertices=Collection(co=np.asarray(positions, dtype=np.float32)),
+        polygons=Collection(loop_start=loop_starts, loop_total=counts),
+        loops=Collection(vertex_index=loop_vertex_index, normal=normals),
+        uv_layers=[],
+    )
+    return SimpleNamespace(name="Fake", data=mesh)
+
+def grid(count):
+    """A count x count vertex grid of quads."""
+    xs, ys = np.meshgrid(np.arange(count, dtype=np.float32) * 0.1, np.arange(count, dtype=np.float32) / 3)
+    positions = np.column_stack([xs.ravel(), ys.ravel(), np.zeros(count * count, dtype=np.float32)])
+    i, j = np.meshgrid(np.arange(count - 1), np.arange(count - 1), indexing="ij")
+    a = (i * count + j).ravel()
+    indices = np.column_stack([a, a + 1, a + count + 1, a + count]).ravel()
+    return positions, np.full(len(a), 4), indices
+
+@pytest.mark.parametrize("file_format", ["ascii", "binary_little_endian"])
+def test_round_trip_with_faces_out_of_loop_order(tmp_path, file_format):
+    positions = np.array([[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0], [0.1, 0.2, 0.3]], dtype=np.float32)
+    counts = [3, 4, 5]
+    indices = np.array([0, 1, 2, 0, 1, 2, 3, 4, 3, 2, 1, 0])
+    obj = fake_mesh(positions, counts, indices, face_order=[2, 0, 1])
+    path = tmp_path / "mesh.ply"
+    write_ply_streaming(path, obj, file_format, memory_budget=1024)
+
+    read_positions, read_counts, read_indices = ply_mesh_arrays(read_ply(path))
+    assert np.array_equal(read_positions, positions)
+    assert read_counts.tolist() == counts
+    assert read_indices.tolist() == indices.tolist()
+
+def test_ascii_floats_print_like_write_ply(tmp_path):
+    obj = fake_mesh([[0.1, 1 / 3, 2.5]], [], np.zeros(0, dtype=np.int32))
+    path = tmp_path / "mesh.ply"
+    write_ply_streaming(path, obj, "ascii")
+    co = obj.data.vertices[0].co
+    assert f"{float(co[0])} {float(co[1])} {float(co[2])}\n" in path.read_text()
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        write_ply_streaming("unused.ply", fake_mesh(*grid(2)), "binary_big_endian")
+
+def test_vertex_data_columns(tmp_path):
+    positions, counts, indices = grid(5)
+    obj = fake_mesh(positions, counts, indices)
+    path = tmp_path / "mesh.vtx"
+    write_vertex_data_streaming(path, obj.data, {"mesh": "Fake"}, memory_budget=2048)
+    columns, meta = read_columns(path)
+    assert meta == {"mesh": "Fake"}
+    assert np.array_equal(columns["positions"], positions)
+    assert np.array_equal(columns["loop_vertex_index"], indices)
+    assert np.array_equal(columns["polygon_loop_total"], counts)
+    assert np.array_equal(columns["normals"], obj.data.loops.arrays["normal"])
+
+def peak_memory(function):
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+@pytest.mark.parametrize("file_format", ["ascii", "binary_little_endian"])
+def test_peak_memory_does_not_grow_with_mesh_size(tmp_path, file_format):
+    budget = 32 * 1024
+    peaks = []
+    for count in (30, 120):
+        obj = fake_mesh(*grid(count))
+        path = tmp_path / f"grid_{count}.ply"
+        peaks.append(peak_memory(lambda: write_ply_streaming(path, obj, file_format, budget)))
+    # 16 times the vertices and faces, the same chunks
+    assert peaks[1] < peaks[0] * 1.5
+    assert peaks[1] < 2 * budget
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from rasterizer import clip_near, draw_triangles
+
+def quad(x0, y0, x1, y1):
+    """Screen-space (px, py) of a rectangle as two triangles."""
+    px = np.array([[x0, x1, x1], [x0, x1, x0]], dtype=np.float64)
+    py = np.array([[y0, y0, y1], [y0, y1, y1]], dtype=np.float64)
+    return px, py
+
+def buffers(width, height):
+    return np.full(width * height, np.inf), np.full(width * height, -1, dtype=np.int64)
+
+@pytest.mark.parametrize("size", [4, 20])
+def test_quad_covers_pixel_centers(size):
+    # 4 pixels wide takes the batched small triangle path, 20 the one by one path
+    width = height = 32
+    depth_buffer, id_buffer = buffers(width, height)
+    px, py = quad(0, 0, size, size)
+    assert draw_triangles(depth_buffer, id_buffer, width, height, px, py, np.ones((2, 3)), 0)
+    covered = (id_buffer == 0).reshape(height, width)
+    assert covered.sum() == size * size
+    assert covered[:size, :size].all()
+
+def test_nearest_surface_wins():
+    width = height = 16
+    depth_buffer, id_buffer = buffers(width, height)
+    far_px, far_py = quad(0, 0, 8, 8)
+    near_px, near_py = quad(4, 4, 12, 12)
+    draw_triangles(depth_buffer, id_buffer, width, height, far_px, far_py, np.full((2, 3), 5.0), 0)
+    draw_triangles(depth_buffer, id_buffer, width, height, near_px, near_py, np.full((2, 3), 1.0), 1)
+    counts = np.bincount(id_buffer[id_buffer >= 0], minlength=2)
+    assert counts.tolist() == [64 - 16, 64]
+
+    # Drawn in the other order the result is the same
+    depth_buffer, id_buffer = buffers(width, height)
+    draw_triangles(depth_buffer, id_buffer, width, height, near_px, near_py, np.full((2, 3), 1.0), 1)
+    draw_triangles(depth_buffer, id_buffer, width, height, far_px, far_py, np.full((2, 3), 5.0), 0)
+    assert np.bincount(id_buffer[id_buffer >= 0], minlength=2).tolist() == [64 - 16, 64]
+
+def test_triangle_between_pixel_centers_is_missed():
+    depth_buffer, id_buffer = buffers(8, 8)
+    px, py = np.array([[0.6, 0.9, 0.6]]), np.array([[0.6, 0.6, 0.9]])
+    assert not draw_triangles(depth_buffer, id_buffer, 8, 8, px, py, np.ones((1, 3)), 0)
+    assert (id_buffer == -1).all()
+
+def test_clip_near():
+    near = 1.0
+    front = np.array([[[0, 0, 2], [1, 0, 2], [0, 1, 3]]], dtype=np.float64)
+    one_behind = np.array([[[0, 0, 0], [1, 0, 2], [0, 1, 2]]], dtype=np.float64)
+    two_behind = np.array([[[0, 0, 2], [1, 0, 0], [0, 1, 0]]], dtype=np.float64)
+    all_behind = np.array([[[0, 0, 0], [1, 0, 0.5], [0, 1, 0]]], dtype=np.float64)
+
+    assert np.array_equal(clip_near(front, near), front)
+    assert len(clip_near(one_behind, near)) == 2
+    assert len(clip_near(two_behind, near)) == 1
+    assert len(clip_near(all_behind, near)) == 0
+    clipped = clip_near(np.concatenate([front, one_behind, two_behind, all_behind]), near)
+    assert len(clipped) == 4
+    assert (clipped[:, :, 2] >= near - 1e-12).all()
+
+def test_clip_near_keeps_the_visible_area():
+    # A right triangle in the x-z plane, half of its depth range behind the near plane
+    triangle = np.array([[[0, 0, 0], [2, 0, 2], [0, 0, 2]]], dtype=np.float64)
+    clipped = clip_near(triangle, 1.0)
+
+    def area(t):
+        return 0.5 * np.abs(np.cross(t[:, 1] - t[:, 0], t[:, 2] - t[:, 0])[:, 1]).sum()
+
+    # The part with z >= 1 is a trapezoid between x = 0 and x = z
+    assert area(clipped) == pytest.approx(1.5)
@@ -0,0 +1,52 @@
+import math
+
+import pytest
+
+from blend_list import SMOKE_SCENE_NAMES
+from render_benchmark import TIER_SETTINGS, benchmark_cases, compare_results, merge_repeats
+
+NAN = float("nan")
+
+def run(wall_time=10.0, load_time=1.0, sync_time=2.0, render_time=7.0, peak_memory=500.0,
+        peak_device_memory=NAN, ok=True):
+    return {"ok": ok, "wall_time": wall_time, "load_time": load_time, "sync_time": sync_time,
+            "render_time": render_time, "peak_memory": peak_memory, "peak_device_memory": peak_device_memory}
+
+def results(cases, settings=TIER_SETTINGS["smoke"]):
+    return {"settings": settings, "cases": cases}
+
+def test_merge_repeats_takes_fastest_times_and_largest_peaks():
+    merged = merge_repeats([run(wall_time=12.0, peak_memory=480.0), run(wall_time=10.0, peak_memory=520.0),
+                            run(wall_time=11.0, peak_memory=NAN)])
+    assert merged["wall_time"] == 10.0
+    assert merged["peak_memory"] == 520.0
+    assert merged["repeats"] == 3
+
+def test_merge_repeats_keeps_nan_when_every_run_misses_a_metric():
+    merged = merge_repeats([run(), run()])
+    assert math.isnan(merged["peak_device_memory"])
+
+def test_compare_results_flags_growth_beyond_threshold_and_noise_floor():
+    baseline = results({"spheres": run()})
+    slower = results({"spheres": run(wall_time=12.0, render_time=7.4, peak_memory=700.0)})
+    regressions = compare_results(slower, baseline, threshold=0.1)
+    # render_time grew 6% and stays under the threshold
+    assert regressions == [("spheres", "wall_time", 10.0, 12.0), ("spheres", "peak_memory", 500.0, 700.0)]
+
+def test_compare_results_ignores_changes_under_the_noise_floor():
+    baseline = results({"spheres": run(load_time=0.1)})
+    # Three times slower, but only 0.2s more than the baseline
+    assert compare_results(results({"spheres": run(load_time=0.3)}), baseline) == []
+
+def test_compare_results_skips_failed_missing_and_nan_values():
+    baseline = results({"spheres": run(), "textures": run(ok=False), "dense_mesh": run(wall_time=NAN)})
+    current = results({"spheres": run(wall_time=NAN), "textures": run(wall_time=100.0),
+                       "dense_mesh": run(wall_time=100.0), "new_scene": run(wall_time=100.0)})
+    assert compare_results(current, baseline) == []
+
+def test_compare_results_rejects_other_settings():
+    with pytest.raises(ValueError):
+        compare_results(results({}, TIER_SETTINGS["full"]), results({}, TIER_SETTINGS["smoke"]))
+
+def test_smoke_cases_use_the_shared_scene_names():
+    assert [name for name, args in benchmark_cases("smoke")] == SMOKE_SCENE_NAMES
@@ -0,0 +1,82 @@
+import math
+
+import numpy as np
+import pytest
+
+from render_log import RenderLog, parse_time, read_log, scene_summaries, sync_durations, time_to_first_sample
+
+LOG = """\
+Read blend: "/data/classroom/classroom.blend"
+Fra:1 Mem:100.00M (Peak 100.00M) | Time:00:00.50 | Mem:0.00M, Peak:0.00M | Scene, ViewLayer | Synchronizing object | Desk
+Fra:1 Mem:110.00M (Peak 120.00M) | Time:00:01.00 | Mem:0.00M, Peak:0.00M | Scene, ViewLayer | Syncing Chair.001
+Fra:1 Mem:115.00M (Peak 125.00M) | Time:00:03.00 | Mem:8.00M, Peak:8.00M | Scene, ViewLayer | Updating Geometry BVH Plane.016 1/13
+Fra:1 Mem:120.50M (Peak 130.00M) | Time:00:04.00 | Remaining:00:10.50 | Mem:16.00M, Peak:32.00M | Scene, ViewLayer | Sample 5/512
+Fra:1 Mem:121.00M (Peak 130.00M) | Time:00:08.00 | Mem:16.00M, Peak:32.00M | Scene, ViewLayer | Finished
+Saved: '/tmp/classroom.png'
+Time: 00:08.52 (Saving: 00:00.02)
+Fra:2 Mem:1476.20M (Peak 3107.06M) | Time:14:44.13 | Compositing | Tile 2-18
+Fra:2 Mem:1476.20M (Peak 3107.06M) | Time:14:45.00 | Rendering 26 / 64 samples
+"""
+
+@pytest.fixture
+def log():
+    log = RenderLog()
+    for line in LOG.splitlines():
+        log.feed(line)
+    return log
+
+def test_parse_time():
+    assert parse_time("00:03.21") == pytest.approx(3.21)
+    assert parse_time("14:44.13") == pytest.approx(884.13)
+    assert parse_time("01:00:00.00") == 3600.0
+
+def test_feed_reports_status_lines():
+    log = RenderLog()
+    assert not log.feed("Read blend: \"/data/scene.blend\"")
+    assert log.feed("Fra:1 Mem:1.00M (Peak 2.00M) | Time:00:00.10 | Sample 1/8")
+    assert len(log) == 1
+
+def test_phases_details_and_progress(log):
+    assert log.scenes == ["classroom"]
+    assert log.phases == ["Synchronizing object", "Syncing", "Updating Geometry BVH", "Sample", "Finished",
+                          "Compositing", "Rendering"]
+    assert log.details == ["Desk", "Chair.001", "Plane.016", "", "", "Tile", ""]
+    assert log.columns["progress_done"] == [-1, -1, 1, 5, -1, 2, 26]
+    assert log.columns["progress_total"] == [-1, -1, 13, 512, -1, 18, 64]
+
+def test_memory_and_remaining(log):
+    assert log.columns["peak"][3] == 130.0
+    assert log.columns["device_memory"][3] == 16.0
+    assert log.columns["device_peak"][3] == 32.0
+    assert log.columns["remaining"][3] == pytest.approx(10.5)
+    assert math.isnan(log.columns["remaining"][0])
+    assert math.isnan(log.columns["device_peak"][5])
+
+def test_totals(log):
+    assert log.totals["classroom"] == {"saved": "/tmp/classroom.png", "render_time": pytest.approx(8.52),
+                                       "saving_time": pytest.approx(0.02)}
+
+def test_write_and_read(log, tmp_path):
+    path = tmp_path / "log.cols"
+    log.write(path)
+    arrays, meta = read_log(path)
+    assert meta["scenes"] == ["classroom"]
+    assert [meta["phases"][i] for i in arrays["phase"]] == log.phases
+    assert [meta["details"][i] for i in arrays["detail"]] == log.details
+    assert np.allclose(arrays["time"], log.columns["time"])
+
+def test_summaries(log):
+    arrays, phases, details = log.arrays()
+    meta = {"scenes": log.scenes, "phases": phases, "details": details, "totals": log.totals}
+    summary = scene_summaries(arrays, meta)["classroom"]
+    assert summary["records"] == 7
+    assert summary["peak_memory"] == pytest.approx(3107.06)
+    assert summary["peak_device_memory"] == 32.0
+    assert summary["render_time"] == pytest.approx(8.52)
+
+def test_sync_durations_and_first_sample(log):
+    arrays, phases, _ = log.arrays()
+    index, duration = sync_durations(arrays, phases)
+    assert index.tolist() == [0, 1]
+    assert duration.tolist() == pytest.approx([0.5, 2.0])
+    assert time_to_first_sample(arrays, phases) == 4.0
@@ -0,0 +1,36 @@
+from scene_dependencies import kept_objects
+
+class Object:
+    """Just enough of bpy.types.Object for kept_objects; hashed by identity like bpy objects."""
+
+    def __init__(self, name, obj_type, hide_render):
+        self.name = name
+        self.type = obj_type
+        self.hide_render = hide_render
+
+def obj(name, obj_type='MESH', hide_render=False):
+    return Object(name, obj_type, hide_render)
+
+def kept_names(objects, seen, references):
+    keep = kept_objects(objects, seen, lambda o: references.get(o.name, []))
+    return sorted(o.name for o in keep)
+
+def test_collection_instance_keeps_its_objects():
+    # An empty instancing a collection whose source meshes sit off-screen
+    chair, table, wall = obj("chair"), obj("table"), obj("wall")
+    instancer = obj("instancer", 'EMPTY')
+    objects = [chair, table, wall, instancer]
+    references = {"instancer": [chair, table]}
+    assert kept_names(objects, {wall}, references) == ["chair", "instancer", "table", "wall"]
+
+def test_dependencies_are_followed_transitively():
+    a, b, c, d = obj("a"), obj("b"), obj("c"), obj("d")
+    references = {"a": [b], "b": [c, a]}
+    assert kept_names([a, b, c, d], {a}, references) == ["a", "b", "c"]
+
+def test_hidden_non_mesh_objects_are_not_roots():
+    mesh = obj("mesh")
+    instancer = obj("instancer", 'EMPTY', hide_render=True)
+    light = obj("light", 'LIGHT')
+    references = {"instancer": [mesh]}
+    assert kept_names([mesh, instancer, light], set(), references) == ["light"]
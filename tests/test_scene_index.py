@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from scene_index import INSIDE, OUTSIDE, STRADDLING, classify_boxes, frustum_planes, transform_bounds
+
+class Matrix:
+    """Just enough of mathutils.Matrix for frustum_planes."""
+
+    def __init__(self, array):
+        self.array = np.asarray(array, dtype=np.float64)
+
+    def normalized(self):
+        return self
+
+    def inverted(self):
+        return Matrix(np.linalg.inv(self.array))
+
+    def __array__(self, dtype=None, copy=None):
+        return self.array if dtype is None else self.array.astype(dtype)
+
+def camera(camera_type="PERSP", location=(0.0, 0.0, 0.0), half_size=0.5, depth=1.0):
+    """A camera at location looking down -z, with its view frame half_size wide at depth."""
+    corners = [(half_size, half_size), (half_size, -half_size), (-half_size, -half_size), (-half_size, half_size)]
+    frame = [SimpleNamespace(x=x, y=y, z=-depth) for x, y in corners]
+    data = SimpleNamespace(type=camera_type, view_frame=lambda scene: frame)
+    matrix = np.eye(4)
+    matrix[:3, 3] = location
+    return SimpleNamespace(data=data, matrix_world=Matrix(matrix))
+
+def inside(planes, point):
+    return bool((planes[:, :3] @ point + planes[:, 3] >= 0).all())
+
+def test_perspective_planes():
+    planes = frustum_planes(camera(), None)
+    assert inside(planes, np.array([0.0, 0.0, -5.0]))
+    assert inside(planes, np.array([2.4, -2.4, -5.0]))
+    assert not inside(planes, np.array([2.6, 0.0, -5.0]))
+    assert not inside(planes, np.array([0.0, 0.0, 5.0]))
+
+def test_planes_follow_the_camera():
+    planes = frustum_planes(camera(location=(10.0, 0.0, 0.0)), None)
+    assert inside(planes, np.array([10.0, 0.0, -5.0]))
+    assert not inside(planes, np.array([0.0, 0.0, -5.0]))
+
+def test_orthographic_planes():
+    planes = frustum_planes(camera("ORTHO", half_size=2.0), None)
+    assert inside(planes, np.array([1.9, 1.9, -100.0]))
+    assert not inside(planes, np.array([2.1, 0.0, -1.0]))
+
+def test_classify_boxes():
+    planes = frustum_planes(camera(), None)
+    lo = np.array([[-0.5, -0.5, -6.0], [2.0, -0.5, -5.0], [10.0, 10.0, -5.0], [-1.0, -1.0, 1.0]])
+    hi = np.array([[0.5, 0.5, -5.0], [3.0, 0.5, -4.0], [11.0, 11.0, -4.0], [1.0, 1.0, 2.0]])
+    assert classify_boxes(planes, lo, hi).tolist() == [INSIDE, STRADDLING, OUTSIDE, OUTSIDE]
+
+def test_transform_bounds():
+    matrix = np.eye(4)
+    matrix[:3, :3] = [[0.0, -1.0, 0.0], [1.0, 0.0, 0.0], [0.0, 0.0, 1.0]]
+    matrix[:3, 3] = [5.0, 0.0, 0.0]
+    lo, hi = transform_bounds(np.array([0.0, 0.0, 0.0]), np.array([2.0, 1.0, 1.0]), matrix)
+    assert np.allclose(lo, [4.0, 0.0, 0.0]) and np.allclose(hi, [5.0, 2.0, 1.0])
@@ -0,0 +1,52 @@
+import bpy
+from contextlib import contextmanager
+import numpy as np
+
+VIEWER_IMAGE = "Viewer Node"
+
+@contextmanager
+def result_viewer(scene):
+    """Route the render result to a compositor Viewer node for the duration of the block.
+
+    The Viewer is fed what the Composite node gets, or the Render Layers
+    output without one, so after each render bpy.data.images["Viewer Node"]
+    holds the scene linear pixels of the frame. Compositing is turned on and
+    the Viewer made the active node, since only the active Viewer updates.
+    The node, any Render Layers node added for it, use_nodes,
+    use_compositing and the active node are restored on exit.
+    """
+    original_use_nodes = scene.use_nodes
+    original_use_compositing = scene.render.use_compositing
+    scene.use_nodes = True
+    scene.render.use_compositing = True
+    tree = scene.node_tree
+    original_active = tree.nodes.active
+    added = []
+    try:
+        composite = next((node for node in tree.nodes if node.type == 'COMPOSITE'), None)
+        if composite is not None and composite.inputs["Image"].is_linked:
+            source = composite.inputs["Image"].links[0].from_socket
+        else:
+            render_layers = next((node for node in tree.nodes if node.type == 'R_LAYERS'), None)
+            if render_layers is None:
+                render_layers = tree.nodes.new("CompositorNodeRLayers")
+                added.append(render_layers)
+            source = render_layers.outputs["Image"]
+        viewer = tree.nodes.new("CompositorNodeViewer")
+        added.append(viewer)
+        tree.links.new(source, viewer.inputs["Image"])
+        tree.nodes.active = viewer
+        yield viewer
+    finally:
+        for node in reversed(added):
+            tree.nodes.remove(node)
+        tree.nodes.active = original_active
+        scene.use_nodes = original_use_nodes
+        scene.render.use_compositing = original_use_compositing
+
+def viewer_pixels():
+    """Return the Viewer node image as a (pixels, 4) float array, bottom row first."""
+    image = bpy.data.images[VIEWER_IMAGE]
+    pixels = np.empty(len(image.pixels), dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    return pixels.reshape(-1, 4)